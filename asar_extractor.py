@@ -2,7 +2,7 @@
 ASAR Extractor Module
 ====================
 
-This module provides pure Python extraction of ASAR archives.
+This module provides pure Python extraction and packing of ASAR archives.
 No Node.js or external tools required!
 
 ASAR (Atom Shell Archive) is a simple tar-like archive format used by
@@ -21,16 +21,385 @@ The JSON header contains:
 
 Implementation Notes:
 - No external dependencies needed (pure Python)
-- Handles escape sequences in JSON
-- Recursively extracts nested directories
+- Header JSON is sliced out using its Pickle length field (orjson if installed)
+- Handles escape sequences in JSON when falling back to brace scanning
+- Flattens nested directories into a work list written by a thread pool
 - Progress logging to show extraction status
+- Entries are copied kernel-side or through mmap slices (flat peak memory)
+- Headers are indexed into ASARIndex: flat arrays instead of nested dicts
+  (a fraction of the memory; walking it is somewhat slower, see below);
+  the packer builds its header as an ASARIndex as well
+- ASARIndex can be saved to a binary sidecar so reopening skips JSON parsing
+- ASARArchive gives random access to single entries without extracting
+- ASARArchive.iter_zip streams an archive as a zip file in constant memory
+- ASARPatcher applies same-length edits to a copy of an archive in place
+- Selective extraction writes only entries matching include/exclude globs
+- A journal of finished entries lets an interrupted extraction resume
+- Unpacked entries are linked or copied from the sibling .asar.unpacked folder
+- Electron integrity block hashes can be verified on a worker pool
+- Packing streams file bodies straight into the archive (no npx cold start)
+- Packed file data is laid out in launcher start-up order for sequential reads
 """
 
 import os
+import copy
+import filecmp
+import fnmatch
+import hashlib
+import io
 import json
+import mmap
+import re
+import shutil
+import stat
 import struct
+import sys
+import threading
+import time
+import zipfile
+from array import array
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
 
+try:
+    import orjson  # Optional: several times faster than json for big headers
+except ImportError:
+    orjson = None
+
+# Flat header index record: offset is relative to the start of file data
+ASAREntry = namedtuple('ASAREntry', ['offset', 'size', 'flags'])
+
+
+class ASARIndex:
+    """Compact, array-backed model of a parsed ASAR header.
+    
+    json.loads turns the header into one dict per entry plus a string per
+    key, which for tens of thousands of entries costs far more memory than
+    the data it describes. ASARIndex stores the tree as parallel arrays in
+    depth-first order instead:
+    
+    - names:   leaf name of each entry (interned, so repeated names such as
+               'index.js' or 'package.json' are stored once)
+    - parents: index of the containing directory (-1 for the root)
+    - ends:    index just past the entry's subtree, so the children of a
+               directory are found by hopping from one sibling to the next
+    - offsets, sizes, flags: what ASAREntry holds, one machine word each
+    
+    Entry 0 is the archive root. Full paths are rebuilt only while
+    iterating, and name lookups build a per-directory dict on first use.
+    
+    Because the model is just arrays and a name table, save() can write it
+    to a binary file that load() reads back without any JSON parsing.
+    
+    The gain is memory, not speed: for 50k entries the index takes about
+    an eighth of the memory of the parsed dicts, but a full walk is roughly
+    1.4x slower than walking them (python benchmark_asar.py model), as
+    paths are rebuilt in Python on every pass.
+    
+    ASARPacker builds its header as an index too (add() and close()) and
+    to_json() writes it out without building dicts. Only ASARPatcher keeps
+    the parsed dicts: it must re-serialize the original header exactly.
+    """
+    
+    __slots__ = ('names', 'parents', 'ends', 'offsets', 'sizes', 'flags',
+                 'links', 'integrity', '_lookup')
+    
+    # Bit flags stored in the flags array (and ASAREntry.flags)
+    FLAG_DIRECTORY = 1
+    FLAG_EXECUTABLE = 2
+    FLAG_UNPACKED = 4
+    FLAG_LINK = 8
+    
+    # First bytes of a saved index (bump the digit when the layout changes)
+    FILE_MAGIC = b'RUIEIDX1'
+    
+    def __init__(self, files_dict, keep_integrity=False):
+        """Index the 'files' mapping of a parsed header.
+        
+        Args:
+            files_dict (dict): Top-level 'files' mapping from the header
+            keep_integrity (bool): Also keep each file's integrity metadata
+        """
+        self.names = ['']
+        self.parents = array('i', [-1])
+        self.ends = array('i', [0])
+        self.offsets = array('q', [0])
+        self.sizes = array('q', [0])
+        self.flags = array('B', [self.FLAG_DIRECTORY])
+        self.links = {}
+        self.integrity = {} if keep_integrity else None
+        self._lookup = {}
+        
+        intern = sys.intern
+        # Depth-first walk with one dict iterator per open directory
+        stack = [(iter(files_dict.items()), 0)]
+        while stack:
+            items, parent = stack[-1]
+            for name, node in items:
+                if not isinstance(node, dict):
+                    continue
+                index = len(self.names)
+                self.names.append(intern(name))
+                self.parents.append(parent)
+                self.ends.append(index + 1)
+                if 'files' in node:
+                    self.offsets.append(0)
+                    self.sizes.append(0)
+                    self.flags.append(self.FLAG_DIRECTORY)
+                    stack.append((iter(node['files'].items()), index))
+                    break
+                if 'link' in node:
+                    self.offsets.append(0)
+                    self.sizes.append(0)
+                    self.flags.append(self.FLAG_LINK)
+                    self.links[index] = node['link']
+                    continue
+                flags = 0
+                if node.get('executable'):
+                    flags |= self.FLAG_EXECUTABLE
+                if node.get('unpacked'):
+                    flags |= self.FLAG_UNPACKED
+                self.offsets.append(int(node.get('offset', 0)))
+                self.sizes.append(int(node.get('size', 0)))
+                self.flags.append(flags)
+                if keep_integrity and isinstance(node.get('integrity'), dict):
+                    self.integrity[index] = node['integrity']
+            else:
+                # Directory exhausted: its subtree ends here
+                stack.pop()
+                self.ends[parent] = len(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def entry(self, index):
+        """Return the ASAREntry for an index."""
+        return ASAREntry(self.offsets[index], self.sizes[index], self.flags[index])
+    
+    def children(self, index):
+        """Yield the indexes of the entries directly inside a directory."""
+        child = index + 1
+        end = self.ends[index]
+        while child < end:
+            yield child
+            child = self.ends[child]
+    
+    def find(self, path):
+        """Return the index of a normalized path ('' is the root), or -1."""
+        index = 0
+        for part in path.split('/') if path else []:
+            if not self.flags[index] & self.FLAG_DIRECTORY:
+                return -1
+            names = self._lookup.get(index)
+            if names is None:
+                names = {self.names[child]: child for child in self.children(index)}
+                self._lookup[index] = names
+            index = names.get(part, -1)
+            if index < 0:
+                return -1
+        return index
+    
+    def path(self, index):
+        """Rebuild the '/'-separated archive path of an index."""
+        parts = []
+        while index > 0:
+            parts.append(self.names[index])
+            index = self.parents[index]
+        return '/'.join(reversed(parts))
+    
+    def iter_paths(self, files_only=False):
+        """Yield (index, path) for entries except the root, in index order.
+        
+        Args:
+            files_only (bool): Skip directories and links
+        """
+        directory = self.FLAG_DIRECTORY
+        skip = self.FLAG_DIRECTORY | self.FLAG_LINK if files_only else 0
+        # Paths are only materialized for directories (as prefixes)
+        prefixes = {0: ''}
+        rows = zip(self.names, self.parents, self.flags)
+        next(rows)  # root
+        for index, (name, parent, flag) in enumerate(rows, 1):
+            prefix = prefixes[parent]
+            path = prefix + '/' + name if prefix else name
+            if flag & directory:
+                prefixes[index] = path
+            if not flag & skip:
+                yield index, path
+    
+    def iter_files(self):
+        """Yield (index, path) for every file entry (not directories or links)."""
+        return self.iter_paths(files_only=True)
+    
+    def add(self, parent, name, flags=0, size=0):
+        """Append an entry to an index that is being built (ASARPacker).
+        
+        Entries must be added depth-first: everything inside a directory
+        is added right after it, and close() ends its subtree.
+        
+        Args:
+            parent (int): Index of the containing directory
+            name (str): Leaf name of the entry
+            flags (int): FLAG_* bits
+            size (int): File size; the offset is assigned later
+            
+        Returns:
+            int: Index of the new entry
+        """
+        index = len(self.names)
+        self.names.append(sys.intern(name))
+        self.parents.append(parent)
+        self.ends.append(index + 1)
+        self.offsets.append(0)
+        self.sizes.append(size)
+        self.flags.append(flags)
+        return index
+    
+    def close(self, index):
+        """End the subtree of a directory added with add()."""
+        self.ends[index] = len(self.names)
+    
+    def to_json(self):
+        """Serialize the index as header JSON.
+        
+        The output is byte-for-byte what json.dumps gives for the same tree
+        as nested dicts with separators=(',', ':') and ensure_ascii=False
+        (the asar tool's format), so ASARPatcher can patch archives packed
+        from an index. File nodes are written as size, offset or unpacked,
+        executable, integrity; only the integrity dicts go through json.
+        
+        Returns:
+            bytes: UTF-8 encoded header JSON
+        """
+        encode = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+        integrity = self.integrity or {}
+        pieces = ['{"files":{']
+        open_dirs = [0]
+        first = True
+        for index, (name, flag) in enumerate(zip(self.names, self.flags)):
+            if not index:
+                continue
+            # Close the directories whose subtree ended
+            while self.ends[open_dirs[-1]] <= index:
+                open_dirs.pop()
+                pieces.append('}}')
+                first = False
+            if not first:
+                pieces.append(',')
+            pieces.append(encode(name))
+            if flag & self.FLAG_DIRECTORY:
+                pieces.append(':{"files":{')
+                open_dirs.append(index)
+                first = True
+                continue
+            first = False
+            if flag & self.FLAG_LINK:
+                pieces.append(':{"link":' + encode(self.links[index]) + '}')
+                continue
+            node = ':{"size":%d' % self.sizes[index]
+            if flag & self.FLAG_UNPACKED:
+                node += ',"unpacked":true'
+            else:
+                node += ',"offset":"%d"' % self.offsets[index]
+            if flag & self.FLAG_EXECUTABLE:
+                node += ',"executable":true'
+            if index in integrity:
+                node += ',"integrity":' + encode(integrity[index])
+            pieces.append(node + '}')
+        pieces.append('}}' * len(open_dirs))
+        return ''.join(pieces).encode('utf-8')
+    
+    def save(self, file_path, meta):
+        """Write the index to a binary file, replacing it atomically.
+        
+        Layout: magic, then little-endian uint32 lengths of the metadata
+        JSON, the entry count, the name table and the links JSON, followed
+        by those sections and the raw parents/ends/offsets/sizes/flags
+        arrays. Names are stored NUL-separated.
+        
+        Args:
+            file_path (str): Destination file
+            meta (dict): JSON-serializable data stored alongside the index,
+                e.g. what the index was built from
+                
+        Raises:
+            ValueError: If a name contains a NUL character
+        """
+        if any('\0' in name for name in self.names):
+            raise ValueError("Entry name contains NUL, index can't be saved")
+        meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+        names_bytes = '\0'.join(self.names).encode('utf-8')
+        links_bytes = json.dumps(self.links, separators=(',', ':')).encode('utf-8')
+        
+        arrays = [self.parents, self.ends, self.offsets, self.sizes, self.flags]
+        if sys.byteorder != 'little':
+            arrays = [array(values.typecode, values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        
+        temp_path = file_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(self.FILE_MAGIC)
+            f.write(struct.pack('<4I', len(meta_bytes), len(self.names), len(names_bytes), len(links_bytes)))
+            f.write(meta_bytes)
+            f.write(names_bytes)
+            f.write(links_bytes)
+            for values in arrays:
+                f.write(values.tobytes())
+        os.replace(temp_path, file_path)
+    
+    @staticmethod
+    def load(file_path):
+        """Read an index written by save().
+        
+        Args:
+            file_path (str): File written by save()
+            
+        Returns:
+            tuple: (ASARIndex, meta dict)
+            
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file is not a saved index or is truncated
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        magic = ASARIndex.FILE_MAGIC
+        if not data.startswith(magic) or len(data) < len(magic) + 16:
+            raise ValueError("Not a saved ASAR index")
+        meta_len, count, names_len, links_len = struct.unpack_from('<4I', data, len(magic))
+        position = len(magic) + 16
+        
+        def take(size):
+            nonlocal position
+            if position + size > len(data):
+                raise ValueError("Saved ASAR index is truncated")
+            piece = data[position:position + size]
+            position += size
+            return piece
+        
+        meta = json.loads(take(meta_len).decode('utf-8'))
+        names = list(map(sys.intern, take(names_len).decode('utf-8').split('\0')))
+        links = {int(key): target for key, target in json.loads(take(links_len).decode('utf-8')).items()}
+        if len(names) != count:
+            raise ValueError("Saved ASAR index name table doesn't match its entry count")
+        
+        index = ASARIndex.__new__(ASARIndex)
+        index.names = names
+        index.links = links
+        index.integrity = None
+        index._lookup = {}
+        for attribute, typecode in (('parents', 'i'), ('ends', 'i'), ('offsets', 'q'),
+                                    ('sizes', 'q'), ('flags', 'B')):
+            values = array(typecode)
+            values.frombytes(take(count * values.itemsize))
+            if sys.byteorder != 'little':
+                values.byteswap()
+            setattr(index, attribute, values)
+        return index, meta
+
+
 class ASARExtractor:
     """Extract ASAR archives using pure Python.
     
@@ -41,14 +410,35 @@ class ASARExtractor:
     # Constant for ASAR header metadata size (8 bytes)
     HEADER_SIZE = 8  # First 8 bytes contain header size info
     
+    # Largest slice handed to a single write/copy call during zero-copy extraction
+    COPY_CHUNK_SIZE = 8 * 1024 * 1024
+    
+    # Writer threads used by extract() when no worker count is given
+    DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+    
+    # Sidecar written into every extraction: where each file came from in the
+    # source archive, so ASARPacker can splice unchanged entries back in
+    MANIFEST_NAME = '.asar-manifest.json'
+    
+    # Checkpoint journal kept in the output folder while an extraction runs;
+    # its presence means the folder is incomplete
+    JOURNAL_NAME = '.asar-journal'
+    
+    # Bytes hashed from each sampled region by fingerprint()
+    FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+    
+    # Block size Electron uses for integrity hashes when the header omits it
+    INTEGRITY_BLOCK_SIZE = 4 * 1024 * 1024
+    
     @staticmethod
-    def extract(asar_path, output_dir):
+    def extract(asar_path, output_dir, zero_copy=True, workers=None, progress_callback=None,
+                include=None, exclude=None, verify=False, unpacked_dir=None):
         """Extract an ASAR file to the specified directory.
         
         Main entry point for ASAR extraction. This method:
         1. Reads the ASAR header (which is JSON)
         2. Parses the JSON to get file structure and offsets
-        3. Recursively extracts all files to the output directory
+        3. Flattens the tree and extracts all files on a writer pool
         
         ASAR Format Layout:
         [0-3]   Offset size (always 4)
@@ -56,16 +446,58 @@ class ASARExtractor:
         [8+]    Header (JSON)
         [end]   File data (referenced by offsets in JSON)
         
+        With zero_copy enabled (the default) the archive is memory-mapped once
+        and each entry is copied with os.copy_file_range/os.sendfile where the
+        kernel supports it, or written from memoryview slices of the mapping.
+        Entries are never loaded into Python bytes objects, so peak memory
+        stays flat regardless of entry size.
+        
+        Selective extraction: include/exclude take glob patterns matched
+        against archive paths ('static/js/main.*.js', 'assets/musics/*').
+        A pattern matching a directory applies to everything under it. Only
+        matching files are written; the directory tree is still created and
+        the skipped entries are recorded in the manifest, so ASARPacker pulls
+        them straight from this archive on repack.
+        
+        Entries flagged "unpacked" are stored beside the archive in
+        <asar_path>.unpacked (or unpacked_dir, e.g. the launcher's folder
+        when extracting a backup copy of its app.asar); they are hardlinked
+        from there (or copied when linking isn't possible) into the same
+        place in output_dir. The include/exclude patterns apply to them too.
+        When there is no such folder they are left out and recorded in the
+        manifest like any other entry that wasn't extracted.
+        
+        Crash safety: every finished file is appended to a journal in
+        output_dir. If the process dies, calling extract() again with the
+        same arguments skips the journaled files (after checking their size
+        and mtime) and only writes the rest. Once all entries are on disk
+        and verified, the manifest is written and the journal removed, so
+        a folder without a journal holds a complete extraction. Entries
+        with integrity metadata are hashed after writing (resumed ones
+        included), so a file torn at the right size is caught and removed;
+        the next run extracts it again.
+        
         Args:
             asar_path (str): Path to the .asar file to extract
             output_dir (str): Directory where files should be extracted
+            zero_copy (bool): Use mmap/kernel copies instead of read() buffers
+            workers (int): Writer threads (default DEFAULT_WORKERS, 1 = serial)
+            progress_callback (function): Optional callback for progress updates
+                Called as: progress_callback(current, total, status_message)
+            include (list): Glob patterns to extract (default: everything)
+            exclude (list): Glob patterns to leave in the archive
+            verify (bool): Check Electron integrity hashes before extracting
+            unpacked_dir (str): Folder holding the archive's unpacked
+                entries (default: <asar_path>.unpacked)
             
         Returns:
             bool: True if extraction succeeded
             
         Raises:
             FileNotFoundError: If asar_path doesn't exist
-            ValueError: If ASAR header is invalid or corrupt
+            ValueError: If ASAR header is invalid or corrupt, if some entries
+                could not be written (run again to resume), or (with verify)
+                an entry doesn't match its integrity hashes
         """
         try:
             print(f"[ASARExtractor] Starting extraction from: {asar_path}")
@@ -82,48 +514,110 @@ class ASARExtractor:
             # Create output directory if it doesn't exist
             os.makedirs(output_dir, exist_ok=True)
             
+            if unpacked_dir is None:
+                unpacked_dir = asar_path + '.unpacked'
+            if not os.path.isdir(unpacked_dir):
+                # A copied archive (e.g. a backup) without its sibling folder
+                unpacked_dir = None
+            
             with open(asar_path, 'rb') as f:
-                # Read and parse the header metadata (first 8 bytes)
-                # Format: [offset_size (4 bytes)][header_size (4 bytes)]
-                header_metadata = f.read(8)
-                offset_size = struct.unpack('<I', header_metadata[0:4])[0]  # Little-endian unsigned int
-                header_size = struct.unpack('<I', header_metadata[4:8])[0]  # Size of header data
+                # Read and parse the header (size fields + JSON file tree)
+                header, header_size = ASARExtractor._read_header(f)
+                
+                print(f"[ASARExtractor] Header size: {header_size}, files: {len(header.get('files', {}))}")
                 
-                print(f"[ASARExtractor] Offset size: {offset_size}, Header size: {header_size}")
+                # Calculate where the actual file data starts
+                # It comes after the 8-byte metadata and the header
+                data_offset = 8 + header_size
                 
-                # Read the header data (JSON containing file structure and offsets)
-                header_bytes = f.read(header_size)
+                if verify:
+                    ASARExtractor._verify_entries(f, ASARIndex(header.get('files', {}), keep_integrity=True),
+                                                  data_offset, unpacked_dir, workers=workers)
                 
-                # Find where the JSON object starts
-                # We search for the first '{' character to locate the JSON
-                json_start = header_bytes.find(b'{')
-                print(f"[ASARExtractor] JSON starts at offset: {json_start}")
+                # Map the archive once; every entry is a slice of this mapping
+                data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if zero_copy else None
                 
-                if json_start < 0:
-                    raise ValueError("No JSON object found in ASAR header")
+                # Filled by the writers: relative path -> [offset, size, mtime_ns]
+                manifest_entries = {}
                 
-                # Extract the complete JSON object from the header
-                # This is non-trivial because we need to handle escaped characters
-                json_data = ASARExtractor._extract_json_object(header_bytes[json_start:])
+                # Entries materialized from the .unpacked folder
+                unpacked_entries = []
                 
-                print(f"[ASARExtractor] Extracted {len(json_data)} bytes of JSON")
-                print(f"[ASARExtractor] JSON preview: {json_data[:100]}")
+                # Entries left in the archive: relative path -> header node
+                external_entries = {}
+                files_dict = header.get('files', {})
+                if include or exclude or unpacked_dir is None:
+                    files_dict = ASARExtractor._select_entries(files_dict, include, exclude, external_entries,
+                                                               unpacked=unpacked_dir is not None)
+                    if include or exclude:
+                        print(f"[ASARExtractor] Selective extraction: {len(external_entries)} files left in archive")
+                    elif external_entries:
+                        print(f"[ASARExtractor] No .unpacked folder: {len(external_entries)} unpacked files not extracted")
                 
-                # Parse the JSON to get the file structure
-                try:
-                    header = json.loads(json_data.decode('utf-8'))
-                except UnicodeDecodeError as e:
-                    print(f"[ASARExtractor] Failed to decode JSON: {e}")
-                    raise ValueError(f"Failed to decode ASAR header JSON: {e}")
+                # Keep only the compact index while files are written (plus
+                # the integrity metadata, to check the files once written)
+                index = ASARIndex(files_dict, keep_integrity=True)
+                del header, files_dict
                 
-                print(f"[ASARExtractor] Header parsed, files: {len(header.get('files', {}))}")
+                # Resume from the journal of an interrupted run, if it matches
+                journal_path = os.path.join(output_dir, ASARExtractor.JOURNAL_NAME)
+                # No path: a copy with preserved size/mtime (a fresh backup of
+                # the same launcher archive) may resume the extraction too
+                journal_key = {
+                    'size': asar_size,
+                    'mtime_ns': os.stat(asar_path).st_mtime_ns,
+                    'include': list(include or []),
+                    'exclude': list(exclude or [])
+                }
+                completed = ASARExtractor._read_journal(journal_path, journal_key, output_dir)
+                resuming = completed is not None
+                if completed:
+                    print(f"[ASARExtractor] Resuming: {len(completed)} files already extracted")
+                    for current_path, (offset, size, mtime_ns) in completed.items():
+                        if offset is None:
+                            unpacked_entries.append(current_path)
+                        else:
+                            manifest_entries[current_path] = [offset, size, mtime_ns]
                 
-                # Calculate where the actual file data starts
-                # It comes after the 8-byte metadata and the header
-                data_offset = 8 + header_size
+                journal_f = open(journal_path, 'a' if completed else 'w', encoding='utf-8')
+                journal_lock = threading.Lock()
+                if not completed:
+                    journal_f.write(json.dumps(journal_key) + '\n')
+                    journal_f.flush()
+                
+                def journal(current_path, offset, size, mtime_ns):
+                    line = json.dumps([current_path.replace(os.sep, '/'), offset, size, mtime_ns])
+                    with journal_lock:
+                        # Flushed per entry: survives the process being killed
+                        journal_f.write(line + '\n')
+                        journal_f.flush()
                 
-                # Extract all files from the archive
-                ASARExtractor._extract_files(f, header.get('files', {}), output_dir, data_offset)
+                try:
+                    # Extract the selected files from the archive
+                    ASARExtractor._extract_files(
+                        f,
+                        index,
+                        output_dir,
+                        data_offset,
+                        data_map=data_map,
+                        workers=workers,
+                        progress_callback=progress_callback,
+                        manifest_entries=manifest_entries,
+                        unpacked_dir=unpacked_dir,
+                        unpacked_entries=unpacked_entries,
+                        completed=set(completed or ()) if resuming else None,
+                        journal=journal
+                    )
+                finally:
+                    journal_f.close()
+                    if data_map is not None:
+                        data_map.close()
+                
+                ASARExtractor._verify_extraction(index, output_dir, workers=workers)
+                ASARExtractor._write_manifest(output_dir, asar_path, data_offset, manifest_entries,
+                                              external_entries, unpacked_entries, unpacked_dir)
+                # Everything is on disk: the folder is complete from here on
+                os.remove(journal_path)
                 
                 print(f"[ASARExtractor] Extraction complete")
                 return True
@@ -134,6 +628,431 @@ class ASARExtractor:
             traceback.print_exc()
             raise
     
+    @staticmethod
+    def _read_journal(journal_path, journal_key, output_dir):
+        """Load the entries an interrupted extraction already finished.
+        
+        Only entries whose file still has the journaled size and mtime are
+        returned. A torn last line (process killed mid-write) is ignored.
+        
+        Args:
+            journal_path (str): Journal file in the output folder
+            journal_key (dict): Source archive and filters of this run
+            output_dir (str): Extraction directory
+            
+        Returns:
+            dict: Relative path -> (offset, size, mtime_ns) with offset None
+                for unpacked entries; empty if the journal belongs to a
+                different run. None if there is no journal at all.
+        """
+        try:
+            journal_f = open(journal_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        
+        completed = {}
+        with journal_f:
+            try:
+                if json.loads(journal_f.readline()) != journal_key:
+                    print("[ASARExtractor] Journal is from a different archive or filter, starting over")
+                    return completed
+                for line in journal_f:
+                    current_path, offset, size, mtime_ns = json.loads(line)
+                    try:
+                        info = os.stat(os.path.join(output_dir, current_path))
+                    except OSError:
+                        continue
+                    if info.st_size == size and info.st_mtime_ns == mtime_ns:
+                        completed[current_path] = (offset, size, mtime_ns)
+            except ValueError:
+                # Torn write at the end of the journal - keep what parsed
+                pass
+        return completed
+    
+    @staticmethod
+    def _verify_extraction(index, output_dir, workers=None):
+        """Check that every file in the index was extracted intact.
+        
+        Every file must exist with the right size. Files whose header entry
+        carries integrity metadata are then hashed on the _verify_entries
+        pool, so a file torn mid-write (or changed since it was journaled)
+        is caught even at the right size; such files are deleted so the next
+        run extracts them again. Files without integrity metadata only get
+        the size check.
+        
+        Args:
+            index (ASARIndex): Entries that were extracted, built with
+                keep_integrity=True
+            output_dir (str): Extraction directory
+            workers (int): Hashing threads (default DEFAULT_WORKERS)
+            
+        Raises:
+            ValueError: If any file is missing, has the wrong size or doesn't
+                match its hashes
+        """
+        bad = []
+        for position, current_path in index.iter_files():
+            try:
+                if os.stat(os.path.join(output_dir, current_path)).st_size == index.sizes[position]:
+                    continue
+            except OSError:
+                pass
+            bad.append(current_path)
+        if bad:
+            listed = ', '.join(bad[:5])
+            more = f" and {len(bad) - 5} more" if len(bad) > 5 else ''
+            raise ValueError(f"Extraction incomplete, {len(bad)} files missing or truncated "
+                             f"(run again to resume): {listed}{more}")
+        if index.integrity:
+            try:
+                ASARExtractor._verify_entries(None, index, 0, None, workers=workers,
+                                              extracted_dir=output_dir)
+            except ValueError as e:
+                raise ValueError(f"Extraction incomplete, {e} (run again to resume)") from e
+    
+    @staticmethod
+    def verify_integrity(asar_path, workers=None, unpacked_dir=None):
+        """Check every entry against the integrity hashes in the header.
+        
+        Args:
+            asar_path (str): Path to the .asar file
+            workers (int): Hashing threads (default DEFAULT_WORKERS)
+            unpacked_dir (str): Folder holding the unpacked entries (default:
+                <asar_path>.unpacked); entries are skipped if it is missing
+            
+        Returns:
+            int: Number of entries verified (entries without integrity
+                metadata are skipped)
+            
+        Raises:
+            ValueError: If any entry doesn't match its hashes
+        """
+        with open(asar_path, 'rb') as f:
+            header, header_size = ASARExtractor._read_header(f)
+            index = ASARIndex(header.get('files', {}), keep_integrity=True)
+            del header
+            unpacked_dir = unpacked_dir or asar_path + '.unpacked'
+            return ASARExtractor._verify_entries(f, index, 8 + header_size,
+                                                 unpacked_dir if os.path.isdir(unpacked_dir) else None,
+                                                 workers=workers)
+    
+    @staticmethod
+    def _verify_entries(file_handle, index, data_offset, unpacked_dir, workers=None, extracted_dir=None):
+        """Hash entries block by block on a thread pool and compare with the header.
+        
+        Every 4 MB integrity block is an independent job, so a single large
+        entry is spread over all workers. hashlib releases the GIL while
+        hashing memoryview slices of the archive mapping, so the threads
+        run in parallel and verification proceeds at disk speed. Multi-block
+        entries get one extra job for the whole-file hash.
+        
+        With extracted_dir, the files extracted there are hashed instead of
+        the archive (file_handle, data_offset and unpacked_dir are unused),
+        and any file that fails is deleted so a resumed extraction writes it
+        again.
+        
+        Args:
+            file_handle (file): Open binary file handle for the archive
+            index (ASARIndex): Header index built with keep_integrity=True
+            data_offset (int): Offset where file data starts in the archive
+            unpacked_dir (str): Sibling directory holding unpacked entries,
+                or None to skip them
+            workers (int): Hashing threads (default DEFAULT_WORKERS)
+            extracted_dir (str): Extraction directory to check instead of
+                the archive
+            
+        Returns:
+            int: Number of entries verified
+            
+        Raises:
+            ValueError: If any entry doesn't match its hashes
+        """
+        # (path, source, start, size, expected hex digests)
+        jobs = []
+        failed = set()
+        verified = 0
+        for position, current_path in index.iter_files():
+            integrity = index.integrity.get(position)
+            if not integrity or str(integrity.get('algorithm', '')).upper() != 'SHA256':
+                continue
+            
+            size = index.sizes[position]
+            if extracted_dir is not None:
+                source = os.path.join(extracted_dir, *current_path.split('/'))
+                start = 0
+            elif index.flags[position] & ASARIndex.FLAG_UNPACKED:
+                if unpacked_dir is None:
+                    continue
+                source = os.path.join(unpacked_dir, *current_path.split('/'))
+                start = 0
+            else:
+                source = None
+                start = data_offset + index.offsets[position]
+            
+            block_size = int(integrity.get('blockSize', ASARExtractor.INTEGRITY_BLOCK_SIZE))
+            blocks = integrity.get('blocks', [])
+            # Some asar versions end every file with a (possibly empty)
+            # trailing block, others only hash non-empty blocks
+            if len(blocks) not in ((size + block_size - 1) // block_size, size // block_size + 1):
+                failed.add(current_path)
+                continue
+            for block_index, expected in enumerate(blocks):
+                block_start = min(block_index * block_size, size)
+                expected_hashes = [expected]
+                if len(blocks) == 1:
+                    # A single block is the whole file
+                    expected_hashes.append(integrity.get('hash'))
+                jobs.append((current_path, source, start + block_start,
+                             min(block_size, size - block_start), expected_hashes))
+            if len(blocks) != 1:
+                jobs.append((current_path, source, start, size, [integrity.get('hash')]))
+            verified += 1
+        
+        if not jobs and not failed:
+            return verified
+        
+        # Extracted files are read from disk, only the archive is mapped
+        data_map = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) if extracted_dir is None else None
+        
+        def check(job):
+            current_path, source, start, size, expected_hashes = job
+            digest = hashlib.sha256()
+            try:
+                if source is None:
+                    with memoryview(data_map) as view, view[start:start + size] as piece:
+                        if len(piece) != size:
+                            return current_path
+                        digest.update(piece)
+                else:
+                    with open(source, 'rb') as in_f:
+                        in_f.seek(start)
+                        remaining = size
+                        while remaining:
+                            piece = in_f.read(min(ASARExtractor.COPY_CHUNK_SIZE, remaining))
+                            if not piece:
+                                return current_path
+                            digest.update(piece)
+                            remaining -= len(piece)
+            except OSError:
+                return current_path
+            hexdigest = digest.hexdigest()
+            if any(hexdigest != expected for expected in expected_hashes):
+                return current_path
+            return None
+        
+        workers = max(1, workers or ASARExtractor.DEFAULT_WORKERS)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asar-verify') as executor:
+                for bad_path in executor.map(check, jobs):
+                    if bad_path is not None:
+                        failed.add(bad_path)
+        finally:
+            if data_map is not None:
+                data_map.close()
+        
+        if failed:
+            if extracted_dir is not None:
+                for bad_path in failed:
+                    try:
+                        os.remove(os.path.join(extracted_dir, *bad_path.split('/')))
+                    except OSError:
+                        pass
+            listed = ', '.join(sorted(failed)[:5])
+            more = f" and {len(failed) - 5} more" if len(failed) > 5 else ''
+            raise ValueError(f"Integrity check failed for {len(failed)} entries: {listed}{more}")
+        checked = 'extracted files' if extracted_dir is not None else 'entries'
+        print(f"[ASARExtractor] Verified integrity of {verified} {checked} ({len(jobs)} hash jobs)")
+        return verified
+    
+    @staticmethod
+    def fingerprint(asar_path):
+        """Cheaply identify an archive's contents without hashing all of it.
+        
+        Combines size and mtime with a SHA-256 over sampled regions: the
+        start (which holds the header, so any layout change shows up), the
+        middle and the end. Reading three small samples keeps this fast even
+        for very large launcher archives.
+        
+        Args:
+            asar_path (str): Path to the .asar file
+            
+        Returns:
+            str: Hex fingerprint suitable for use as a directory name
+        """
+        info = os.stat(asar_path)
+        digest = hashlib.sha256(f"{info.st_size}:{info.st_mtime_ns}".encode('ascii'))
+        sample = ASARExtractor.FINGERPRINT_SAMPLE_SIZE
+        with open(asar_path, 'rb') as f:
+            for position in (0, max(0, info.st_size // 2 - sample // 2), max(0, info.st_size - sample)):
+                f.seek(position)
+                digest.update(f.read(sample))
+        return digest.hexdigest()[:24]
+    
+    @staticmethod
+    def clone_tree(source_dir, target_dir):
+        """Materialize a copy of an extraction without copying file data.
+        
+        Files are hardlinked when the filesystem allows it and otherwise
+        copied in-kernel (a reflink on copy-on-write filesystems) with their
+        mtimes preserved, so extraction manifests stay valid. Small RUIE
+        sidecar files at the top level are always copied, never linked.
+        
+        Writers must replace files (write a new file, then os.replace or
+        unlink first) rather than rewrite them in place, or a hardlinked
+        source would change too.
+        
+        Args:
+            source_dir (str): Pristine extraction to clone
+            target_dir (str): Directory to create
+            
+        Returns:
+            int: Number of files materialized
+        """
+        file_count = 0
+        can_link = hasattr(os, 'link')
+        for root, dirs, files in os.walk(source_dir):
+            rel_root = os.path.relpath(root, source_dir)
+            dest_root = target_dir if rel_root == '.' else os.path.join(target_dir, rel_root)
+            os.makedirs(dest_root, exist_ok=True)
+            for name in files:
+                source_file = os.path.join(root, name)
+                dest_file = os.path.join(dest_root, name)
+                sidecar = rel_root == '.' and name.startswith('.')
+                if can_link and not sidecar:
+                    try:
+                        os.link(source_file, dest_file)
+                        file_count += 1
+                        continue
+                    except OSError:
+                        # Cross-device or unsupported filesystem - copy instead
+                        can_link = False
+                info = os.stat(source_file)
+                with open(source_file, 'rb') as in_f, open(dest_file, 'wb', buffering=0) as out_f:
+                    ASARExtractor._copy_range(in_f, None, out_f, 0, info.st_size)
+                os.utime(dest_file, ns=(info.st_atime_ns, info.st_mtime_ns))
+                file_count += 1
+        return file_count
+    
+    @staticmethod
+    def _write_manifest(output_dir, asar_path, data_offset, entries, external=None, unpacked=None,
+                        unpacked_dir=None):
+        """Record where each extracted file lives in the source archive.
+        
+        Args:
+            output_dir (str): Extraction directory
+            asar_path (str): Archive the files were extracted from
+            data_offset (int): Offset where file data starts in the archive
+            entries (dict): Relative path -> [offset, size, mtime_ns]
+            external (dict): Relative path -> header node for files that were
+                not extracted and must be packed from the source archive
+            unpacked (list): Relative paths of entries stored in .asar.unpacked
+            unpacked_dir (str): Folder the unpacked entries came from; the
+                packer takes unextracted unpacked entries from there
+        """
+        info = os.stat(asar_path)
+        manifest = {
+            'version': 1,
+            'source': {
+                'path': os.path.abspath(asar_path),
+                'size': info.st_size,
+                'mtime_ns': info.st_mtime_ns,
+                'data_offset': data_offset
+            },
+            'entries': entries
+        }
+        if external:
+            manifest['external'] = external
+        if unpacked:
+            manifest['unpacked'] = sorted(unpacked)
+        if unpacked_dir:
+            manifest['source']['unpacked'] = os.path.abspath(unpacked_dir)
+        with open(os.path.join(output_dir, ASARExtractor.MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+    
+    @staticmethod
+    def load_manifest(extracted_dir):
+        """Load the source manifest written by extract().
+        
+        Args:
+            extracted_dir (str): Extraction directory
+            
+        Returns:
+            dict: Manifest, or None if missing or unreadable
+        """
+        manifest_path = os.path.join(extracted_dir, ASARExtractor.MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != 1:
+            return None
+        return manifest
+    
+    @staticmethod
+    def _read_header(file_handle):
+        """Read and parse the ASAR header from the start of an archive.
+        
+        Args:
+            file_handle (file): ASAR file opened in binary mode, positioned at 0
+            
+        Returns:
+            tuple: (header dict, header_size) - file data starts at 8 + header_size
+            
+        Raises:
+            ValueError: If ASAR header is invalid or corrupt
+        """
+        # Read and parse the header metadata (first 8 bytes)
+        # Format: [offset_size (4 bytes)][header_size (4 bytes)]
+        header_metadata = file_handle.read(8)
+        if len(header_metadata) < 8:
+            raise ValueError("File is too small to be an ASAR archive")
+        header_size = struct.unpack('<I', header_metadata[4:8])[0]  # Size of header data
+        
+        # Read the header data (JSON containing file structure and offsets)
+        header_bytes = file_handle.read(header_size)
+        if len(header_bytes) < header_size:
+            raise ValueError("ASAR header is truncated")
+        
+        # The header is a Chromium Pickle holding one string:
+        # [payload size (4 bytes)][JSON length (4 bytes)][JSON][padding]
+        # so the JSON can be sliced out directly instead of brace-scanned
+        json_length = struct.unpack_from('<I', header_bytes, 4)[0] if header_size >= 8 else 0
+        if 0 < json_length <= header_size - 8 and header_bytes[8:9] == b'{':
+            json_data = memoryview(header_bytes)[8:8 + json_length]
+        else:
+            # Non-standard framing: fall back to scanning for the JSON object
+            json_start = header_bytes.find(b'{')
+            if json_start < 0:
+                raise ValueError("No JSON object found in ASAR header")
+            json_data = ASARExtractor._extract_json_object(header_bytes[json_start:])
+        
+        # Parse the JSON to get the file structure
+        header = ASARExtractor._loads_header(json_data)
+        
+        return header, header_size
+    
+    @staticmethod
+    def _loads_header(json_data):
+        """Decode header JSON, using orjson when it is installed.
+        
+        Args:
+            json_data (bytes | memoryview): UTF-8 encoded JSON
+            
+        Returns:
+            dict: Parsed header
+            
+        Raises:
+            ValueError: If the JSON is not valid UTF-8 or not valid JSON
+        """
+        if orjson is not None:
+            return orjson.loads(json_data)
+        try:
+            return json.loads(str(json_data, 'utf-8'))
+        except UnicodeDecodeError as e:
+            print(f"[ASARExtractor] Failed to decode JSON: {e}")
+            raise ValueError(f"Failed to decode ASAR header JSON: {e}")
+    
     @staticmethod
     def _extract_json_object(data):
         """Extract a complete JSON object from bytes, handling escapes.
@@ -193,66 +1112,1514 @@ class ASARExtractor:
         raise ValueError("Could not find end of JSON object")
     
     @staticmethod
-    def _extract_files(file_handle, files_dict, output_dir, data_offset, path_prefix=''):
-        """Recursively extract files and directories from ASAR.
+    def _matches_any(path, patterns):
+        """Check an archive path, or any directory above it, against glob patterns.
+        
+        Args:
+            path (str): Archive path using '/' separators
+            patterns (list): fnmatch-style glob patterns
+            
+        Returns:
+            bool: True if any pattern matches
+        """
+        candidate = path
+        while candidate:
+            for pattern in patterns:
+                if fnmatch.fnmatchcase(candidate, pattern):
+                    return True
+            candidate = candidate.rpartition('/')[0]
+        return False
+    
+    @staticmethod
+    def _select_entries(files_dict, include, exclude, external, unpacked=True):
+        """Prune a header tree down to the files selected for extraction.
         
-        This method traverses the file structure described in the ASAR header
-        and extracts all files to disk. It handles nested directories by
-        recursively calling itself.
+        Directories and links are always kept so the extraction mirrors the
+        archive layout. Files that are filtered out are removed from the
+        returned tree and recorded in external.
         
         Args:
-            file_handle (file): Open file handle for the ASAR file
             files_dict (dict): Dictionary of files/dirs from ASAR header
+            include (list): Glob patterns to extract, or None for everything
+            exclude (list): Glob patterns to skip, or None
+            external (dict): Receives relative path -> header node for every
+                file that was filtered out
+            unpacked (bool): Whether the .unpacked folder is available; if
+                not, unpacked entries are left out as well
+                
+        Returns:
+            dict: Pruned copy of files_dict
+        """
+        selected = {}
+        stack = [('', files_dict, selected)]
+        while stack:
+            prefix, level, target = stack.pop()
+            for name, file_info in level.items():
+                if not isinstance(file_info, dict):
+                    continue
+                current_path = f"{prefix}/{name}" if prefix else name
+                if 'files' in file_info:
+                    target[name] = {'files': {}}
+                    stack.append((current_path, file_info['files'], target[name]['files']))
+                    continue
+                if 'link' in file_info:
+                    target[name] = file_info
+                    continue
+                wanted = (not include or ASARExtractor._matches_any(current_path, include)) and \
+                    not (exclude and ASARExtractor._matches_any(current_path, exclude)) and \
+                    (unpacked or not file_info.get('unpacked'))
+                if wanted:
+                    target[name] = file_info
+                else:
+                    external[current_path] = copy.deepcopy(file_info)
+        return selected
+    
+    @staticmethod
+    def _extract_files(file_handle, index, output_dir, data_offset, data_map=None,
+                       workers=None, progress_callback=None, manifest_entries=None,
+                       unpacked_dir=None, unpacked_entries=None, completed=None, journal=None):
+        """Extract files and directories from ASAR using a writer pool.
+        
+        Every directory in the index is created up front in one pass, and
+        file writes are then dispatched to a bounded thread pool so slow
+        per-file overhead (antimalware on-write scans, NVMe queue depth)
+        overlaps instead of serializing.
+        
+        Args:
+            file_handle (file): Open file handle for the ASAR file
+            index (ASARIndex): Index of the entries to extract
             output_dir (str): Root output directory
             data_offset (int): Offset where file data starts in ASAR
-            path_prefix (str): Current directory path for recursion
+            data_map (mmap.mmap): Optional read-only mapping of the archive
+            workers (int): Number of writer threads (default DEFAULT_WORKERS)
+            progress_callback (function): Optional callback for progress updates
+                Called as: progress_callback(current, total, status_message)
+            manifest_entries (dict): Optional dict receiving, for every written
+                file, relative path -> [offset, size, mtime_ns]
+            unpacked_dir (str): Sibling .unpacked folder holding entries that
+                are not stored in the archive body (required if the index
+                has any)
+            unpacked_entries (list): Optional list receiving the relative
+                paths of unpacked entries that were materialized
+            completed (set): Relative paths already extracted by an earlier,
+                interrupted run; they are skipped and any other file found
+                in the way is replaced rather than overwritten
+            journal (function): Optional callback recording each finished file
+                Called as: journal(relative_path, offset, size, mtime_ns)
+                
+        Returns:
+            int: Number of files extracted (including completed ones)
         """
-        # Counter for progress logging
-        file_count = 0
+        flags = index.flags
+        skip = ASARIndex.FLAG_DIRECTORY | ASARIndex.FLAG_LINK
+        directory_count = sum(1 for flag in flags if flag & ASARIndex.FLAG_DIRECTORY) - 1
+        total = sum(1 for flag in flags if not flag & skip)
+        workers = max(1, workers or ASARExtractor.DEFAULT_WORKERS)
+        print(f"[ASARExtractor] {directory_count} directories, {total} files, {workers} writer(s)")
+        
+        # Create the whole directory tree before any writer starts
+        for position, current_path in index.iter_paths():
+            if flags[position] & ASARIndex.FLAG_DIRECTORY:
+                os.makedirs(os.path.join(output_dir, current_path), exist_ok=True)
+        
+        # Work items are generated lazily: (relative_path, offset, size) with
+        # offset None for entries stored in the .unpacked folder
+        files = (
+            (current_path,
+             None if flags[position] & ASARIndex.FLAG_UNPACKED else index.offsets[position],
+             index.sizes[position])
+            for position, current_path in index.iter_files()
+            if not completed or current_path not in completed
+        )
+        
+        # Only the buffered (non zero-copy) path shares the handle's file position
+        read_lock = threading.Lock()
         
-        # Process each file/directory in the current level
-        for name, file_info in files_dict.items():
-            # Build the full relative path
-            current_path = os.path.join(path_prefix, name) if path_prefix else name
-            # Build the full output filesystem path
+        def write_entry(entry):
+            current_path, offset, size = entry
             full_output_path = os.path.join(output_dir, current_path)
-            
-            if isinstance(file_info, dict):
-                # Check if this entry is a directory or a file
-                if 'files' in file_info:
-                    # It's a directory - create it and recursively extract contents
-                    os.makedirs(full_output_path, exist_ok=True)
-                    ASARExtractor._extract_files(
-                        file_handle,
-                        file_info['files'],
-                        output_dir,
-                        data_offset,
-                        current_path
-                    )
+            try:
+                if completed is not None:
+                    # Leftover from an interrupted run: may be half-written or
+                    # a hardlink into the .unpacked folder, so never write into it
+                    try:
+                        os.remove(full_output_path)
+                    except FileNotFoundError:
+                        pass
+                if offset is None:
+                    ASARExtractor._link_or_copy(os.path.join(unpacked_dir, current_path), full_output_path)
+                    if unpacked_entries is not None:
+                        unpacked_entries.append(current_path.replace(os.sep, '/'))
+                    if journal is not None:
+                        journal(current_path, None, size, os.stat(full_output_path).st_mtime_ns)
+                    return True
+                elif data_map is not None:
+                    # Copy the byte range without materializing it in Python
+                    with open(full_output_path, 'wb', buffering=0) as out_f:
+                        ASARExtractor._copy_range(file_handle, data_map, out_f, data_offset + offset, size)
                 else:
-                    # It's a file with offset and size metadata
-                    if 'offset' in file_info and 'size' in file_info:
-                        offset = int(file_info['offset'])
-                        size = int(file_info['size'])
-                        
-                        # Ensure parent directory exists
-                        parent_dir = os.path.dirname(full_output_path)
-                        if parent_dir and not os.path.exists(parent_dir):
-                            os.makedirs(parent_dir, exist_ok=True)
-                        
-                        try:
-                            # Seek to the file data and read it
-                            file_handle.seek(data_offset + offset)
-                            file_data = file_handle.read(size)
-                            
-                            # Write extracted file to disk
-                            # We write all data at once to minimize antimalware scanning delays
-                            with open(full_output_path, 'wb') as out_f:
-                                out_f.write(file_data)
-                            
-                            # Log progress (less frequently to reduce overhead)
+                    # Seek to the file data and read it
+                    with read_lock:
+                        file_handle.seek(data_offset + offset)
+                        file_data = file_handle.read(size)
+                    
+                    # Write extracted file to disk
+                    # We write all data at once to minimize antimalware scanning delays
+                    with open(full_output_path, 'wb') as out_f:
+                        out_f.write(file_data)
+                
+                # mtime is taken after the write so the packer can tell
+                # untouched files from edited ones
+                mtime_ns = os.stat(full_output_path).st_mtime_ns
+                if manifest_entries is not None:
+                    manifest_key = current_path.replace(os.sep, '/')
+                    manifest_entries[manifest_key] = [offset, size, mtime_ns]
+                if journal is not None:
+                    journal(current_path, offset, size, mtime_ns)
+                return True
+            except Exception as e:
+                print(f"[ASARExtractor] Failed to extract {current_path}: {e}")
+                return False
+        
+        # Counter for progress logging
+        file_count = len(completed) if completed else 0
+        
+        def report(done_count):
+            # Log progress (less frequently to reduce overhead)
+            if done_count % 100 == 0 or done_count == total:
+                print(f"[ASARExtractor] Progress: {done_count}/{total} files extracted")
+                if progress_callback:
+                    progress_callback(done_count, total, f"Extracted {done_count}/{total} files...")
+        
+        if workers == 1:
+            for entry in files:
+                if write_entry(entry):
+                    file_count += 1
+                    report(file_count)
+            return file_count
+        
+        # Keep a bounded number of writes in flight so huge archives don't
+        # queue tens of thousands of futures at once
+        max_pending = workers * 4
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asar-writer') as executor:
+            pending = set()
+            for entry in files:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future.result():
                             file_count += 1
-                            if file_count % 100 == 0:
-                                print(f"[ASARExtractor] Progress: {file_count} files extracted ({current_path})")
-                        except Exception as e:
-                            print(f"[ASARExtractor] Failed to extract {current_path}: {e}")
+                            report(file_count)
+                pending.add(executor.submit(write_entry, entry))
+            for future in as_completed(pending):
+                if future.result():
+                    file_count += 1
+                    report(file_count)
+        
+        return file_count
+    
+    @staticmethod
+    def _link_or_copy(source_file, dest_file):
+        """Hardlink a file into place, copying it when linking isn't possible.
+        
+        Args:
+            source_file (str): Existing file
+            dest_file (str): Path to create (must not exist)
+        """
+        if hasattr(os, 'link'):
+            try:
+                os.link(source_file, dest_file)
+                return
+            except OSError:
+                # Cross-device or unsupported filesystem - copy instead
+                pass
+        info = os.stat(source_file)
+        with open(source_file, 'rb') as in_f, open(dest_file, 'wb', buffering=0) as out_f:
+            ASARExtractor._copy_range(in_f, None, out_f, 0, info.st_size)
+        os.utime(dest_file, ns=(info.st_atime_ns, info.st_mtime_ns))
+    
+    @staticmethod
+    def _copy_range(file_handle, data_map, out_f, start, size):
+        """Copy a byte range of a file into an open output file.
+        
+        Tries the cheapest mechanism first:
+        1. os.copy_file_range - in-kernel copy (may reflink on CoW filesystems)
+        2. os.sendfile - in-kernel copy on Linux kernels without copy_file_range
+        3. memoryview slices of the mmap - no intermediate bytes objects
+           (or bounded read buffers when no mapping is given)
+        
+        Each step picks up where the previous one stopped, so a mechanism
+        failing halfway (e.g. EXDEV across filesystems) is harmless.
+        
+        Args:
+            file_handle (file): Open binary file handle for the source file
+            data_map (mmap.mmap): Optional read-only mapping of the source file
+            out_f (file): Unbuffered output file opened for writing
+            start (int): Absolute offset of the range in the source file
+            size (int): Number of bytes to copy
+            
+        Raises:
+            ValueError: If the source file ends before the range does
+        """
+        in_fd = file_handle.fileno()
+        out_fd = out_f.fileno()
+        position = start
+        end = start + size
+        chunk = ASARExtractor.COPY_CHUNK_SIZE
+        
+        kernel_copies = []
+        if hasattr(os, 'copy_file_range'):
+            kernel_copies.append(lambda count: os.copy_file_range(in_fd, out_fd, count, position))
+        if sys.platform.startswith('linux') and hasattr(os, 'sendfile'):
+            kernel_copies.append(lambda count: os.sendfile(out_fd, in_fd, position, count))
+        
+        for kernel_copy in kernel_copies:
+            try:
+                while position < end:
+                    copied = kernel_copy(min(chunk, end - position))
+                    if copied == 0:
+                        break
+                    position += copied
+            except OSError:
+                # Unsupported here (old kernel, cross-device, etc.) - try the next one
+                pass
+            if position >= end:
+                return
+        
+        if data_map is not None:
+            # Portable fallback: write straight out of the page cache via the mapping
+            with memoryview(data_map) as view:
+                while position < end:
+                    with view[position:min(position + chunk, end)] as piece:
+                        if not piece:
+                            break
+                        position += out_f.write(piece)
+        else:
+            # No mapping: stream through a bounded read buffer
+            file_handle.seek(position)
+            while position < end:
+                piece = file_handle.read(min(chunk, end - position))
+                if not piece:
+                    break
+                ASARPacker._write_all(out_f, piece)
+                position += len(piece)
+        
+        if position < end:
+            raise ValueError(f"Source ended {end - position} bytes short of the requested range")
+
+
+class _ASAREntryIO(io.RawIOBase):
+    """Raw read-only stream over one entry's byte range inside an archive."""
+    
+    def __init__(self, asar_path, start, size):
+        super().__init__()
+        self._file = open(asar_path, 'rb', buffering=0)
+        self._start = start
+        self._size = size
+        self._pos = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        count = min(len(buffer), self._size - self._pos)
+        if count <= 0:
+            return 0
+        self._file.seek(self._start + self._pos)
+        with memoryview(buffer) as view:
+            read = self._file.readinto(view[:count])
+        self._pos += read
+        return read
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._pos = position
+        return self._pos
+    
+    def tell(self):
+        return self._pos
+    
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+class _ZipStreamSink:
+    """Write-only file object collecting zip output for a generator.
+    
+    It has no tell()/seek(), so zipfile writes data descriptors after each
+    entry instead of seeking back, which is what makes streaming possible.
+    """
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def take(self):
+        """Return and clear everything written so far."""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ASARArchive:
+    """Random-access, read-only view of an ASAR archive.
+    
+    The header is parsed once into a compact ASARIndex, so looking up,
+    listing or reading a single entry never requires extracting the
+    archive. Paths are relative to the archive root and use forward
+    slashes, e.g. 'static/js/main.1234.js'.
+    
+    Example:
+        >>> archive = ASARArchive('app.asar')
+        >>> archive.listdir('static/js')
+        ['main.1234.js']
+        >>> archive.read('index.html')[:15]
+        b'<!doctype html>'
+    """
+    
+    # Bit flags stored in ASAREntry.flags
+    FLAG_DIRECTORY = ASARIndex.FLAG_DIRECTORY
+    FLAG_EXECUTABLE = ASARIndex.FLAG_EXECUTABLE
+    FLAG_UNPACKED = ASARIndex.FLAG_UNPACKED
+    FLAG_LINK = ASARIndex.FLAG_LINK
+    
+    # Guard against link cycles when resolving 'link' entries
+    MAX_LINK_DEPTH = 40
+    
+    # Saved header indexes kept by prune_index_cache()
+    INDEX_CACHE_LIMIT = 8
+    
+    # Already-compressed formats stored as-is by iter_zip()
+    ZIP_STORED_EXTENSIONS = {
+        '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp4', '.webm', '.ogg',
+        '.mp3', '.m4a', '.aac', '.flac', '.woff', '.woff2', '.zip', '.gz'
+    }
+    
+    def __init__(self, asar_path, cache_dir=None, unpacked_dir=None):
+        """Open an archive and index its header.
+        
+        With cache_dir set, the index is saved there after parsing and
+        loaded back the next time the same archive is opened (even by a
+        new process), skipping the header read and JSON parse. A cached
+        index is only used while the archive's path, size and mtime match
+        what it was built from, so a launcher update rebuilds it.
+        
+        Args:
+            asar_path (str): Path to the .asar file
+            cache_dir (str): Optional directory for the saved header index
+            unpacked_dir (str): Folder holding the unpacked entries (default:
+                <asar_path>.unpacked), e.g. the launcher's own folder when
+                opening a backup copy of its app.asar
+            
+        Raises:
+            FileNotFoundError: If asar_path doesn't exist
+            ValueError: If ASAR header is invalid or corrupt
+        """
+        self.asar_path = os.path.abspath(asar_path)
+        self.unpacked_dir = os.path.abspath(unpacked_dir or self.asar_path + '.unpacked')
+        info = os.stat(self.asar_path)
+        self.archive_size = info.st_size
+        self.archive_mtime = info.st_mtime_ns
+        
+        key = {'path': self.asar_path, 'size': self.archive_size, 'mtime_ns': self.archive_mtime}
+        cache_path = None
+        if cache_dir:
+            # One cache file per archive path; a stale one is simply overwritten
+            path_hash = hashlib.sha256(os.path.normcase(self.asar_path).encode('utf-8')).hexdigest()[:16]
+            cache_path = os.path.join(cache_dir, f'index-{path_hash}.bin')
+            try:
+                index, meta = ASARIndex.load(cache_path)
+                if {name: meta.get(name) for name in key} == key:
+                    self.index = index
+                    self.data_offset = meta['data_offset']
+                    try:
+                        # Mark as recently used for prune_index_cache()
+                        os.utime(cache_path)
+                    except OSError:
+                        pass
+                    return
+            except (OSError, ValueError, KeyError):
+                # Missing or unreadable cache - rebuild it below
+                pass
+        
+        with open(self.asar_path, 'rb') as f:
+            header, header_size = ASARExtractor._read_header(f)
+        
+        self.data_offset = 8 + header_size
+        self.index = ASARIndex(header.get('files', {}))
+        
+        if cache_path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self.index.save(cache_path, dict(key, data_offset=self.data_offset))
+            except (OSError, ValueError) as e:
+                print(f"[ASARArchive] Could not save header index: {e}")
+    
+    @staticmethod
+    def prune_index_cache(cache_dir, keep_latest=None):
+        """Delete saved header indexes beyond the most recently used ones.
+        
+        Every archive opened with a cache_dir (the launcher's, backups,
+        compiled exports) leaves an index-<hash>.bin behind; indexes of
+        archives that no longer exist would otherwise pile up.
+        
+        Args:
+            cache_dir (str): Directory passed to ASARArchive as cache_dir
+            keep_latest (int): Indexes to keep (default INDEX_CACHE_LIMIT)
+            
+        Returns:
+            int: Number of index files deleted
+        """
+        if keep_latest is None:
+            keep_latest = ASARArchive.INDEX_CACHE_LIMIT
+        try:
+            names = [name for name in os.listdir(cache_dir)
+                     if name.startswith('index-') and name.endswith('.bin')]
+        except OSError:
+            return 0
+        
+        entries = []
+        for name in names:
+            path = os.path.join(cache_dir, name)
+            try:
+                entries.append((os.stat(path).st_mtime_ns, path))
+            except OSError:
+                continue
+        entries.sort(reverse=True)
+        
+        removed = 0
+        for _, path in entries[keep_latest:]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                print(f"[ASARArchive] Could not remove header index {path}: {e}")
+        return removed
+    
+    @staticmethod
+    def _normalize(path):
+        """Normalize a user-supplied path to the index key format.
+        
+        Raises:
+            ValueError: If the path tries to escape the archive root
+        """
+        parts = []
+        for part in str(path).replace('\\', '/').split('/'):
+            if part in ('', '.'):
+                continue
+            if part == '..':
+                raise ValueError(f"Path escapes archive root: {path}")
+            parts.append(part)
+        return '/'.join(parts)
+    
+    def _resolve(self, path):
+        """Return (normalized path, entry) with links followed."""
+        key = self._normalize(path)
+        for _ in range(self.MAX_LINK_DEPTH):
+            position = self.index.find(key)
+            if position < 0:
+                raise FileNotFoundError(f"No such entry in archive: {path}")
+            if not self.index.flags[position] & self.FLAG_LINK:
+                return key, self.index.entry(position)
+            key = self._normalize(self.index.links[position])
+        raise OSError(f"Too many levels of links: {path}")
+    
+    def is_current(self):
+        """Check whether the archive on disk is unchanged since indexing."""
+        try:
+            info = os.stat(self.asar_path)
+        except OSError:
+            return False
+        return info.st_size == self.archive_size and info.st_mtime_ns == self.archive_mtime
+    
+    def exists(self, path):
+        """Return True if path names an entry (links followed)."""
+        try:
+            self._resolve(path)
+            return True
+        except (OSError, ValueError):
+            return False
+    
+    def isdir(self, path):
+        """Return True if path names a directory entry."""
+        try:
+            return bool(self._resolve(path)[1].flags & self.FLAG_DIRECTORY)
+        except (OSError, ValueError):
+            return False
+    
+    def isfile(self, path):
+        """Return True if path names a file entry."""
+        try:
+            return not self._resolve(path)[1].flags & self.FLAG_DIRECTORY
+        except (OSError, ValueError):
+            return False
+    
+    def stat(self, path):
+        """Return the ASAREntry for path.
+        
+        Raises:
+            FileNotFoundError: If path is not in the archive
+        """
+        return self._resolve(path)[1]
+    
+    def listdir(self, path=''):
+        """List entry names directly inside a directory of the archive.
+        
+        Raises:
+            FileNotFoundError: If path is not in the archive
+            NotADirectoryError: If path names a file
+        """
+        key, entry = self._resolve(path)
+        if not entry.flags & self.FLAG_DIRECTORY:
+            raise NotADirectoryError(f"Not a directory in archive: {path}")
+        names = self.index.names
+        return [names[child] for child in self.index.children(self.index.find(key))]
+    
+    def open(self, path, mode='rb', encoding='utf-8', errors='strict'):
+        """Open a file entry as a read-only file-like object.
+        
+        Args:
+            path (str): Entry path inside the archive
+            mode (str): 'rb' for bytes or 'r' for text
+            encoding (str): Text encoding when mode is 'r'
+            errors (str): Decode error handling when mode is 'r'
+            
+        Returns:
+            file: Seekable stream limited to the entry's byte range
+            
+        Raises:
+            FileNotFoundError: If path is not in the archive
+            IsADirectoryError: If path names a directory
+        """
+        if mode not in ('r', 'rb'):
+            raise ValueError(f"Unsupported mode: {mode}")
+        key, entry = self._resolve(path)
+        if entry.flags & self.FLAG_DIRECTORY:
+            raise IsADirectoryError(f"Is a directory in archive: {path}")
+        
+        if entry.flags & self.FLAG_UNPACKED:
+            # Unpacked entries live next to the archive in app.asar.unpacked
+            stream = open(os.path.join(self.unpacked_dir, *key.split('/')), 'rb')
+        else:
+            stream = io.BufferedReader(_ASAREntryIO(self.asar_path, self.data_offset + entry.offset, entry.size))
+        
+        if mode == 'r':
+            return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
+        return stream
+    
+    def read(self, path):
+        """Read a whole file entry into bytes."""
+        with self.open(path) as f:
+            return f.read()
+    
+    def walk_files(self):
+        """Yield (path, ASAREntry) for every file entry in the archive."""
+        for position, path in self.index.iter_files():
+            yield path, self.index.entry(position)
+    
+    def iter_zip(self, chunk_size=1024 * 1024):
+        """Generate a zip file of the archive's contents piece by piece.
+        
+        Entries are read straight from their byte ranges and compressed as
+        they are yielded, so memory use stays flat and nothing is written
+        to disk; suitable as a streaming HTTP response body. Text is
+        deflated, already-compressed media is stored. Empty directories
+        are kept; links are skipped, as are unpacked entries whose file is
+        missing (e.g. a backup copied without its .unpacked folder).
+        
+        Args:
+            chunk_size (int): Bytes read from an entry at a time
+            
+        Yields:
+            bytes: Consecutive pieces of the zip file
+        """
+        sink = _ZipStreamSink()
+        date_time = time.localtime(max(self.archive_mtime // 1000000000, 315532800))[:6]
+        index = self.index
+        with zipfile.ZipFile(sink, 'w', allowZip64=True) as zip_f:
+            for position, path in index.iter_paths():
+                flags = index.flags[position]
+                if flags & self.FLAG_LINK:
+                    continue
+                if flags & self.FLAG_DIRECTORY:
+                    if index.ends[position] == position + 1:
+                        zip_f.writestr(zipfile.ZipInfo(path + '/', date_time), b'')
+                    continue
+                if flags & self.FLAG_UNPACKED and \
+                        not os.path.isfile(os.path.join(self.unpacked_dir, *path.split('/'))):
+                    print(f"[ASARArchive] Skipping unpacked entry {path}: not found in {self.unpacked_dir}")
+                    continue
+                
+                info = zipfile.ZipInfo(path, date_time)
+                info.file_size = index.sizes[position]
+                info.external_attr = (0o755 if flags & self.FLAG_EXECUTABLE else 0o644) << 16
+                if os.path.splitext(path)[1].lower() in self.ZIP_STORED_EXTENSIONS:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                
+                with self.open(path) as src, zip_f.open(info, 'w', force_zip64=info.file_size >= zipfile.ZIP64_LIMIT) as dest:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        if sink.chunks:
+                            yield sink.take()
+                if sink.chunks:
+                    yield sink.take()
+        # Central directory is written when the zip is closed
+        yield sink.take()
+
+
+class ASARPatcher:
+    """Apply same-length byte edits to a copy of an ASAR archive.
+    
+    When an edit keeps every entry the same size (e.g. swapping one hex
+    color for another) the archive layout doesn't change, so there is no
+    need to extract and repack: the archive is cloned and the new bytes
+    are written at entry data offset + in-file offset. Integrity hashes of
+    edited entries are recomputed and rewritten in the header, which keeps
+    its exact length because SHA-256 hex digests are fixed size.
+    """
+    
+    @staticmethod
+    def patch(asar_path, output_path, patches):
+        """Write a patched copy of an archive.
+        
+        Every edit is validated (entry exists, is packed, same length, old
+        bytes match) before anything is written, so a rejected patch never
+        produces a half-edited archive. Unpacked entries can't be edited, so
+        the source's .unpacked folder is copied beside the patched copy
+        unchanged (before the archive appears, as in copy_archive).
+        
+        Args:
+            asar_path (str): Source .asar file (left untouched)
+            output_path (str): Path of the patched copy
+            patches (dict): Entry path -> list of (offset, old_bytes, new_bytes)
+                with offsets relative to the start of the entry
+            
+        Returns:
+            int: Number of edits applied
+            
+        Raises:
+            ValueError: If an edit changes length or doesn't match the archive
+        """
+        with open(asar_path, 'rb') as f:
+            header, header_size = ASARExtractor._read_header(f)
+            f.seek(12)
+            json_length = struct.unpack('<I', f.read(4))[0]
+            original_json = f.read(json_length)
+        data_offset = 8 + header_size
+        
+        # Validate every edit up front
+        targets = []
+        needs_header = False
+        for path, edits in patches.items():
+            node = ASARPatcher._find_node(header, path)
+            if node.get('unpacked'):
+                raise ValueError(f"Entry is stored outside the archive: {path}")
+            size = int(node['size'])
+            for offset, old, new in edits:
+                if len(old) != len(new):
+                    raise ValueError(f"Edit at {path}:{offset} changes length")
+                if offset < 0 or offset + len(old) > size:
+                    raise ValueError(f"Edit at {path}:{offset} is outside the entry")
+            needs_header = needs_header or 'integrity' in node
+            targets.append((path, node, data_offset + int(node['offset']), edits))
+        
+        # Only rewrite the header when it serializes back byte-for-byte;
+        # otherwise its length (and every offset after it) could shift
+        if needs_header and (not original_json.startswith(b'{') or ASARPatcher._dump_json(header) != original_json):
+            raise ValueError("Header JSON does not round-trip through compact serialization, "
+                             "so integrity hashes can't be rewritten in place")
+        
+        unpacked_dir = asar_path + '.unpacked'
+        if os.path.isdir(unpacked_dir) and os.path.abspath(output_path) != os.path.abspath(asar_path):
+            ASARPacker._write_unpacked(ASARPacker._list_unpacked(unpacked_dir), output_path + '.unpacked')
+        
+        temp_path = output_path + '.tmp'
+        edit_count = 0
+        try:
+            ASARPatcher._clone(asar_path, temp_path)
+            with open(temp_path, 'r+b', buffering=0) as out_f:
+                for path, node, start, edits in targets:
+                    for offset, old, new in edits:
+                        if ASARPatcher._pread(out_f, len(old), start + offset) != old:
+                            raise ValueError(f"Archive bytes at {path}:{offset} don't match the edit")
+                        ASARPatcher._pwrite(out_f, new, start + offset)
+                        edit_count += 1
+                    if 'integrity' in node:
+                        ASARPatcher._rehash(out_f, node, start)
+                
+                if needs_header:
+                    new_json = ASARPatcher._dump_json(header)
+                    if len(new_json) != len(original_json):
+                        raise ValueError("Patched header changed length")
+                    ASARPatcher._pwrite(out_f, new_json, 16)
+            os.replace(temp_path, output_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                # Safely ignore temp file cleanup errors
+                pass
+            raise
+        
+        print(f"[ASARPatcher] Applied {edit_count} edit(s) to {len(targets)} entr(ies) -> {output_path}")
+        return edit_count
+    
+    @staticmethod
+    def _find_node(header, path):
+        """Return the header dict for a file entry path."""
+        node = header
+        for part in ASARArchive._normalize(path).split('/'):
+            children = node.get('files')
+            if not isinstance(children, dict) or part not in children:
+                raise ValueError(f"No such entry in archive: {path}")
+            node = children[part]
+        if 'files' in node or 'size' not in node:
+            raise ValueError(f"Not a file entry: {path}")
+        return node
+    
+    @staticmethod
+    def _dump_json(header):
+        """Serialize a header exactly the way the asar tool does."""
+        return json.dumps(header, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def _clone(source_path, dest_path):
+        """Copy a whole file, in-kernel (or as a reflink) where supported."""
+        size = os.path.getsize(source_path)
+        with open(source_path, 'rb') as in_f, open(dest_path, 'wb', buffering=0) as out_f:
+            ASARExtractor._copy_range(in_f, None, out_f, 0, size)
+    
+    @staticmethod
+    def _pread(file_obj, size, position):
+        """Positional read (os.pread where available)."""
+        if hasattr(os, 'pread'):
+            return os.pread(file_obj.fileno(), size, position)
+        file_obj.seek(position)
+        return file_obj.read(size)
+    
+    @staticmethod
+    def _pwrite(file_obj, data, position):
+        """Positional write of all of data (os.pwrite where available)."""
+        if hasattr(os, 'pwrite'):
+            written = 0
+            while written < len(data):
+                written += os.pwrite(file_obj.fileno(), data[written:], position + written)
+        else:
+            file_obj.seek(position)
+            ASARPacker._write_all(file_obj, data)
+    
+    @staticmethod
+    def _rehash(file_obj, node, start):
+        """Recompute an entry's integrity block from the patched bytes."""
+        integrity = node['integrity']
+        block_size = int(integrity.get('blockSize', ASARExtractor.INTEGRITY_BLOCK_SIZE))
+        size = int(node['size'])
+        # Keep whichever block layout the archive was built with
+        trailing_block = len(integrity.get('blocks', [])) == size // block_size + 1
+        integrity.update(ASARPatcher._integrity(file_obj, start, size, block_size, trailing_block))
+    
+    @staticmethod
+    def _integrity(file_obj, start, size, block_size=ASARExtractor.INTEGRITY_BLOCK_SIZE, trailing_block=True):
+        """Compute Electron integrity metadata for a byte range of a file.
+        
+        @electron/asar always finishes with the remaining partial block, so
+        an entry of exactly N blocks (including an empty one) gets an extra
+        hash of zero bytes; trailing_block=False omits it, as older tools did.
+        
+        Args:
+            file_obj (file): Open binary file
+            start (int): Offset of the entry in the file
+            size (int): Entry size in bytes
+            block_size (int): Bytes per block hash
+            trailing_block (bool): Use the @electron/asar block layout
+            
+        Returns:
+            dict: {'algorithm', 'hash', 'blockSize', 'blocks'}
+            
+        Raises:
+            ValueError: If the file ends inside the range
+        """
+        whole = hashlib.sha256()
+        blocks = []
+        block_count = size // block_size + 1 if trailing_block else (size + block_size - 1) // block_size
+        for index in range(block_count):
+            position = index * block_size
+            length = min(block_size, size - position)
+            block = ASARPatcher._pread(file_obj, length, start + position)
+            while len(block) < length:
+                more = ASARPatcher._pread(file_obj, length - len(block), start + position + len(block))
+                if not more:
+                    raise ValueError("File ended inside an entry")
+                block += more
+            whole.update(block)
+            blocks.append(hashlib.sha256(block).hexdigest())
+        return {
+            'algorithm': 'SHA256',
+            'hash': whole.hexdigest(),
+            'blockSize': block_size,
+            'blocks': blocks
+        }
+
+
+class ASARPacker:
+    """Pack a directory into an ASAR archive using pure Python.
+    
+    Replaces `npx asar pack`: the header is built from a single directory
+    walk, then each file body is streamed straight into the output archive.
+    The layout matches what the asar CLI produces, so Electron reads the
+    result exactly like an archive packed with Node.js.
+    """
+    
+    # RUIE bookkeeping files and folders kept in extraction folders, never packed
+    IGNORED_NAMES = {
+        '.extraction-metadata.json', '.color-index.json', '.color-history.json', '.pristine',
+        ASARExtractor.MANIFEST_NAME, ASARExtractor.JOURNAL_NAME,
+    }
+    
+    # Default access-order profile: what the launcher reads at start-up,
+    # most urgent first. Patterns are globs; a directory covers its contents.
+    DEFAULT_ORDER = (
+        'package.json',
+        'index.html',
+        'static/js/runtime*.js',
+        'static/js/main.*.js',
+        'static/js',
+        'static/css',
+        'static/media/*.woff2',
+        'static/media/*.svg',
+        'assets/images/*logo*',
+        'assets/images/*background*',
+        'assets/images/*bg*',
+        'assets/fonts',
+    )
+    
+    # Files are hashed on the pool in batches of about this many bytes, so
+    # tens of thousands of small files don't cost a future each
+    HASH_BATCH_SIZE = 4 * 1024 * 1024
+    
+    @staticmethod
+    def pack(source_dir, output_path, incremental=True, order=None):
+        """Pack a directory into an ASAR file.
+        
+        Main entry point for ASAR packing. This method:
+        1. Walks the source directory into a header index (ASARIndex)
+        2. Serializes the header the same way Chromium's Pickle does
+        3. Streams every file body into the archive in header order
+        
+        Partial extractions (ASARExtractor.extract with include/exclude)
+        are completed from the source archive: every entry that was never
+        extracted is copied from its original byte range, as long as its
+        directory still exists in source_dir.
+        
+        Incremental mode: when source_dir was produced by ASARExtractor and
+        its source archive is unchanged (same size and mtime), files whose
+        size and mtime still match the extraction manifest are spliced
+        straight from the original archive's byte ranges (in-kernel via
+        os.copy_file_range where available). Only edited files are re-read
+        from disk, so repacking after a small theme tweak costs little more
+        than copying the archive.
+        
+        Files the extraction took from <archive>.unpacked stay unpacked:
+        they are flagged in the header and written to <output_path>.unpacked.
+        
+        Data layout: file bodies are placed in access order rather than
+        directory order. Files matching the first pattern of the profile
+        come first, then the second, and so on; everything else follows in
+        directory order. With the default profile the launcher's start-up
+        files (index.html, main bundle, CSS, first-screen images) sit
+        together at the front of the archive, so a cold start reads them
+        sequentially. The header itself is unchanged.
+        
+        Every file gets Electron integrity metadata (whole-file SHA-256 plus
+        4 MB block hashes). Spliced entries reuse the hashes stored in the
+        source archive's header; the rest are hashed on a thread pool while
+        the archive is being streamed. The header is written first with
+        same-length placeholder digests and patched in place at the end.
+        
+        The archive is written next to output_path and moved into place
+        once complete, so a failed pack never leaves a truncated archive.
+        This also makes it safe to pack over the source archive itself.
+        
+        Args:
+            source_dir (str): Directory whose contents become the archive root
+            output_path (str): Path of the .asar file to create
+            incremental (bool): Reuse unchanged entries from the source archive
+            order (list): Access-order profile of glob patterns (default
+                DEFAULT_ORDER); pass [] to keep plain directory order
+            
+        Returns:
+            bool: True if packing succeeded
+            
+        Raises:
+            FileNotFoundError: If source_dir doesn't exist
+            ValueError: If source_dir is a partial extraction whose source
+                archive is missing or has changed
+        """
+        print(f"[ASARPacker] Packing {source_dir} -> {output_path}")
+        
+        if not os.path.isdir(source_dir):
+            raise FileNotFoundError(f"Source directory not found: {source_dir}")
+        
+        manifest = ASARExtractor.load_manifest(source_dir)
+        base = ASARPacker._open_base(manifest) if manifest else None
+        if base is not None and not incremental:
+            # Read every extracted file from disk; only entries that were
+            # never extracted still come from the source archive
+            base['entries'] = {}
+        
+        # Entries a partial extraction left in the source archive, grouped
+        # by directory in source archive order (unpacked ones have no
+        # offset and sort first)
+        external = None
+        if base is not None and base['external']:
+            external = {}
+            for rel_path, node in sorted(base['external'].items(),
+                                         key=lambda item: int(item[1].get('offset', -1))):
+                parent_path, _, name = rel_path.rpartition('/')
+                external.setdefault(parent_path, []).append((name, node))
+        
+        # Build the header index and the list of data segments to stream
+        segments = []
+        unpacked_files = []
+        root = os.path.realpath(source_dir)
+        index = ASARIndex({}, keep_integrity=True)
+        added = ASARPacker._build_tree(
+            source_dir, root, index, 0, segments, base=base, top_level=True,
+            unpacked=set(manifest.get('unpacked', [])) if manifest else None,
+            unpacked_files=unpacked_files, external=external, unpacked_dest=output_path + '.unpacked'
+        )
+        index.close(0)
+        if external is not None:
+            print(f"[ASARPacker] Added {added} entries not extracted from the source archive")
+            # Their data follows the extracted files, in source archive
+            # order, so _write_segments can copy neighbours as one range
+            segments = [segment for segment in segments if segment[0] is not None] + \
+                sorted((segment for segment in segments if segment[0] is None), key=lambda segment: segment[1])
+        ASARPacker._apply_order(segments, ASARPacker.DEFAULT_ORDER if order is None else order, index)
+        
+        # Entries without reusable hashes: (position, file to hash, start, size)
+        hash_jobs = []
+        for file_path, base_start, size, position, _ in segments:
+            if position not in index.integrity:
+                if base_start is None:
+                    hash_jobs.append((position, file_path, 0, size))
+                else:
+                    hash_jobs.append((position, base['path'], base_start, size))
+        for file_path, _, position in unpacked_files:
+            if position not in index.integrity:
+                hash_jobs.append((position, file_path, 0, index.sizes[position]))
+        for position, _, _, size in hash_jobs:
+            index.integrity[position] = ASARPacker._placeholder_integrity(size)
+        header_bytes = ASARPacker._encode_header(index)
+        
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        temp_path = output_path + '.tmp'
+        
+        spliced = sum(1 for _, base_start, _, _, _ in segments if base_start is not None)
+        if unpacked_files:
+            ASARPacker._write_unpacked(unpacked_files, output_path + '.unpacked')
+        try:
+            base_f = open(base['path'], 'rb') if spliced else None
+            try:
+                with open(temp_path, 'wb', buffering=0) as out_f, \
+                        ThreadPoolExecutor(max_workers=ASARExtractor.DEFAULT_WORKERS,
+                                           thread_name_prefix='asar-hash') as hasher:
+                    futures = [(batch, hasher.submit(ASARPacker._hash_files, batch))
+                               for batch in ASARPacker._hash_batches(hash_jobs)]
+                    ASARPacker._write_all(out_f, header_bytes)
+                    ASARPacker._write_segments(out_f, segments, base_f)
+                    
+                    if futures:
+                        for batch, future in futures:
+                            for (position, _, _, _), integrity in zip(batch, future.result()):
+                                index.integrity[position] = integrity
+                        final_header = ASARPacker._encode_header(index)
+                        if len(final_header) != len(header_bytes):
+                            raise ValueError("Integrity metadata changed the header length")
+                        ASARPatcher._pwrite(out_f, final_header, 0)
+            finally:
+                if base_f is not None:
+                    base_f.close()
+            os.replace(temp_path, output_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                # Safely ignore temp file cleanup errors
+                pass
+            raise
+        
+        print(f"[ASARPacker] Packed {len(segments)} files ({spliced} spliced from source archive, "
+              f"{len(hash_jobs)} hashed, {os.path.getsize(output_path)} bytes)")
+        return True
+    
+    @staticmethod
+    def _open_base(manifest):
+        """Return splice info for an extraction whose source archive is unchanged.
+        
+        Args:
+            manifest (dict): Extraction manifest of the directory being packed
+            
+        Returns:
+            dict: {'path', 'data_offset', 'entries', 'external', 'integrity',
+                'unpacked'} or None to pack everything from disk; 'integrity'
+                maps archive paths to the integrity metadata in the source
+                header and 'unpacked' is the folder unpacked entries came from
+                
+        Raises:
+            ValueError: If the extraction is partial but its source archive
+                can no longer be used
+        """
+        source = manifest.get('source', {})
+        external = manifest.get('external', {})
+        try:
+            info = os.stat(source['path'])
+        except (KeyError, OSError):
+            if external:
+                raise ValueError("Partial extraction: source archive is missing, extract again")
+            print("[ASARPacker] Source archive missing, packing all files from disk")
+            return None
+        if info.st_size != source.get('size') or info.st_mtime_ns != source.get('mtime_ns'):
+            if external:
+                raise ValueError("Partial extraction: source archive changed since extraction, extract again")
+            print("[ASARPacker] Source archive changed since extraction, packing all files from disk")
+            return None
+        
+        # Hashes of unchanged entries can be copied from the source header
+        integrity = {}
+        try:
+            with open(source['path'], 'rb') as f:
+                source_header, _ = ASARExtractor._read_header(f)
+        except (OSError, ValueError) as e:
+            print(f"[ASARPacker] Could not read source header, rehashing all files: {e}")
+            source_header = {}
+        source_index = ASARIndex(source_header.get('files', {}), keep_integrity=True)
+        for position, current_path in source_index.iter_files():
+            if position in source_index.integrity:
+                integrity[current_path] = source_index.integrity[position]
+        
+        return {
+            'path': source['path'],
+            'data_offset': source['data_offset'],
+            'entries': manifest.get('entries', {}),
+            'external': external,
+            'integrity': integrity,
+            'unpacked': source.get('unpacked')
+        }
+    
+    @staticmethod
+    def _add_external(index, parent, rel_prefix, nodes, taken, base, segments, unpacked_files, unpacked_dest):
+        """Add the entries a partial extraction left in the source archive.
+        
+        Called for each directory after its files on disk, which take
+        precedence over entries of the same name. Entries whose directory
+        was deleted from the extraction are never reached, so they are
+        dropped with it. Unpacked entries are taken from the source
+        archive's .unpacked folder, or left as they are if the destination
+        folder already holds them.
+        
+        Args:
+            index (ASARIndex): Header index being built
+            parent (int): Index of the directory's entry
+            rel_prefix (str): Archive path of the directory ('' for the root)
+            nodes (list): (name, header node) pairs in source archive order
+            taken (set): Names already used in the directory
+            base (dict): Splice info from _open_base
+            segments (list): Data segments, extended in place
+            unpacked_files (list): Receives (file_path, rel_path, position)
+                for each unpacked entry to copy
+            unpacked_dest (str): .unpacked folder of the archive being written
+            
+        Returns:
+            int: Number of entries added
+            
+        Raises:
+            ValueError: If an unpacked entry's file can't be found
+        """
+        added = 0
+        for name, original in nodes:
+            if name in taken:
+                continue
+            rel_path = f"{rel_prefix}/{name}" if rel_prefix else name
+            size = int(original['size'])
+            flags = ASARIndex.FLAG_EXECUTABLE if original.get('executable') else 0
+            if original.get('unpacked'):
+                source_file = os.path.join(base.get('unpacked') or '', *rel_path.split('/'))
+                copy_from_source = bool(base.get('unpacked')) and os.path.isfile(source_file)
+                if not copy_from_source and not os.path.isfile(os.path.join(unpacked_dest, *rel_path.split('/'))):
+                    raise ValueError(f"Partial extraction: unpacked file {rel_path} is missing, extract again")
+                position = index.add(parent, name, flags | ASARIndex.FLAG_UNPACKED, size)
+                if copy_from_source:
+                    unpacked_files.append((source_file, rel_path, position))
+            else:
+                position = index.add(parent, name, flags, size)
+                segments.append((None, base['data_offset'] + int(original['offset']), size, position, rel_path))
+            if isinstance(original.get('integrity'), dict):
+                index.integrity[position] = original['integrity']
+            added += 1
+        return added
+    
+    @staticmethod
+    def _build_tree(dir_path, root, index, parent, segments, base=None, rel_prefix='', top_level=False,
+                    unpacked=None, unpacked_files=None, external=None, unpacked_dest=None):
+        """Recursively add a directory's entries to the header index.
+        
+        Entries go into an ASARIndex depth-first (see ASARIndex.add), so
+        even a header of tens of thousands of entries is a handful of
+        arrays until _encode_header turns it into JSON. Data offsets are
+        assigned afterwards by _apply_order.
+        
+        Args:
+            dir_path (str): Directory to describe
+            root (str): Resolved archive root, used for symlink targets
+            index (ASARIndex): Header index being built
+            parent (int): Index of dir_path's entry (0 for the root)
+            segments (list): Receives (file_path, base_start, size, position,
+                rel_path) in directory order; base_start is the absolute
+                offset in the base archive for unchanged files, or None when
+                the file must be read from disk; file_path is None for
+                entries that were never extracted
+            base (dict): Splice info from _open_base, or None
+            rel_prefix (str): Archive path of dir_path ('' for the root)
+            top_level (bool): Whether dir_path is the archive root
+            unpacked (set): Archive paths to keep outside the archive body
+            unpacked_files (list): Receives (file_path, rel_path, position)
+                for each unpacked file that must be written to the .unpacked
+                folder
+            external (dict): Directory path -> [(name, header node)] of the
+                entries a partial extraction left in the source archive
+            unpacked_dest (str): .unpacked folder of the archive being written
+            
+        Returns:
+            int: Number of entries taken from external
+        """
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        
+        added = 0
+        for entry in entries:
+            if top_level and entry.name in ASARPacker.IGNORED_NAMES:
+                continue
+            
+            rel_path = f"{rel_prefix}/{entry.name}" if rel_prefix else entry.name
+            if entry.is_symlink():
+                # Links are stored relative to the archive root, like asar does
+                target = os.path.realpath(entry.path)
+                position = index.add(parent, entry.name, ASARIndex.FLAG_LINK)
+                index.links[position] = os.path.relpath(target, root).replace('\\', '/')
+            elif entry.is_dir():
+                position = index.add(parent, entry.name, ASARIndex.FLAG_DIRECTORY)
+                added += ASARPacker._build_tree(
+                    entry.path, root, index, position, segments, base=base, rel_prefix=rel_path,
+                    unpacked=unpacked, unpacked_files=unpacked_files, external=external,
+                    unpacked_dest=unpacked_dest
+                )
+                index.close(position)
+            else:
+                info = entry.stat()
+                size = info.st_size
+                flags = 0
+                if sys.platform != 'win32' and info.st_mode & stat.S_IXUSR:
+                    flags |= ASARIndex.FLAG_EXECUTABLE
+                if unpacked and rel_path in unpacked:
+                    # Stored beside the archive; the header only records the size
+                    position = index.add(parent, entry.name, flags | ASARIndex.FLAG_UNPACKED, size)
+                    unpacked_files.append((entry.path, rel_path, position))
+                    continue
+                position = index.add(parent, entry.name, flags, size)
+                
+                # Unchanged since extraction -> copy the original byte range
+                base_start = None
+                if base is not None:
+                    original = base['entries'].get(rel_path)
+                    if original and original[1] == size and original[2] == info.st_mtime_ns:
+                        base_start = base['data_offset'] + original[0]
+                        cached = base['integrity'].get(rel_path)
+                        if cached and int(cached.get('blockSize', 0)) > 0:
+                            index.integrity[position] = dict(cached)
+                segments.append((entry.path, base_start, size, position, rel_path))
+        
+        if external and rel_prefix in external:
+            taken = {entry.name for entry in entries}
+            added += ASARPacker._add_external(index, parent, rel_prefix, external[rel_prefix], taken, base,
+                                              segments, unpacked_files, unpacked_dest)
+        return added
+    
+    @staticmethod
+    def load_order_profile(profile_path):
+        """Read an access-order profile: one glob pattern per line.
+        
+        Blank lines and lines starting with '#' are ignored, so a profile
+        can be recorded from a trace of the launcher and annotated by hand.
+        
+        Args:
+            profile_path (str): Text file with the patterns
+            
+        Returns:
+            list: Patterns in access order
+        """
+        with open(profile_path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    
+    @staticmethod
+    def _apply_order(segments, order, index):
+        """Sort data segments by access-order profile and assign offsets.
+        
+        The sort is stable, so files within the same profile rank (and all
+        unmatched files) keep their directory order.
+        
+        Args:
+            segments (list): Data segments, reordered in place
+            order (list): Glob patterns, most urgent first; empty keeps the
+                segments in the order they are in
+            index (ASARIndex): Header index receiving the data offsets
+        """
+        if order:
+            ASARPacker._sort_segments(segments, order)
+        position = 0
+        for _, _, size, entry, _ in segments:
+            index.offsets[entry] = position
+            position += size
+    
+    @staticmethod
+    def _sort_segments(segments, order):
+        """Stable-sort data segments by the first profile pattern they match."""
+        matchers = [re.compile(fnmatch.translate(pattern)).match for pattern in order]
+        
+        def rank(segment):
+            # A pattern matching a directory ranks everything under it
+            candidate = segment[4]
+            best = len(matchers)
+            while candidate:
+                for position in range(best):
+                    if matchers[position](candidate):
+                        best = position
+                        break
+                candidate = candidate.rpartition('/')[0]
+            return best
+        
+        segments.sort(key=rank)
+    
+    @staticmethod
+    def copy_archive(asar_path, dest_path):
+        """Copy an archive together with its .unpacked folder.
+        
+        The unpacked entries are copied first and the archive last, so a
+        reader never sees the new archive without the files it refers to.
+        
+        Args:
+            asar_path (str): Path of the .asar file to copy
+            dest_path (str): Path of the copy
+        """
+        unpacked_dir = asar_path + '.unpacked'
+        if os.path.isdir(unpacked_dir):
+            ASARPacker._write_unpacked(ASARPacker._list_unpacked(unpacked_dir), dest_path + '.unpacked')
+        shutil.copy2(asar_path, dest_path)
+    
+    @staticmethod
+    def move_archive(asar_path, dest_path):
+        """Move an archive together with its .unpacked folder.
+        
+        Args:
+            asar_path (str): Path of the .asar file to move
+            dest_path (str): New path of the archive
+        """
+        if os.path.isdir(asar_path + '.unpacked'):
+            shutil.rmtree(dest_path + '.unpacked', ignore_errors=True)
+            shutil.move(asar_path + '.unpacked', dest_path + '.unpacked')
+        shutil.move(asar_path, dest_path)
+    
+    @staticmethod
+    def remove_archive(asar_path):
+        """Delete an archive and its .unpacked folder; missing files are ignored.
+        
+        Args:
+            asar_path (str): Path of the .asar file to delete
+        """
+        shutil.rmtree(asar_path + '.unpacked', ignore_errors=True)
+        try:
+            os.remove(asar_path)
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _list_unpacked(unpacked_dir):
+        """List every file in an .unpacked folder in _write_unpacked's format.
+        
+        Args:
+            unpacked_dir (str): Existing .unpacked folder
+            
+        Returns:
+            list: (file_path, rel_path, None) tuples
+        """
+        unpacked_files = []
+        for dir_path, _, file_names in os.walk(unpacked_dir):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                rel_path = os.path.relpath(file_path, unpacked_dir).replace(os.sep, '/')
+                unpacked_files.append((file_path, rel_path, None))
+        return unpacked_files
+    
+    @staticmethod
+    def _write_unpacked(unpacked_files, unpacked_dir):
+        """Write unpacked entries into the .unpacked folder beside an archive.
+        
+        Files already present with identical contents (the usual case when
+        repacking over the launcher's own app.asar) are left alone, which
+        also avoids touching native modules a running launcher may hold open.
+        
+        Args:
+            unpacked_files (list): (file_path, rel_path, position) tuples
+            unpacked_dir (str): Destination .unpacked folder
+        """
+        written = 0
+        for file_path, rel_path, _ in unpacked_files:
+            dest_file = os.path.join(unpacked_dir, *rel_path.split('/'))
+            if os.path.exists(dest_file) and (os.path.samefile(file_path, dest_file) or
+                                              filecmp.cmp(file_path, dest_file, shallow=False)):
+                continue
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+            shutil.copy2(file_path, dest_file + '.tmp')
+            os.replace(dest_file + '.tmp', dest_file)
+            written += 1
+        print(f"[ASARPacker] {len(unpacked_files)} unpacked files, {written} written to {unpacked_dir}")
+    
+    @staticmethod
+    def _write_segments(out_f, segments, base_f):
+        """Stream file bodies into the archive, coalescing spliced ranges.
+        
+        Consecutive unchanged files that were also adjacent in the base
+        archive are copied with a single range copy.
+        
+        Args:
+            out_f (file): Unbuffered archive file positioned after the header
+            segments (list): (file_path, base_start, size, position, rel_path)
+                tuples in data order
+            base_f (file): Open base archive, or None if nothing is spliced
+        """
+        run_start = None
+        run_size = 0
+        for file_path, base_start, size, _, _ in segments:
+            if base_start is not None and run_start is not None and base_start == run_start + run_size:
+                run_size += size
+                continue
+            if run_start is not None:
+                ASARExtractor._copy_range(base_f, None, out_f, run_start, run_size)
+                run_start = None
+            if base_start is not None:
+                run_start, run_size = base_start, size
+            else:
+                with open(file_path, 'rb') as in_f:
+                    ASARExtractor._copy_range(in_f, None, out_f, 0, size)
+        if run_start is not None:
+            ASARExtractor._copy_range(base_f, None, out_f, run_start, run_size)
+    
+    @staticmethod
+    def _placeholder_integrity(size):
+        """Integrity metadata of the right serialized length, digests zeroed."""
+        block_size = ASARExtractor.INTEGRITY_BLOCK_SIZE
+        zero = '0' * 64
+        return {
+            'algorithm': 'SHA256',
+            'hash': zero,
+            'blockSize': block_size,
+            'blocks': [zero] * (size // block_size + 1)
+        }
+    
+    @staticmethod
+    def _hash_batches(hash_jobs):
+        """Split hash jobs into batches of about HASH_BATCH_SIZE bytes.
+        
+        Args:
+            hash_jobs (list): (position, file path, start, size) tuples
+            
+        Returns:
+            list: Lists of hash jobs; a large file is a batch of its own
+        """
+        batches = []
+        batch = []
+        batch_size = 0
+        for job in hash_jobs:
+            batch.append(job)
+            batch_size += job[3]
+            if batch_size >= ASARPacker.HASH_BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+                batch_size = 0
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    @staticmethod
+    def _hash_files(batch):
+        """Compute integrity metadata for a batch of hash jobs (pool worker)."""
+        results = []
+        for _, file_path, start, size in batch:
+            with open(file_path, 'rb') as f:
+                results.append(ASARPatcher._integrity(f, start, size))
+        return results
+    
+    @staticmethod
+    def _write_all(out_f, data):
+        """Write all of data to an unbuffered file, retrying short writes."""
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += out_f.write(view[written:])
+    
+    @staticmethod
+    def _encode_header(header):
+        """Serialize a header into the on-disk ASAR prefix.
+        
+        Layout (all little-endian uint32, as written by Chromium Pickle):
+        [0-3]   4 (size of the size pickle payload)
+        [4-7]   Header pickle size
+        [8-11]  Header pickle payload size
+        [12-15] JSON string length
+        [16+]   JSON string, zero padded to a 4 byte boundary
+        
+        Args:
+            header (ASARIndex | dict): Index built by pack(), or an ASAR
+                header dict with a top-level 'files' key
+            
+        Returns:
+            bytes: Bytes preceding the file data in the archive
+        """
+        if isinstance(header, ASARIndex):
+            json_bytes = header.to_json()
+        else:
+            json_bytes = json.dumps(header, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        padding = (4 - len(json_bytes) % 4) % 4
+        payload_size = 4 + len(json_bytes) + padding
+        header_pickle_size = 4 + payload_size
+        return (
+            struct.pack('<IIII', 4, header_pickle_size, payload_size, len(json_bytes))
+            + json_bytes
+            + b'\0' * padding
+        )
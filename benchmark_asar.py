@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+ASAR micro-benchmarks.
+
+This script measures the hot paths of asar_extractor.py on synthetic data,
+so changes to the archive code can be compared without an RSI Launcher
+installation:
+
+- header: old brace-scanning parser vs. Pickle length-field parser
+- model:  nested header dicts vs. ASARIndex (memory, traversal and header
+          serialization, 50k entries; ASARIndex saves memory, walking it
+          is slower)
+- order:  directory-order vs. access-order data layout for the start-up reads
+
+Run all benchmarks:       python benchmark_asar.py
+Run selected benchmarks:  python benchmark_asar.py header
+"""
+
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from asar_extractor import ASAREntry, ASARExtractor, ASARIndex, ASARPacker
+
+
+def best_of(func, repeat=5):
+    """Run func several times and return the fastest wall time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def synthetic_header(target_bytes):
+    """Build a launcher-like header dict whose JSON is about target_bytes long."""
+    files = {}
+    offset = 0
+    index = 0
+    size = 2
+    while size < target_bytes:
+        directory = files.setdefault(f"chunk-{index // 200:04d}", {'files': {}})['files']
+        name = f"module-{index:06d}.\"quoted\".js"
+        directory[name] = {'size': 1024 + index, 'offset': str(offset)}
+        offset += 1024 + index
+        # Rough per-entry JSON cost, good enough to hit the target size
+        size += len(name) + 40
+        index += 1
+    return {'files': files}
+
+
+def synthetic_tree(entry_count):
+    """Build a node_modules-like header dict with entry_count files."""
+    files = {}
+    offset = 0
+    for index in range(entry_count):
+        package = files.setdefault(f"pkg-{index // 50:04d}", {'files': {}})['files']
+        directory = package.setdefault('lib' if index % 2 else 'dist', {'files': {}})['files']
+        # Leaf names repeat across packages, as in real dependency trees
+        slot = (index % 50) // 2
+        name = f"{('index', 'utils', 'types', 'core', 'package')[slot % 5]}-{slot}.js"
+        directory[name] = {'size': 100 + index % 4000, 'offset': str(offset)}
+        offset += 100 + index % 4000
+    return {'files': files}
+
+
+def traced(build):
+    """Return (result, bytes still allocated) for a builder function."""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def bench_header():
+    """Compare the old byte-by-byte brace scanner with the length-field parser."""
+    header = synthetic_header(5 * 1024 * 1024)
+    prefix = ASARPacker._encode_header(header)
+    header_bytes = prefix[8:]
+    print(f"Synthetic header: {len(header_bytes) / (1024 * 1024):.1f} MB JSON")
+
+    def old_parser():
+        json_start = header_bytes.find(b'{')
+        json_data = ASARExtractor._extract_json_object(header_bytes[json_start:])
+        return json.loads(json_data.decode('utf-8'))
+
+    def new_parser():
+        return ASARExtractor._read_header(io.BytesIO(prefix))[0]
+
+    assert old_parser() == new_parser() == header
+
+    old_time = best_of(old_parser, repeat=3)
+    new_time = best_of(new_parser)
+    print(f"Brace scanner + json:  {old_time * 1000:9.1f} ms")
+    print(f"Length-field parser:   {new_time * 1000:9.1f} ms")
+    print(f"Speedup:               {old_time / new_time:9.1f}x")
+
+
+def bench_model():
+    """Compare header memory and traversal for nested dicts and ASARIndex."""
+    entry_count = 50000
+    json_bytes = json.dumps(synthetic_tree(entry_count), separators=(',', ':')).encode('utf-8')
+    print(f"Synthetic header: {entry_count} files, {len(json_bytes) / (1024 * 1024):.1f} MB JSON")
+    
+    def nested():
+        return json.loads(json_bytes)
+    
+    def flat_dict():
+        # The previous ASARArchive index: path -> ASAREntry plus child lists
+        files = json.loads(json_bytes)['files']
+        entries = {}
+        children = {'': []}
+        stack = [('', files)]
+        while stack:
+            prefix, level = stack.pop()
+            for name, info in level.items():
+                path = f"{prefix}/{name}" if prefix else name
+                children[prefix].append(name)
+                if 'files' in info:
+                    entries[path] = ASAREntry(0, 0, 1)
+                    children[path] = []
+                    stack.append((path, info['files']))
+                else:
+                    entries[path] = ASAREntry(int(info['offset']), int(info['size']), 0)
+        return entries, children
+    
+    def compact():
+        return ASARIndex(json.loads(json_bytes)['files'])
+    
+    header, nested_bytes = traced(nested)
+    _, flat_bytes = traced(flat_dict)
+    index, index_bytes = traced(compact)
+    print(f"Nested dicts (json.loads):     {nested_bytes / (1024 * 1024):7.1f} MB")
+    print(f"Flat path -> ASAREntry dict:   {flat_bytes / (1024 * 1024):7.1f} MB")
+    print(f"ASARIndex arrays:              {index_bytes / (1024 * 1024):7.1f} MB")
+    
+    def walk_nested():
+        # Path-building walk the extractor used before ASARIndex
+        count = 0
+        stack = [('', header['files'])]
+        while stack:
+            prefix, level = stack.pop()
+            for name, info in level.items():
+                path = f"{prefix}/{name}" if prefix else name
+                if 'files' in info:
+                    stack.append((path, info['files']))
+                else:
+                    count += int(info['size']) > 0
+        return count
+    
+    def walk_index():
+        count = 0
+        sizes = index.sizes
+        for position, _ in index.iter_files():
+            count += sizes[position] > 0
+        return count
+    
+    assert walk_nested() == walk_index() == entry_count
+    nested_time = best_of(walk_nested)
+    index_time = best_of(walk_index)
+    build_time = best_of(lambda: ASARIndex(header['files']))
+    print(f"Traverse nested dicts:         {nested_time * 1000:7.1f} ms")
+    print(f"Traverse ASARIndex:            {index_time * 1000:7.1f} ms")
+    print(f"Build ASARIndex from dicts:    {build_time * 1000:7.1f} ms")
+    # The packer builds an ASARIndex and serializes it straight to JSON
+    dumps_time = best_of(lambda: json.dumps(header, separators=(',', ':'), ensure_ascii=False))
+    to_json_time = best_of(index.to_json)
+    print(f"Serialize nested dicts:        {dumps_time * 1000:7.1f} ms")
+    print(f"Serialize ASARIndex:           {to_json_time * 1000:7.1f} ms")
+    # ASARIndex trades some traversal speed for memory; report both honestly
+    print(f"Memory:    ASARIndex is {nested_bytes / index_bytes:.1f}x smaller than nested dicts")
+    print(f"Traversal: ASARIndex is {index_time / nested_time:.2f}x the time of nested dicts")
+
+
+def synthetic_launcher(root, module_count=3000):
+    """Write a launcher-like source tree; return the start-up read sequence."""
+    rng = random.Random(16)
+    
+    def write(rel_path, size):
+        full_path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'wb') as f:
+            f.write(rng.randbytes(size))
+    
+    # Bulk that sorts ahead of the start-up files in directory order
+    for index in range(module_count):
+        write(f"node_modules/pkg-{index // 20:03d}/lib/file-{index}.js", rng.randint(2000, 40000))
+    for index in range(40):
+        write(f"assets/images/ship-{index:02d}.jpg", 200000)
+        write(f"static/media/screenshot-{index:02d}.png", 150000)
+    startup = {
+        'package.json': 600,
+        'index.html': 3000,
+        'static/js/runtime-main.js': 2000,
+        'static/js/main.1a2b3c.js': 3 * 1024 * 1024,
+        'static/js/vendor.4d5e6f.chunk.js': 2 * 1024 * 1024,
+        'static/css/main.7a8b9c.css': 400000,
+        'static/media/inter.woff2': 90000,
+        'assets/images/rsi-logo.png': 60000,
+        'assets/images/login-background.jpg': 900000,
+    }
+    for rel_path, size in startup.items():
+        write(rel_path, size)
+    return list(startup)
+
+
+def drop_cache(path):
+    """Evict a file from the page cache where the platform allows it."""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def bench_order():
+    """Compare the start-up read pattern of directory and access-order layouts."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_dir = os.path.join(temp_dir, 'src')
+        startup = synthetic_launcher(source_dir)
+        layouts = {'Directory order': [], 'Access order': None}
+        
+        for label, order in layouts.items():
+            archive_path = os.path.join(temp_dir, 'plain.asar' if order == [] else 'ordered.asar')
+            assert ASARPacker.pack(source_dir, archive_path, incremental=False, order=order)
+            with open(archive_path, 'rb') as f:
+                header, data_offset = ASARExtractor._read_header(f)[:2]
+            index = ASARIndex(header['files'])
+            ranges = []
+            for rel_path in startup:
+                position = index.find(rel_path)
+                ranges.append((data_offset + index.offsets[position], index.sizes[position]))
+            
+            # A seek is any read that does not start where the previous one ended
+            seeks = sum(1 for (start, _), (prev_start, prev_size) in zip(ranges[1:], ranges)
+                        if start != prev_start + prev_size)
+            span = max(start + size for start, size in ranges) - min(start for start, _ in ranges)
+            
+            def read_startup():
+                with open(archive_path, 'rb', buffering=0) as f:
+                    for start, size in ranges:
+                        f.seek(start)
+                        f.read(size)
+            
+            timings = []
+            for _ in range(5):
+                cold = drop_cache(archive_path)
+                start_time = time.perf_counter()
+                read_startup()
+                timings.append(time.perf_counter() - start_time)
+            print(f"{label}:")
+            print(f"  Discontiguous reads:  {seeks:5d} of {len(ranges)}")
+            print(f"  Bytes spanned:        {span / (1024 * 1024):8.1f} MB "
+                  f"(of {os.path.getsize(archive_path) / (1024 * 1024):.1f} MB archive)")
+            print(f"  Start-up read time:   {min(timings) * 1000:8.1f} ms ({'cold' if cold else 'warm'} cache)")
+
+
+BENCHMARKS = {
+    'header': bench_header,
+    'model': bench_model,
+    'order': bench_order,
+}
+
+
+def main():
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+
+    for name in selected:
+        print("=" * 70)
+        print(f"BENCHMARK: {name}")
+        print("=" * 70)
+        BENCHMARKS[name]()
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Color replacement micro-benchmarks.
+
+This script measures the hot paths of color_replacer.py on a synthetic
+launcher bundle, so changes to the replacement engine can be compared
+without an RSI Launcher installation:
+
+- replace: one str.replace pass per literal vs. single-pass matcher (10 MB)
+- bytes:   decode/re-encode text round-trip vs. in-place byte processing
+- parallel: one-core vs. chunked multi-core literal scan (40 MB)
+
+Run all benchmarks:       python benchmark_colors.py
+Run selected benchmarks:  python benchmark_colors.py replace
+"""
+
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from color_replacer import ColorReplacer
+
+
+def best_of(func, repeat=5):
+    """Run func several times and return the fastest wall time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def synthetic_bundle(target_bytes, variable_count=100):
+    """Build a main.*.js-like bundle with --sol-color-* definitions.
+
+    Returns:
+        tuple: (content, {variable: new color}) with a mapping for every
+            hex variable and its -rgb companion
+    """
+    rng = random.Random(17)
+    colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(variable_count)]
+    definitions = []
+    mappings = {}
+    for index, (r, g, b) in enumerate(colors):
+        name = f"--sol-color-shade-{index}"
+        definitions.append(f"{name}: #{r:02x}{g:02x}{b:02x};")
+        definitions.append(f"{name}-rgb: {r} {g} {b};")
+        new = tuple((channel + 97) % 256 for channel in (r, g, b))
+        mappings[name] = ColorReplacer.rgb_to_hex(*new)
+        mappings[f"{name}-rgb"] = f"{new[0]} {new[1]} {new[2]}"
+
+    pieces = [":root{" + "".join(definitions) + "}"]
+    size = len(pieces[0])
+    while size < target_bytes:
+        r, g, b = colors[rng.randrange(variable_count)]
+        form = rng.randrange(4)
+        if form == 0:
+            literal = f"#{r:02x}{g:02x}{b:02x}"
+        elif form == 1:
+            literal = f"rgb({r},{g},{b})"
+        elif form == 2:
+            literal = f"rgba({r} {g} {b} / 0.5)"
+        else:
+            literal = f"var(--sol-color-shade-{rng.randrange(variable_count)})"
+        piece = f'function c{size}(e){{return e.style.color="{literal}",e.render(e.props,"{"x" * rng.randrange(40, 400)}")}}'
+        pieces.append(piece)
+        size += len(piece)
+    return "".join(pieces), mappings
+
+
+def bench_replace():
+    """Compare per-literal str.replace passes with the single-pass matcher."""
+    content, mappings = synthetic_bundle(10 * 1024 * 1024)
+    print(f"Synthetic bundle: {len(content) / (1024 * 1024):.1f} MB, {len(mappings)} mappings")
+
+    data = content.encode('utf-8')
+    with contextlib.redirect_stdout(io.StringIO()):
+        defaults = ColorReplacer._extract_default_values(data, list(mappings))
+        pairs = ColorReplacer._replacement_pairs(defaults, mappings)
+    print(f"Replacement literals: {len(pairs)}")
+
+    def sequential():
+        # The previous engine: one full pass (plus a count) per literal
+        result = content
+        for _, old_pattern, new_pattern in pairs:
+            if old_pattern in result:
+                result.count(old_pattern)
+                result = result.replace(old_pattern, new_pattern)
+        return result
+
+    def single_pass():
+        with contextlib.redirect_stdout(io.StringIO()):
+            replacements, _ = ColorReplacer._replacement_map(defaults, mappings)
+        edits = ColorReplacer._match_edits(data, replacements)
+        pieces = []
+        position = 0
+        for offset, old, new in edits:
+            pieces.append(data[position:offset])
+            pieces.append(new)
+            position = offset + len(old)
+        pieces.append(data[position:])
+        return b''.join(pieces)
+
+    old_result = sequential().encode('utf-8')
+    new_result = single_pass()
+    changed = sum(1 for old, new in zip(old_result, new_result) if old != new)
+    print(f"Characters differing (chained substitutions in the old engine): {changed}")
+
+    old_time = best_of(sequential, repeat=3)
+    new_time = best_of(single_pass, repeat=3)
+    print(f"Sequential str.replace:  {old_time * 1000:9.1f} ms")
+    print(f"Single-pass matcher:     {new_time * 1000:9.1f} ms")
+    print(f"Speedup:                 {old_time / new_time:9.1f}x")
+
+
+def bench_bytes():
+    """Compare peak memory and time of the text round-trip and byte engine."""
+    content, mappings = synthetic_bundle(10 * 1024 * 1024)
+    # Non-ASCII text, as in bundles with translated strings
+    content = content.replace('xxxxxxxx', 'xxxxxxx\u00e9', 2000)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bundle_path = Path(temp_dir) / 'main.bench.js'
+
+        def text_round_trip():
+            # The previous engine: decode, replace on str, re-encode as UTF-8
+            with open(bundle_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            defaults = ColorReplacer._extract_default_values(text.encode('utf-8'), list(mappings))
+            replacements, _ = ColorReplacer._replacement_map(defaults, mappings)
+            text_pattern = re.compile('|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+            text = text_pattern.sub(lambda match: replacements[match.group(0)], text)
+            with open(bundle_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+        def byte_engine():
+            edits = ColorReplacer._scanned_edits(bundle_path, mappings)[0]
+            ColorReplacer._write_edits(bundle_path, edits)
+
+        for label, engine in (('Text round-trip', text_round_trip), ('Byte engine (mmap)', byte_engine)):
+            bundle_path.write_bytes(content.encode('utf-8'))
+            ColorReplacer._index_cache.clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracemalloc.start()
+                start = time.perf_counter()
+                engine()
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            print(f"{label + ':':21s} {elapsed * 1000:8.1f} ms, peak {peak / (1024 * 1024):6.1f} MB "
+                  f"(bundle {os.path.getsize(bundle_path) / (1024 * 1024):.1f} MB)")
+
+
+def bench_parallel():
+    """Compare the in-process scan with the chunked multi-core scan."""
+    content, mappings = synthetic_bundle(40 * 1024 * 1024)
+    data = content.encode('utf-8')
+    with contextlib.redirect_stdout(io.StringIO()):
+        defaults = ColorReplacer._extract_default_values(data, list(mappings))
+        replacements, _ = ColorReplacer._replacement_map(defaults, mappings)
+    print(f"Synthetic bundle: {len(data) / (1024 * 1024):.1f} MB, {len(replacements)} literals, "
+          f"{ColorReplacer.PARALLEL_WORKERS} workers")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bundle_path = os.path.join(temp_dir, 'main.bench.js')
+        with open(bundle_path, 'wb') as f:
+            f.write(data)
+
+        threshold = ColorReplacer.PARALLEL_THRESHOLD
+
+        def single_core():
+            ColorReplacer.PARALLEL_THRESHOLD = float('inf')
+            try:
+                return ColorReplacer._scan_literals(data, replacements)
+            finally:
+                ColorReplacer.PARALLEL_THRESHOLD = threshold
+
+        def multi_core():
+            with ColorReplacer._map_file(bundle_path) as mapped:
+                return ColorReplacer._scan_literals(mapped, replacements, bundle_path)
+
+        # Start the pool before timing, as a running server would have
+        assert single_core() == multi_core()
+        single_time = best_of(single_core, repeat=3)
+        multi_time = best_of(multi_core, repeat=3)
+        print(f"Single process:  {single_time * 1000:9.1f} ms")
+        print(f"Process pool:    {multi_time * 1000:9.1f} ms")
+        print(f"Speedup:         {single_time / multi_time:9.1f}x")
+
+
+BENCHMARKS = {
+    'replace': bench_replace,
+    'bytes': bench_bytes,
+    'parallel': bench_parallel,
+}
+
+
+def main():
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+
+    for name in selected:
+        print("=" * 70)
+        print(f"BENCHMARK: {name}")
+        print("=" * 70)
+        BENCHMARKS[name]()
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,45 @@ It works by:
 4. Supporting both hex (#RRGGBB) and RGB (R G B) color formats
 
 The color replacement is done by literal string replacement, so it modifies
-the actual default values in the JavaScript code.
+the actual default values in the JavaScript code. All old literals are
+compiled into one matcher and replaced in a single pass over the file, so a
+new value is never re-matched by a later mapping (no A -> B -> C chains).
+
+Bundles are processed as raw bytes (memory-mapped where possible): color
+literals are pure ASCII, so no decode/encode round-trip is needed and files
+are written back byte-for-byte, whatever their encoding, and only when
+something changed.
+
+Large bundles are scanned on several cores: the file is split into chunks
+(overlapping by the longest literal) that worker processes scan, and the
+matches are stitched back into exactly what one sequential scan finds.
+
+Whole-bundle mode also themes the other text assets (lazy-loaded JS
+chunks, CSS and SVG): each is checked once with a cheap byte search for the
+theme's literals, so most are indexed as empty without a full scan, and
+the remaining candidates are scanned in parallel. A later apply without
+whole-bundle mode restores those assets from their pristine snapshots and
+reports them (see themed_assets).
+
+Dry runs (plan_colors) compute the full replacement plan from the index
+without writing anything; plans are cached by (bundle state, mapping), so
+going back to a preset that was already previewed costs nothing.
+
+Every apply is also recorded in a patch log (.color-history.json) as
+(file, offset, old literal, new literal) records, so undo() and redo() can
+reverse or replay it by editing just those offsets.
+
+Pristine snapshots: the first time a bundle is themed it is hardlinked into
+.pristine/ in the extraction folder, and the bundle itself is only ever
+replaced, never written through the link. Every apply rebuilds the bundle
+from that snapshot in one pass, so a preset's defaults are always found as
+the launcher shipped them, whatever was applied before.
+
+Incremental re-theming: a sidecar color index (.color-index.json in the
+extraction folder) records the byte offset of every literal of every theme
+variable in the pristine bundles. Applying a mapping looks its literals up
+in the index and splices them in at those offsets; a snapshot never
+changes, so it is scanned once per extraction.
 
 Color Format Support:
 - Hex: #FF5733
@@ -19,9 +57,20 @@ Color Format Support:
 - RGB function: rgb(255, 87, 51)
 """
 
+import bisect
+import hashlib
 import json
+import mmap
+import multiprocessing
 import os
 import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+from itertools import accumulate
 from pathlib import Path
 
 class ColorReplacer:
@@ -31,6 +80,47 @@ class ColorReplacer:
     JavaScript and replacing them with user-selected colors.
     """
     
+    # One scan finds every CSS custom property definition; the value part
+    # matches what _extract_default_values always accepted
+    VARIABLE_PATTERN = re.compile(rb'(--[\w-]+)\s*:\s*([^;]+?)(?:\s*;|\s*,|\s*}|\s*$)')
+    
+    # Prefix of the launcher's theme variables
+    THEME_PREFIX = '--sol-color-'
+    
+    # Sidecar with the byte offsets of every theme color literal
+    COLOR_INDEX_NAME = '.color-index.json'
+    COLOR_INDEX_VERSION = 1
+    
+    # Untouched copies of every themed bundle, which applies start from
+    PRISTINE_DIR = '.pristine'
+    
+    # Undo/redo log of applied edits, and how many steps it keeps
+    HISTORY_NAME = '.color-history.json'
+    HISTORY_LIMIT = 50
+    
+    # Text assets themed in whole-bundle mode (besides main.*.js); JSON is
+    # left out, its number arrays look just like RGB triplets
+    TEXT_ASSET_EXTENSIONS = {'.js', '.css', '.svg'}
+    
+    # Bundles smaller than this are scanned in-process; above it chunks of
+    # at least PARALLEL_CHUNK_SIZE go to a shared process pool
+    PARALLEL_THRESHOLD = 8 * 1024 * 1024
+    PARALLEL_CHUNK_SIZE = 2 * 1024 * 1024
+    PARALLEL_WORKERS = min(8, os.cpu_count() or 1)
+    _process_pool = None
+    _pool_lock = threading.Lock()
+    
+    # Dry-run plans by (bundle state, mapping) hash
+    PLAN_CACHE_SIZE = 32
+    _plan_cache = OrderedDict()
+    _plan_lock = threading.Lock()
+    
+    # Variable indexes by content hash; a bundle is scanned once whether it's
+    # being themed, baselined after extraction or compared for changes
+    INDEX_CACHE_SIZE = 8
+    _index_cache = OrderedDict()
+    _index_lock = threading.Lock()
+    
     @staticmethod
     def hex_to_rgb(hex_color):
         """Convert hex color code to RGB tuple.
@@ -67,35 +157,54 @@ class ColorReplacer:
         return f'#{r:02x}{g:02x}{b:02x}'
     
     @staticmethod
-    def _read_text(file_path):
-        """Read text file with fallback encoding support.
+    @contextmanager
+    def _map_file(file_path):
+        """Map a file read-only for scanning.
         
-        Tries UTF-8 first, falls back to Latin-1 if that fails.
+        Yields the memory map, or empty bytes for an empty file (which
+        can't be mapped). Close it before replacing the file: Windows
+        refuses to replace a mapped file.
         
         Args:
             file_path (str): Path to file to read
             
-        Returns:
-            str: File contents
+        Yields:
+            mmap or bytes: File contents
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            # Fallback for files with unusual encoding
-            with open(file_path, 'r', encoding='latin-1') as f:
-                return f.read()
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
 
     @staticmethod
-    def _write_text(file_path, content):
-        """Write text file with UTF-8 encoding.
+    def _write_spliced(file_path, data, edits):
+        """Write file contents with byte edits applied to a temporary file.
+        
+        The unchanged stretches are copied straight from data, so no second
+        in-memory copy of the bundle is built. The caller replaces the
+        target with the returned file once data (a memory map) is closed;
+        a hardlinked (cached) original is never modified and a crash can't
+        leave a half-written bundle.
         
         Args:
-            file_path (str): Path to file to write
-            content (str): Content to write
+            file_path (str): Path of the file being rewritten
+            data (bytes): Its current contents (bytes or mmap)
+            edits (list): (offset, old_bytes, new_bytes) tuples sorted by offset
+            
+        Returns:
+            str: Path of the temporary file
         """
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            position = 0
+            for offset, old, new in edits:
+                f.write(data[position:offset])
+                f.write(new)
+                position = offset + len(old)
+            f.write(data[position:])
+        return temp_path
 
     @staticmethod
     def _hex_to_rgb_string(hex_color):
@@ -132,7 +241,87 @@ class ColorReplacer:
         return f"{r} {g} {b}"
 
     @staticmethod
-    def _extract_default_values(content, variable_names):
+    def variable_index(data):
+        """Index every CSS variable definition in the content in one pass.
+        
+        The first definition of a variable wins, as with a search from the
+        start of the file. Results are cached by content hash.
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            
+        Returns:
+            dict: Variable name -> (value, (start, end) byte span of the value);
+                names and values are decoded as Latin-1, so they map back
+                to the original bytes exactly
+        """
+        key = hashlib.sha256(data).digest()
+        with ColorReplacer._index_lock:
+            index = ColorReplacer._index_cache.get(key)
+            if index is not None:
+                ColorReplacer._index_cache.move_to_end(key)
+                return index
+        
+        index = {}
+        for match in ColorReplacer.VARIABLE_PATTERN.finditer(data):
+            name = match.group(1).decode('latin-1')
+            if name not in index:
+                index[name] = (match.group(2).decode('latin-1'), match.span(2))
+        
+        with ColorReplacer._index_lock:
+            ColorReplacer._index_cache[key] = index
+            while len(ColorReplacer._index_cache) > ColorReplacer.INDEX_CACHE_SIZE:
+                ColorReplacer._index_cache.popitem(last=False)
+        return index
+    
+    @staticmethod
+    def theme_variables(data):
+        """Return the launcher theme variables (--sol-color-*) and their values.
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            
+        Returns:
+            dict: Variable name -> value
+        """
+        return {
+            name: value.strip()
+            for name, (value, _) in ColorReplacer.variable_index(data).items()
+            if name.lower().startswith(ColorReplacer.THEME_PREFIX)
+        }
+
+    @staticmethod
+    def _rgb_forms(rgb):
+        """Return the literal forms of a space-separated RGB string.
+        
+        Args:
+            rgb (str): RGB as space-separated string, e.g. '255 87 51'
+            
+        Returns:
+            list: Space-separated, comma-separated and rgb() function forms
+        """
+        comma = rgb.replace(' ', ',')
+        return [rgb, comma, f"rgb({comma})"]
+
+    @staticmethod
+    def _literal_forms(value):
+        """Return every literal apply_colors replaces for a default value.
+        
+        Args:
+            value (str): Default value of a variable
+            
+        Returns:
+            list: The value itself, plus its RGB forms when it is a hex color
+        """
+        forms = [value]
+        if value.startswith('#'):
+            rgb = ColorReplacer._hex_to_rgb_string(value)
+            if rgb:
+                forms.extend(ColorReplacer._rgb_forms(rgb))
+        return forms
+
+    @staticmethod
+    def _extract_default_values(data, variable_names):
         """Extract default values for CSS variables from file content.
         
         Searches for variable definitions like:
@@ -140,21 +329,42 @@ class ColorReplacer:
         - variableName: 255 87 51;
         - variableName: rgb(255, 87, 51);
         
+        CSS variables (--name) are looked up in the shared variable_index;
+        other names fall back to a search of their own.
+        
         Args:
-            content (str): File content to search
+            data (bytes): Raw file contents to search (bytes or mmap)
             variable_names (list): List of variable names to find
             
         Returns:
             dict: Mapping of variable names to their default values
         """
         defaults = {}
+        index = ColorReplacer.variable_index(data)
+        folded = None
         for var_name in variable_names:
-            # Pattern matches: variableName: value; (with flexible whitespace)
-            # Looks for patterns like "colorVariable: #FFFFFF;"
-            pattern = re.compile(rf'{re.escape(var_name)}\s*:\s*([^;]+?)(?:\s*;|\s*,|\s*}}|\s*$)', re.IGNORECASE)
-            match = pattern.search(content)
-            if match:
-                value = match.group(1).strip().strip('"\'')
+            value = None
+            if var_name.startswith('--'):
+                entry = index.get(var_name)
+                if entry is None:
+                    # Names have always matched case-insensitively
+                    if folded is None:
+                        folded = {}
+                        for name, found in index.items():
+                            folded.setdefault(name.lower(), found)
+                    entry = folded.get(var_name.lower())
+                if entry is not None:
+                    value = entry[0]
+            else:
+                # Pattern matches: variableName: value; (with flexible whitespace)
+                # Looks for patterns like "colorVariable: #FFFFFF;"
+                name = re.escape(var_name.encode('latin-1', 'replace'))
+                pattern = re.compile(name + rb'\s*:\s*([^;]+?)(?:\s*;|\s*,|\s*}|\s*$)', re.IGNORECASE)
+                match = pattern.search(data)
+                if match:
+                    value = match.group(1).decode('latin-1')
+            if value is not None:
+                value = value.strip().strip('"\'')
                 defaults[var_name] = value
                 print(f"  Found {var_name}: {value}")
             else:
@@ -162,15 +372,1489 @@ class ColorReplacer:
         return defaults
     
     @staticmethod
-    def apply_colors(extracted_dir, color_mappings, progress_callback=None):
+    def _replacement_pairs(defaults, color_mappings, verbose=True):
+        """Build the literal replacements for a set of color mappings.
+        
+        For every variable with a known default this yields the direct
+        replacement, plus the space-separated, comma-separated and rgb()
+        forms when the default is a hex color.
+        
+        Args:
+            defaults (dict): Variable name -> current default value
+            color_mappings (dict): Variable name -> new color
+            verbose (bool): Print every replacement (warnings always are)
+            
+        Returns:
+            list: (variable_name, old_literal, new_literal) tuples in
+                application order
+        """
+        pairs = []
+        for var_name, new_color in color_mappings.items():
+            old_value = defaults.get(var_name)
+            if not old_value:
+                print(f"  ⚠ {var_name}: old value not found in defaults")
+                continue
+
+            new_value = new_color.strip()
+            if not new_value:
+                print(f"  ⚠ {var_name}: new value is empty")
+                continue
+
+            # Validate new color format (hex or RGB); literals are written as raw ASCII bytes
+            if not new_value.isascii() or not (new_value.startswith('#') or re.match(r'^\d{1,3}\s+\d{1,3}\s+\d{1,3}$', new_value)):
+                print(f"  ⚠ {var_name}: invalid new color format '{new_value}'")
+                continue
+
+            if verbose:
+                print(f"  → {var_name}: '{old_value}' → '{new_value}'")
+            pairs.append((var_name, old_value, new_value))
+
+            # Also try RGB conversion if applicable (hex color to RGB format)
+            if old_value.startswith('#'):
+                old_rgb = ColorReplacer._hex_to_rgb_string(old_value)
+                if new_value.startswith('#'):
+                    new_rgb = ColorReplacer._hex_to_rgb_string(new_value)
+                else:
+                    new_rgb = new_value
+
+                if old_rgb and new_rgb:
+                    # Try different RGB patterns (spaces, commas, rgb() function)
+                    for old_form, new_form in zip(ColorReplacer._rgb_forms(old_rgb), ColorReplacer._rgb_forms(new_rgb)):
+                        pairs.append((var_name, old_form, new_form))
+        return pairs
+
+    @staticmethod
+    def _replacement_map(defaults, color_mappings, verbose=True):
+        """Resolve the replacement pairs to one new literal per old literal.
+        
+        When two mappings share an old literal the first one wins, as with
+        sequential replacement.
+        
+        Args:
+            defaults (dict): Variable name -> current default value
+            color_mappings (dict): Variable name -> new color
+            verbose (bool): Print every replacement
+            
+        Returns:
+            tuple: ({old: new}, {old: variable name})
+        """
+        replacements = {}
+        owners = {}
+        for var_name, old_pattern, new_pattern in ColorReplacer._replacement_pairs(defaults, color_mappings, verbose):
+            if old_pattern not in replacements:
+                replacements[old_pattern] = new_pattern
+                owners[old_pattern] = var_name
+        return replacements, owners
+
+    @staticmethod
+    def _asset_replacements(replacements):
+        """Restrict literal replacements to the forms safe in other assets.
+        
+        Outside the theme bundle a bare '7,26,37' or '7 26 37' is as likely
+        to be numeric data as a color, so only hex colors and rgb()/rgba()
+        calls are replaced there. A hex literal always gets a hex value.
+        
+        Args:
+            replacements (dict): Old literal -> new literal
+            
+        Returns:
+            dict: Old literal -> new literal for the hex, rgb() and rgba(
+                forms (the alpha of rgba() is kept)
+        """
+        forms = {}
+        for old, new in replacements.items():
+            if old.startswith('#'):
+                if not new.startswith('#'):
+                    new = ColorReplacer.rgb_to_hex(*(int(channel) for channel in new.split()))
+                forms[old] = new
+            elif old.startswith('rgb('):
+                forms[old] = new
+                forms['rgba(' + old[4:-1] + ','] = 'rgba(' + new[4:-1] + ','
+        return forms
+    
+    @staticmethod
+    def _literal_matcher(literals):
+        """Compile literals into one pattern over bytes.
+        
+        The literals are merged into a trie, so 'rgb(7,26,37)', '7,26,37'
+        and '7 26 37' share their prefixes and the regex engine follows one
+        branch per byte instead of trying every literal at each position
+        (a plain alternation of a few hundred literals is ~10x slower).
+        Longer literals win: at every node the longer continuations are
+        tried before stopping, so 'rgb(255,87,51)' wins over '255,87,51'
+        at the same position and '#ffffff' over '#fff'.
+        
+        Args:
+            literals: Literal strings, longest first (see _scan_literals)
+        """
+        trie = {}
+        for literal in literals:
+            node = trie
+            for byte in literal.encode('latin-1'):
+                node = node.setdefault(byte, {})
+            node[None] = True
+        
+        def compile_node(node):
+            branches = [re.escape(bytes([byte])) + compile_node(node[byte])
+                        for byte in sorted(key for key in node if key is not None)]
+            if not branches:
+                return b''
+            if len(branches) == 1 and None not in node:
+                return branches[0]
+            group = b'(?:' + b'|'.join(branches) + b')'
+            # A literal ends here: the continuations are optional (greedy)
+            return group + b'?' if None in node else group
+        
+        return re.compile(compile_node(trie))
+    
+    @staticmethod
+    def _get_process_pool():
+        """Return the shared scanning pool, or None if processes are unavailable."""
+        with ColorReplacer._pool_lock:
+            if ColorReplacer._process_pool is None and ColorReplacer.PARALLEL_WORKERS > 1:
+                try:
+                    # Spawned workers only import this module; forking the
+                    # multi-threaded server could copy a held lock
+                    ColorReplacer._process_pool = ProcessPoolExecutor(
+                        max_workers=ColorReplacer.PARALLEL_WORKERS,
+                        mp_context=multiprocessing.get_context('spawn'),
+                    )
+                except (OSError, NotImplementedError) as e:
+                    print(f"⚠ Parallel scanning unavailable: {e}")
+                    ColorReplacer.PARALLEL_WORKERS = 1
+            return ColorReplacer._process_pool
+    
+    @staticmethod
+    def _scan_chunk(source, base, start, end, literals):
+        """Worker: find the literals matched by a scan starting at start.
+        
+        Args:
+            source (str or bytes): File to map, or the chunk's bytes
+                (including the overlap) beginning at offset base
+            base (int): File offset of source[0] (0 for a file)
+            start (int): First offset of the chunk
+            end (int): Offset after the chunk; matches must start before it
+            literals (tuple): Literals, longest first
+            
+        Returns:
+            list: (offset, literal number) pairs in file order
+        """
+        pattern = ColorReplacer._literal_matcher(literals)
+        limit = end + max(len(literal) for literal in literals) - 1
+        numbers = {literal.encode('latin-1'): number for number, literal in enumerate(literals)}
+        
+        def scan(data):
+            found = []
+            for match in pattern.finditer(data, start - base, min(limit - base, len(data))):
+                if match.start() + base >= end:
+                    break
+                found.append((match.start() + base, numbers[match.group(0)]))
+            return found
+        
+        if isinstance(source, str):
+            with ColorReplacer._map_file(source) as data:
+                return scan(data)
+        return scan(source)
+    
+    @staticmethod
+    def _ordered_literals(literals):
+        """Return literals longest first, in a fixed order for the workers."""
+        return tuple(sorted(set(literals), key=lambda literal: (-len(literal), literal)))
+    
+    @staticmethod
+    def _scan_literals(data, literals, file_path=None):
+        """Find every literal in one (possibly multi-core) pass.
+        
+        Data of at least PARALLEL_THRESHOLD bytes is split into chunks that
+        overlap by the longest literal and scanned in worker processes
+        (which map file_path themselves when given, so the bundle isn't
+        copied to them). Where a match runs across a chunk boundary, the
+        next chunk's start is rescanned from the end of that match until
+        it falls back in step, so the result is always identical to a
+        single sequential scan.
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            literals: Literal strings to find
+            file_path (str): The file data was mapped from, if any
+            
+        Returns:
+            list: (offset, literal bytes) pairs in file order
+        """
+        ordered = ColorReplacer._ordered_literals(literals)
+        if not ordered:
+            return []
+        pattern = ColorReplacer._literal_matcher(ordered)
+        size = len(data)
+        
+        pool = None
+        if size >= ColorReplacer.PARALLEL_THRESHOLD:
+            pool = ColorReplacer._get_process_pool()
+        if pool is None:
+            return [(match.start(), match.group(0)) for match in pattern.finditer(data)]
+        
+        chunk_size = max(ColorReplacer.PARALLEL_CHUNK_SIZE, -(-size // ColorReplacer.PARALLEL_WORKERS))
+        overlap = len(ordered[0]) - 1
+        bounds = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+        try:
+            futures = []
+            for start, end in bounds:
+                if file_path is not None:
+                    futures.append(pool.submit(ColorReplacer._scan_chunk, str(file_path), 0, start, end, ordered))
+                else:
+                    chunk = bytes(data[start:min(end + overlap, size)])
+                    futures.append(pool.submit(ColorReplacer._scan_chunk, chunk, start, start, end, ordered))
+            results = [future.result() for future in futures]
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠ Parallel scan failed ({e}), scanning in-process")
+            with ColorReplacer._pool_lock:
+                ColorReplacer._process_pool = None
+            return [(match.start(), match.group(0)) for match in pattern.finditer(data)]
+        
+        encoded = [literal.encode('latin-1') for literal in ordered]
+        matches = []
+        position = 0
+        for (start, end), found in zip(bounds, results):
+            resume = 0
+            if found and found[0][0] < position:
+                # The last match of the previous chunk runs into this one:
+                # continue the sequential scan until it meets this chunk's
+                # matches again, from there on both scans are identical
+                known = {offset: index for index, (offset, _) in enumerate(found)}
+                resume = len(found)
+                for match in pattern.finditer(data, position, min(end + overlap, size)):
+                    if match.start() >= end:
+                        break
+                    index = known.get(match.start())
+                    if index is not None and encoded[found[index][1]] == match.group(0):
+                        resume = index
+                        break
+                    matches.append((match.start(), match.group(0)))
+                    position = match.end()
+            for offset, number in found[resume:]:
+                matches.append((offset, encoded[number]))
+                position = offset + len(encoded[number])
+        return matches
+    
+    @staticmethod
+    def _scan_files(file_paths, literals):
+        """Find every literal in several files, one worker process per file.
+        
+        Files of at least PARALLEL_THRESHOLD bytes are chunked through
+        _scan_literals instead.
+        
+        Args:
+            file_paths (list): Files to scan
+            literals: Literal strings to find
+            
+        Returns:
+            dict: File path -> (offset, literal bytes) pairs in file order
+        """
+        ordered = ColorReplacer._ordered_literals(literals)
+        encoded = [literal.encode('latin-1') for literal in ordered]
+        results = {}
+        pending = {}
+        pool = ColorReplacer._get_process_pool() if len(file_paths) > 1 else None
+        for file_path in file_paths:
+            size = os.path.getsize(file_path)
+            if pool is not None and 0 < size < ColorReplacer.PARALLEL_THRESHOLD:
+                pending[file_path] = pool.submit(ColorReplacer._scan_chunk, str(file_path), 0, 0, size, ordered)
+            else:
+                with ColorReplacer._map_file(file_path) as data:
+                    results[file_path] = ColorReplacer._scan_literals(data, ordered, file_path)
+        
+        for file_path, future in pending.items():
+            try:
+                found = future.result()
+                results[file_path] = [(offset, encoded[number]) for offset, number in found]
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠ Parallel scan failed ({e}), scanning {file_path} in-process")
+                with ColorReplacer._map_file(file_path) as data:
+                    results[file_path] = [(match.start(), match.group(0))
+                                          for match in ColorReplacer._literal_matcher(ordered).finditer(data)]
+        return results
+    
+    @staticmethod
+    def _match_edits(data, replacements, file_path=None):
+        """Find every replaced literal in one pass over the content.
+        
+        When several literals could match at one position the longest
+        wins, and a new value is never re-matched by a later mapping.
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            replacements (dict): Old literal -> new literal
+            file_path (str): The file data was mapped from, if any
+            
+        Returns:
+            list: (offset, old_bytes, new_bytes) tuples sorted by offset
+        """
+        encoded = {old.encode('latin-1'): new.encode('latin-1') for old, new in replacements.items()}
+        return [
+            (offset, old, encoded[old])
+            for offset, old in ColorReplacer._scan_literals(data, replacements, file_path)
+        ]
+
+    @staticmethod
+    def plan_edits(data, color_mappings):
+        """Compute the byte-level edits a color mapping makes to a file.
+        
+        Unlike apply_colors this does not modify anything: it scans the
+        raw bytes once for every old literal and returns where each one
+        sits (see _match_edits).
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            color_mappings (dict): Variable name -> new color
+            
+        Returns:
+            list: (offset, old_bytes, new_bytes) tuples sorted by offset
+        """
+        defaults = ColorReplacer._extract_default_values(data, list(color_mappings.keys()))
+
+        replacements, _ = ColorReplacer._replacement_map(defaults, color_mappings)
+        return ColorReplacer._match_edits(data, replacements)
+
+    @staticmethod
+    def _index_bundle(data, file_path=None):
+        """Scan a bundle once for the literals of every theme variable.
+        
+        Args:
+            data (bytes): Raw file contents (bytes or mmap)
+            file_path (str): The file data was mapped from, if any
+            
+        Returns:
+            dict: {'variables': {name: value}, 'literals': {literal: [byte offsets]}}
+        """
+        variables = {}
+        for name, value in ColorReplacer.theme_variables(data).items():
+            value = value.strip('"\'')
+            if value:
+                variables[name] = value
+        
+        literals = set()
+        for value in variables.values():
+            literals.update(ColorReplacer._literal_forms(value))
+        offsets = {}
+        for offset, literal in ColorReplacer._scan_literals(data, literals, file_path):
+            offsets.setdefault(literal.decode('latin-1'), []).append(offset)
+        return {'variables': variables, 'literals': offsets}
+    
+    @staticmethod
+    def _stamp(file_path):
+        """Return the size/mtime pair that ties an index entry to a file."""
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    @staticmethod
+    def load_color_index(extracted_dir):
+        """Load the color index sidecar of an extraction.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            dict: The index; empty when missing, unreadable or outdated
+        """
+        index_path = os.path.join(extracted_dir, ColorReplacer.COLOR_INDEX_NAME)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                color_index = json.load(f)
+            if color_index.get('version') == ColorReplacer.COLOR_INDEX_VERSION:
+                return color_index
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {'version': ColorReplacer.COLOR_INDEX_VERSION, 'files': {}}
+    
+    @staticmethod
+    def themed_assets(extracted_dir):
+        """List the text assets an earlier whole-bundle apply left themed.
+        
+        These are the files an apply without whole_bundle restores.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            list: Sorted relative paths
+        """
+        color_index = ColorReplacer.load_color_index(extracted_dir)
+        # Assets define no theme variables; only main.*.js does
+        return sorted(rel_path for rel_path, entry in color_index['files'].items()
+                      if entry.get('applied') and not entry.get('variables'))
+    
+    @staticmethod
+    def save_color_index(extracted_dir, color_index):
+        """Write the color index sidecar (temp file + atomic replace)."""
+        index_path = os.path.join(extracted_dir, ColorReplacer.COLOR_INDEX_NAME)
+        with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+            # dumps() uses the C encoder; dump() streams through the Python one
+            f.write(json.dumps(color_index, separators=(',', ':')))
+        os.replace(index_path + '.tmp', index_path)
+    
+    @staticmethod
+    def _bundle_files(extracted_dir):
+        """Return the bundles apply_colors themes, as (path, relative path)."""
+        extracted_root = Path(extracted_dir)
+        bundles = []
+        for path in extracted_root.glob('**/main.*.js'):
+            rel_path = path.relative_to(extracted_root)
+            # Skip RUIE bookkeeping folders (the pristine snapshots)
+            if not any(part.startswith('.') for part in rel_path.parts[:-1]):
+                bundles.append((path, rel_path.as_posix()))
+        return bundles
+    
+    @staticmethod
+    def build_color_index(extracted_dir):
+        """Index the color literals of every bundle in an extraction.
+        
+        Called once after extraction, so the first apply_colors doesn't
+        have to scan anything.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            dict: The color index that was saved
+        """
+        color_index = {'version': ColorReplacer.COLOR_INDEX_VERSION, 'files': {}}
+        for main_file, rel_path in ColorReplacer._bundle_files(extracted_dir):
+            ColorReplacer._fresh_index_entry(color_index, main_file, rel_path)
+        ColorReplacer.save_color_index(extracted_dir, color_index)
+        return color_index
+    
+    @staticmethod
+    def _fresh_index_entry(color_index, file_path, rel_path):
+        """Return the index entry of a file, rescanning it if it changed.
+        
+        Args:
+            color_index (dict): Loaded color index, updated in place
+            file_path (str): Bundle on disk
+            rel_path (str): Key of the bundle in the index
+            
+        Returns:
+            dict: Up-to-date index entry
+        """
+        stamp = ColorReplacer._stamp(file_path)
+        entry = color_index['files'].get(rel_path)
+        if entry is not None and entry.get('stamp') == stamp:
+            return entry
+        
+        with ColorReplacer._map_file(file_path) as data:
+            entry = ColorReplacer._index_bundle(data, file_path)
+        entry['stamp'] = stamp
+        color_index['files'][rel_path] = entry
+        return entry
+    
+    @staticmethod
+    def _indexed_edits(entry, color_mappings, verbose=True):
+        """Look up the edits for a mapping in a bundle's index entry.
+        
+        Args:
+            entry (dict): Index entry of the bundle
+            color_mappings (dict): Variable name -> new color
+            verbose (bool): Print every variable and replacement
+            
+        Returns:
+            tuple: (edits sorted by offset, {old: new}, {old: variable name},
+                {variable: current value}), or None when a mapping names a variable the index doesn't
+                cover and the bundle has to be scanned
+        """
+        variables = entry['variables']
+        folded = {}
+        for name in variables:
+            # Names have always matched case-insensitively
+            folded.setdefault(name.lower(), name)
+        
+        defaults = {}
+        for var_name in color_mappings:
+            name = var_name if var_name in variables else folded.get(var_name.lower())
+            if name is not None:
+                defaults[var_name] = variables[name]
+                if verbose:
+                    print(f"  Found {var_name}: {defaults[var_name]}")
+            elif var_name.lower().startswith(ColorReplacer.THEME_PREFIX):
+                if verbose:
+                    print(f"  Variable {var_name} not found in content")
+            else:
+                return None
+        
+        replacements, owners = ColorReplacer._replacement_map(defaults, color_mappings, verbose)
+        literals = entry['literals']
+        edits = sorted(
+            (offset, old, new)
+            for old, new in replacements.items() if old != new
+            for offset in literals.get(old, ())
+        )
+        return edits, replacements, owners, defaults
+    
+    @staticmethod
+    def plan_indexed_edits(color_index, key, stamp, read, color_mappings):
+        """Compute a bundle's edits through a color index, scanning only when needed.
+        
+        For bundles outside an extraction folder, such as a main.*.js entry
+        read straight from app.asar: the caller ties the index entry to the
+        bundle's contents with its own stamp (e.g. archive size/mtime and
+        entry offset). While the stamp matches, the edits are looked up in
+        the index without reading the bundle; otherwise it is read and
+        indexed once.
+        
+        Args:
+            color_index (dict): Index from load_color_index, updated in place
+            key (str): Key of the bundle in the index
+            stamp (dict): JSON-serializable identity of the bundle's contents
+            read (function): Returns the bundle's raw bytes
+            color_mappings (dict): Variable name -> new color
+            
+        Returns:
+            tuple: (list of (offset, old_bytes, new_bytes) sorted by offset,
+                as from plan_edits; True if the index entry was rebuilt)
+        """
+        entry = color_index['files'].get(key)
+        rebuilt = entry is None or entry.get('stamp') != stamp
+        data = None
+        if rebuilt:
+            data = read()
+            entry = ColorReplacer._index_bundle(data)
+            entry['stamp'] = stamp
+            color_index['files'][key] = entry
+        
+        planned = ColorReplacer._indexed_edits(entry, color_mappings, verbose=False)
+        if planned is None:
+            # The mapping names variables outside the index
+            return ColorReplacer.plan_edits(read() if data is None else data, color_mappings), rebuilt
+        return [(offset, old.encode('latin-1'), new.encode('latin-1')) for offset, old, new in planned[0]], rebuilt
+    
+    @staticmethod
+    def _write_edits(file_path, edits, source=None):
+        """Write literal edits into a bundle at their byte offsets.
+        
+        Same-length edits are written in place when the file isn't shared;
+        otherwise the file is rebuilt around the edits and replaces the
+        original atomically, so a hardlinked (cached or pristine) original
+        is never modified. Either way nothing is scanned.
+        
+        Args:
+            file_path (str): Bundle on disk
+            edits (list): (offset, old, new) tuples sorted by offset
+            source (str): Optional; build the bundle from this file (its
+                pristine snapshot) instead, with offsets into the source
+            
+        Raises:
+            ValueError: If the bytes at an offset aren't the expected literal
+        """
+        edits = [(offset, old.encode('latin-1'), new.encode('latin-1')) for offset, old, new in edits]
+        if (source is None and all(len(old) == len(new) for _, old, new in edits)
+                and os.stat(file_path).st_nlink == 1):
+            with open(file_path, 'r+b') as f:
+                # Check every edit before writing any of them
+                for offset, old, _ in edits:
+                    f.seek(offset)
+                    if f.read(len(old)) != old:
+                        raise ValueError(f"Color index out of date at offset {offset}")
+                for offset, _, new in edits:
+                    f.seek(offset)
+                    f.write(new)
+            return
+        
+        with ColorReplacer._map_file(source or file_path) as data:
+            for offset, old, _ in edits:
+                if data[offset:offset + len(old)] != old:
+                    raise ValueError(f"Color index out of date at offset {offset}")
+            temp_path = ColorReplacer._write_spliced(file_path, data, edits)
+        os.replace(temp_path, file_path)
+    
+    @staticmethod
+    def _pristine_path(extracted_dir, rel_path):
+        """Return where the pristine snapshot of a bundle lives."""
+        return os.path.join(extracted_dir, ColorReplacer.PRISTINE_DIR, *rel_path.split('/'))
+    
+    @staticmethod
+    def _source_file(extracted_dir, file_path, rel_path, color_index, read_only=False):
+        """Return the file a bundle is themed from.
+        
+        That is its pristine snapshot, or the bundle itself if it was never
+        themed. A bundle changed by something else since the last apply
+        (e.g. the music code) has that change carried over into its
+        snapshot (see _rebase_snapshot); the themed content itself never
+        becomes the snapshot.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            file_path (str): Bundle on disk
+            rel_path (str): Key of the bundle in the index
+            color_index (dict): Loaded color index; entries that no longer
+                describe the source are dropped
+            read_only (bool): Don't write anything (plan_colors): a changed
+                bundle's rebased snapshot is built in memory instead
+            
+        Returns:
+            str or bytes: Path of the pristine snapshot or of the bundle, or
+                the rebased snapshot's contents in read-only mode
+        """
+        pristine = ColorReplacer._pristine_path(extracted_dir, rel_path)
+        entry = color_index['files'].get(rel_path)
+        if not os.path.isfile(pristine):
+            if entry is not None and 'output' in entry:
+                color_index['files'].pop(rel_path)
+            return file_path
+        
+        if entry is None or entry.get('stamp') != ColorReplacer._stamp(pristine) or 'applied' not in entry:
+            # What the bundle carries is unknown; the next apply rebuilds
+            # it from the snapshot
+            print(f"⚠ No color index for {rel_path}, theming it from its pristine snapshot")
+            color_index['files'].pop(rel_path, None)
+            return pristine
+        if entry.get('output') != ColorReplacer._stamp(file_path):
+            if read_only:
+                with ColorReplacer._map_file(pristine) as data, ColorReplacer._map_file(file_path) as current:
+                    pieces, _ = ColorReplacer._rebased(data, current, entry['applied'])
+                # The entry describes the snapshot on disk, not this one
+                color_index['files'].pop(rel_path)
+                return b''.join(pieces)
+            print(f"⚠ {rel_path} changed since it was themed, carrying the change into its pristine snapshot")
+            ColorReplacer._rebase_snapshot(extracted_dir, file_path, rel_path, color_index)
+            try:
+                ColorReplacer.save_color_index(extracted_dir, color_index)
+            except OSError as e:
+                print(f"⚠ Could not save color index: {e}")
+        return pristine
+    
+    @staticmethod
+    def _common_prefix(a, b, step=65536):
+        """Return the length of the common prefix of two byte strings."""
+        limit = min(len(a), len(b))
+        position = 0
+        # Compare whole blocks first (memcmp), then the differing one
+        while position < limit and a[position:min(position + step, limit)] == b[position:min(position + step, limit)]:
+            position += step
+        position = min(position, limit)
+        end = min(position + step, limit)
+        while position < end and a[position] == b[position]:
+            position += 1
+        return position
+    
+    @staticmethod
+    def _rebased(data, current, applied):
+        """Work out the snapshot a changed themed bundle corresponds to.
+        
+        The bundle is compared with what the last apply wrote (the snapshot
+        plus the index entry's 'applied' edits). The stretch between their
+        common prefix and suffix is the outside change: the snapshot gets
+        that stretch, and the applied edits outside it move along, so the
+        bundle is again exactly snapshot + applied. Applied edits the change
+        overlaps are dropped, the changed text is taken as it is.
+        
+        Args:
+            data (bytes): Snapshot contents (bytes or mmap)
+            current (bytes): Bundle contents (bytes or mmap)
+            applied (list): The index entry's 'applied' edits
+            
+        Returns:
+            tuple: (pieces, applied) - the new snapshot as a list of byte
+                strings, and the applied edits it keeps, at their offsets
+                into the new snapshot
+        """
+        applied = sorted((offset, old.encode('latin-1'), new.encode('latin-1'))
+                         for offset, old, new in applied)
+        # What the last apply wrote
+        pieces = []
+        position = 0
+        for offset, old, new in applied:
+            pieces.append(data[position:offset])
+            pieces.append(new)
+            position = offset + len(old)
+        pieces.append(data[position:])
+        expected = b''.join(pieces)
+        
+        start = ColorReplacer._common_prefix(expected, current)
+        end = len(expected) - ColorReplacer._common_prefix(
+            expected[start:][::-1], current[start:][::-1])
+        growth = len(current) - len(expected)
+        
+        # Widen the changed stretch over the applied edits it touches,
+        # then map it back to snapshot offsets
+        kept = []
+        low, high = start, end
+        shift = 0
+        for offset, old, new in applied:
+            written = offset + shift
+            if written < end and written + len(new) > start:
+                low = min(low, written)
+                high = max(high, written + len(new))
+            else:
+                kept.append((offset, old, new))
+            shift += len(new) - len(old)
+        first, last = low, high
+        shift = 0
+        for offset, old, new in applied:
+            if offset + shift + len(new) <= low:
+                first -= len(new) - len(old)
+            if offset + shift + len(new) <= high:
+                last -= len(new) - len(old)
+            shift += len(new) - len(old)
+        replacement = current[low:high + growth]
+        
+        delta = len(replacement) - (last - first)
+        applied = [
+            [offset + delta if offset >= last else offset, old.decode('latin-1'), new.decode('latin-1')]
+            for offset, old, new in kept
+        ]
+        return [data[:first], replacement, data[last:]], applied
+    
+    @staticmethod
+    def _rebase_snapshot(extracted_dir, file_path, rel_path, color_index):
+        """Carry a change made to a themed bundle over into its snapshot.
+        
+        See _rebased; the new snapshot replaces the old one atomically.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            file_path (str): Bundle on disk
+            rel_path (str): Key of the bundle in the index
+            color_index (dict): Loaded color index; the bundle's entry is
+                rebuilt for the new snapshot
+        """
+        pristine = ColorReplacer._pristine_path(extracted_dir, rel_path)
+        entry = color_index['files'][rel_path]
+        is_asset = not entry['variables']
+        with ColorReplacer._map_file(pristine) as data, ColorReplacer._map_file(file_path) as current:
+            pieces, applied = ColorReplacer._rebased(data, current, entry['applied'])
+            temp_path = pristine + '.tmp'
+            with open(temp_path, 'wb') as f:
+                for piece in pieces:
+                    f.write(piece)
+        os.replace(temp_path, pristine)
+        
+        color_index['files'].pop(rel_path)
+        if is_asset:
+            # Text assets are indexed for the theme bundles' literals, not
+            # for variables of their own (see _apply_assets)
+            tracked = set()
+            for bundle in color_index['files'].values():
+                for value in bundle['variables'].values():
+                    tracked.update(ColorReplacer._literal_forms(value))
+            tracked = set(ColorReplacer._asset_replacements({literal: literal for literal in tracked}))
+            ColorReplacer._index_assets([(pristine, rel_path)], color_index, tracked)
+            entry = color_index['files'][rel_path]
+        else:
+            entry = ColorReplacer._fresh_index_entry(color_index, pristine, rel_path)
+        entry['applied'] = applied
+        entry['output'] = ColorReplacer._stamp(file_path)
+    
+    @staticmethod
+    def _snapshot(extracted_dir, file_path, rel_path):
+        """Keep the current content of a bundle as its pristine snapshot.
+        
+        The snapshot is a hardlink, so it costs no copy: the bundle is only
+        ever rewritten through a temp file and a rename, which leaves the
+        linked original untouched (copy-on-write).
+        
+        Returns:
+            str: Path of the snapshot
+        """
+        pristine = ColorReplacer._pristine_path(extracted_dir, rel_path)
+        os.makedirs(os.path.dirname(pristine), exist_ok=True)
+        temp_path = pristine + '.tmp'
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        try:
+            os.link(file_path, temp_path)
+        except OSError:
+            # Filesystem without hardlinks - copy instead
+            shutil.copy2(file_path, temp_path)
+        os.replace(temp_path, pristine)
+        return pristine
+    
+    @staticmethod
+    def _step_records(before, after):
+        """Turn two sets of pristine edits into the edits between them.
+        
+        Args:
+            before (list): (offset, old, new) edits the bundle carries now,
+                in pristine coordinates
+            after (list): (offset, old, new) edits it will carry
+            
+        Returns:
+            list: (offset, old, new) records in the coordinates of the
+                current bundle, or None if the two sets edit overlapping
+                spans and can't be expressed as literal records
+        """
+        before = {offset: (old, new) for offset, old, new in before}
+        after = {offset: (old, new) for offset, old, new in after}
+        records = []
+        shift = 0
+        end = 0
+        for offset in sorted(before.keys() | after.keys()):
+            original = (before.get(offset) or after[offset])[0]
+            if offset < end:
+                return None
+            end = offset + len(original)
+            current = before[offset][1] if offset in before else original
+            target = after[offset][1] if offset in after else original
+            if current != target:
+                records.append((offset + shift, current, target))
+            shift += len(current) - len(original)
+        return records
+    
+    @staticmethod
+    def _advance_applied(applied, records):
+        """Move a bundle's pristine edits past replayed records.
+        
+        Args:
+            applied (list): (offset, old, new) edits the bundle carries, in
+                pristine coordinates
+            records (list): (offset, old, new) records in bundle coordinates
+            
+        Returns:
+            list: The pristine edits after the records, or None if a
+                record doesn't line up with the literals of the snapshot
+        """
+        applied = sorted(tuple(edit) for edit in applied)
+        starts = []
+        shift = 0
+        for offset, old, new in applied:
+            starts.append(offset + shift)
+            shift += len(new) - len(old)
+        shifts = [0, *accumulate(len(new) - len(old) for _, old, new in applied)]
+        
+        current = {offset: (old, new) for offset, old, new in applied}
+        for position, old, new in records:
+            index = bisect.bisect_left(starts, position)
+            if index < len(starts) and starts[index] == position:
+                offset = applied[index][0]
+            elif index and position < starts[index - 1] + len(applied[index - 1][2]):
+                return None
+            else:
+                offset = position - shifts[index]
+            original = current[offset][0] if offset in current else old
+            if new == original:
+                current.pop(offset, None)
+            else:
+                current[offset] = (original, new)
+        return sorted((offset, old, new) for offset, (old, new) in current.items())
+    
+    @staticmethod
+    def _scanned_edits(source, color_mappings):
+        """Find the edits of a mapping by scanning a bundle (no index).
+        
+        Args:
+            source (str or bytes): Bundle or pristine snapshot on disk, or
+                the contents of one (see _source_file)
+            color_mappings (dict): Variable name -> new color
+            
+        Returns:
+            tuple: (edits sorted by offset, {old: new}, {old: variable name},
+                {variable: current value})
+        """
+        file_path = source if isinstance(source, str) else None
+        with ColorReplacer._map_file(file_path) if file_path else nullcontext(source) as data:
+            print(f"File size: {len(data)} bytes")
+            
+            # Get current default values for each variable
+            defaults = ColorReplacer._extract_default_values(data, list(color_mappings))
+            print(f"Found {len(defaults)} default values")
+            if not defaults:
+                print(f"⚠ No default values found in {file_path or 'rebased snapshot'}")
+            
+            # Find every color literal (hex and its RGB forms) in one pass
+            replacements, owners = ColorReplacer._replacement_map(defaults, color_mappings)
+            edits = [(offset, old.decode('latin-1'), new.decode('latin-1'))
+                     for offset, old, new in ColorReplacer._match_edits(data, replacements, file_path)]
+        return edits, replacements, owners, defaults
+    
+    @staticmethod
+    def _theme_file(extracted_dir, file_path, rel_path, source, entry, edits):
+        """Write a bundle as its pristine content plus a set of edits.
+        
+        The first write of a bundle snapshots it; every later one starts
+        from that snapshot, so the result depends only on the target theme,
+        never on what was applied before.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            file_path (str): Bundle on disk
+            rel_path (str): Key of the bundle in the index
+            source (str): From _source_file
+            entry (dict): Index entry of the source, updated in place
+            edits (list): (offset, old, new) edits into the source
+            
+        Returns:
+            list: Records of what changed in the bundle (see _step_records),
+                empty if nothing did, or None if the change can't be recorded
+            
+        Raises:
+            ValueError: If the source disagrees with its index entry
+        """
+        if source == file_path:
+            applied = []
+        elif 'applied' in entry:
+            applied = [tuple(edit) for edit in entry['applied']]
+        else:
+            applied = None
+        if applied == edits:
+            return []
+        records = ColorReplacer._step_records(applied, edits) if applied is not None else None
+        
+        if source == file_path:
+            source = ColorReplacer._snapshot(extracted_dir, file_path, rel_path)
+            # Same content, possibly a new stamp (copied rather than linked)
+            entry['stamp'] = ColorReplacer._stamp(source)
+        ColorReplacer._write_edits(file_path, edits, source=source)
+        entry['applied'] = [list(edit) for edit in edits]
+        entry['output'] = ColorReplacer._stamp(file_path)
+        return records
+    
+    @staticmethod
+    def _apply_bundle(extracted_dir, main_file, rel_path, color_index, color_mappings):
+        """Apply a mapping to one bundle, from its pristine snapshot.
+        
+        The edits come from the color index of the snapshot; a mapping that
+        names variables the index doesn't cover is found by scanning it.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            main_file (Path): Bundle on disk
+            rel_path (str): Key of the bundle in the index
+            color_index (dict): Loaded color index, updated in place
+            color_mappings (dict): Variable name -> new color
+            
+        Returns:
+            tuple: (records of what changed or None, {old literal: new literal},
+                occurrences differing from the pristine bundle)
+        """
+        source = ColorReplacer._source_file(extracted_dir, str(main_file), rel_path, color_index)
+        kept = {}
+        for attempt in range(2):
+            entry = ColorReplacer._fresh_index_entry(color_index, source, rel_path)
+            entry.update(kept)
+            planned = ColorReplacer._indexed_edits(entry, color_mappings)
+            if planned is None:
+                print("Mapping names variables outside the color index, scanning file")
+                planned = ColorReplacer._scanned_edits(source, color_mappings)
+            edits, replacements, owners, _ = planned
+            edits = [edit for edit in edits if edit[1] != edit[2]]
+            print(f"Color index: {len(edits)} occurrence(s) differ from the pristine bundle")
+            try:
+                records = ColorReplacer._theme_file(extracted_dir, str(main_file), rel_path, source, entry, edits)
+                break
+            except ValueError as e:
+                if attempt:
+                    raise
+                # Re-index the source, keeping track of what the bundle carries
+                print(f"⚠ {e}, scanning file")
+                kept = {key: entry[key] for key in ('applied', 'output') if key in entry}
+                color_index['files'].pop(rel_path)
+        
+        counts = {}
+        for _, old, _ in edits:
+            counts[old] = counts.get(old, 0) + 1
+        for old_pattern, old_count in counts.items():
+            print(f"    ✓ {owners[old_pattern]}: '{old_pattern}' -> '{replacements[old_pattern]}' ({old_count} occurrence(s))")
+        return records, replacements, len(edits)
+    
+    @staticmethod
+    def _asset_files(extracted_dir, skip):
+        """Return the text assets themed in whole-bundle mode.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            skip (set): Relative paths handled elsewhere (main.*.js)
+            
+        Returns:
+            list: (path, relative path) tuples
+        """
+        assets = []
+        for root, dirs, files in os.walk(extracted_dir):
+            # RUIE bookkeeping files and folders start with a dot
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for file in sorted(files):
+                if file.startswith('.') or Path(file).suffix.lower() not in ColorReplacer.TEXT_ASSET_EXTENSIONS:
+                    continue
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, extracted_dir).replace(os.sep, '/')
+                if rel_path not in skip:
+                    assets.append((file_path, rel_path))
+        return assets
+    
+    @staticmethod
+    def _asset_sources(extracted_dir, color_index, skip, read_only=False):
+        """Return the text assets with the file each is themed from.
+        
+        Returns:
+            list: (path, source, relative path) tuples, see _source_file
+        """
+        return [
+            (file_path, ColorReplacer._source_file(extracted_dir, file_path, rel_path, color_index, read_only),
+             rel_path)
+            for file_path, rel_path in ColorReplacer._asset_files(extracted_dir, skip)
+        ]
+    
+    @staticmethod
+    def _index_assets(assets, color_index, tracked):
+        """Bring the index entries of text assets up to date.
+        
+        New or changed assets are first checked with a plain byte search
+        for any tracked literal; assets without one are indexed as empty
+        and never scanned. The remaining candidates are scanned in parallel.
+        
+        Args:
+            assets (list): (path, relative path) tuples
+            color_index (dict): Loaded color index, updated in place
+            tracked (set): Literals of the theme's current values
+        """
+        encoded = sorted({literal.encode('latin-1') for literal in tracked}, key=len)
+        # A literal that contains a shorter one (rgb(1,2,3) / 1,2,3) can't
+        # be present without it
+        needles = [literal for index, literal in enumerate(encoded)
+                   if not any(shorter in literal for shorter in encoded[:index])]
+        
+        candidates = {}
+        for file_path, rel_path in assets:
+            stamp = ColorReplacer._stamp(file_path)
+            entry = color_index['files'].get(rel_path)
+            if entry is not None and entry.get('stamp') == stamp:
+                continue
+            with ColorReplacer._map_file(file_path) as data:
+                found = any(data.find(needle) != -1 for needle in needles)
+            if found:
+                candidates[file_path] = (rel_path, stamp)
+            else:
+                color_index['files'][rel_path] = {'variables': {}, 'literals': {}, 'stamp': stamp}
+        
+        if candidates:
+            print(f"Scanning {len(candidates)} candidate asset(s) of {len(assets)}")
+        for file_path, matches in ColorReplacer._scan_files(list(candidates), tracked).items():
+            rel_path, stamp = candidates[file_path]
+            offsets = {}
+            for offset, literal in matches:
+                offsets.setdefault(literal.decode('latin-1'), []).append(offset)
+            color_index['files'][rel_path] = {'variables': {}, 'literals': offsets, 'stamp': stamp}
+    
+    @staticmethod
+    def _apply_assets(extracted_dir, color_index, skip, tracked, replacements, applied):
+        """Apply the bundle's literal replacements to the other text assets.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            color_index (dict): Loaded color index, updated in place
+            skip (set): Relative paths already themed (main.*.js)
+            tracked (set): Literals of the theme's pristine values
+            replacements (dict): Old literal -> new literal
+            applied (dict): Receives relative path -> (records, occurrences)
+            
+        Returns:
+            int: Number of assets modified
+        """
+        replacements = ColorReplacer._asset_replacements(replacements)
+        tracked = set(ColorReplacer._asset_replacements({literal: literal for literal in tracked}))
+        assets = ColorReplacer._asset_sources(extracted_dir, color_index, skip)
+        print(f"\n--- Whole bundle: {len(assets)} text asset(s) ---")
+        ColorReplacer._index_assets([(source, rel_path) for _, source, rel_path in assets], color_index, tracked)
+        
+        modified = 0
+        for file_path, source, rel_path in assets:
+            entry = color_index['files'][rel_path]
+            edits = sorted(
+                (offset, old, replacements[old])
+                for old, offsets in entry['literals'].items() if old in replacements and replacements[old] != old
+                for offset in offsets
+            )
+            try:
+                records = ColorReplacer._theme_file(extracted_dir, file_path, rel_path, source, entry, edits)
+            except (OSError, ValueError) as e:
+                print(f"✗ Error processing {rel_path}: {e}")
+                color_index['files'].pop(rel_path, None)
+                continue
+            if records == []:
+                continue
+            applied[rel_path] = (records, len(edits))
+            modified += 1
+            print(f"✓ Modified: {rel_path} ({len(edits)} replacement(s))")
+        return modified
+    
+    @staticmethod
+    def _revert_assets(extracted_dir, color_index, skip, applied):
+        """Restore the text assets a whole-bundle apply themed.
+        
+        An apply without whole_bundle only themes main.*.js, so assets
+        still carrying edits are rebuilt from their pristine snapshots.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            color_index (dict): Loaded color index, updated in place
+            skip (set): Relative paths themed by this apply (main.*.js)
+            applied (dict): Receives relative path -> (records, occurrences)
+            
+        Returns:
+            list: Relative paths of the assets restored
+        """
+        themed = [rel_path for rel_path, entry in color_index['files'].items()
+                  if rel_path not in skip and entry.get('applied')]
+        restored = []
+        for rel_path in themed:
+            file_path = os.path.join(extracted_dir, *rel_path.split('/'))
+            if not os.path.isfile(file_path):
+                color_index['files'].pop(rel_path, None)
+                continue
+            try:
+                source = ColorReplacer._source_file(extracted_dir, file_path, rel_path, color_index)
+                entry = color_index['files'].get(rel_path)
+                if source == file_path or entry is None:
+                    continue
+                records = ColorReplacer._theme_file(extracted_dir, file_path, rel_path, source, entry, [])
+            except (OSError, ValueError) as e:
+                print(f"✗ Error restoring {rel_path}: {e}")
+                color_index['files'].pop(rel_path, None)
+                continue
+            if records != []:
+                applied[rel_path] = (records, 0)
+                restored.append(rel_path)
+                print(f"✓ Restored: {rel_path}")
+        return restored
+
+    @staticmethod
+    def load_history(extracted_dir):
+        """Load the undo/redo log of an extraction.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            dict: {'position': steps applied, 'steps': [{'colors', 'files'}]},
+                where 'files' maps relative paths to [offset, old, new]
+                edits in the coordinates of the file before the step
+        """
+        history_path = os.path.join(extracted_dir, ColorReplacer.HISTORY_NAME)
+        try:
+            with open(history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            if isinstance(history.get('steps'), list) and isinstance(history.get('position'), int):
+                return history
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {'position': 0, 'steps': []}
+    
+    @staticmethod
+    def _save_history(extracted_dir, history):
+        """Write the undo/redo log (temp file + atomic replace)."""
+        history_path = os.path.join(extracted_dir, ColorReplacer.HISTORY_NAME)
+        with open(history_path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(json.dumps(history, separators=(',', ':')))
+        os.replace(history_path + '.tmp', history_path)
+    
+    @staticmethod
+    def _record_step(extracted_dir, color_mappings, applied):
+        """Append an applied step to the log, dropping any redo steps.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            color_mappings (dict): The mapping that was applied
+            applied (dict): Relative path -> (offset, old, new) records, or
+                None for a change that can't be recorded
+        """
+        if any(records is None for records in applied.values()):
+            # Earlier steps can't be reached without undoing this one
+            print("⚠ This apply can't be undone; color history cleared")
+            ColorReplacer._save_history(extracted_dir, {'position': 0, 'steps': []})
+            return
+        history = ColorReplacer.load_history(extracted_dir)
+        steps = history['steps'][:history['position']]
+        steps.append({
+            'colors': color_mappings,
+            'files': {rel_path: [list(edit) for edit in edits] for rel_path, edits in applied.items()},
+        })
+        steps = steps[-ColorReplacer.HISTORY_LIMIT:]
+        ColorReplacer._save_history(extracted_dir, {'position': len(steps), 'steps': steps})
+    
+    @staticmethod
+    def _inverse_edits(edits):
+        """Return the edits that turn a file back into its pre-step state.
+        
+        Args:
+            edits (list): (offset, old, new) edits in pre-step coordinates
+            
+        Returns:
+            list: (offset, new, old) edits in post-step coordinates
+        """
+        inverse = []
+        shift = 0
+        for offset, old, new in edits:
+            inverse.append((offset + shift, new, old))
+            shift += len(new) - len(old)
+        return inverse
+    
+    @staticmethod
+    def _replay(extracted_dir, files):
+        """Write a set of recorded edits and move the color index along.
+        
+        Every file is checked before any is written, so a file that changed
+        since the step was recorded aborts the whole replay.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            files (dict): Relative path -> (offset, old, new) edits
+            
+        Raises:
+            ValueError: If a path leaves the extraction or a file no longer
+                holds the expected literals
+        """
+        root = os.path.realpath(extracted_dir)
+        targets = []
+        for rel_path, edits in files.items():
+            # SECURITY: The log lives in the extraction folder; never follow it outside
+            file_path = os.path.realpath(os.path.join(root, rel_path))
+            if os.path.commonpath([root, file_path]) != root or not os.path.isfile(file_path):
+                raise ValueError(f"Invalid path in color history: {rel_path}")
+            edits = sorted((int(offset), old, new) for offset, old, new in edits)
+            with ColorReplacer._map_file(file_path) as data:
+                for offset, old, _ in edits:
+                    if data[offset:offset + len(old)] != old.encode('latin-1'):
+                        raise ValueError(f"{rel_path} changed since this color edit; re-extract to go back further")
+            targets.append((file_path, rel_path, edits))
+        
+        color_index = ColorReplacer.load_color_index(extracted_dir)
+        for file_path, rel_path, edits in targets:
+            # The pristine snapshot and its index don't change; only the
+            # record of what the bundle carries on top of it moves along
+            tracked = ColorReplacer._source_file(extracted_dir, file_path, rel_path, color_index) != file_path
+            ColorReplacer._write_edits(file_path, edits)
+            entry = color_index['files'].get(rel_path)
+            applied = None
+            if tracked and entry is not None and 'applied' in entry:
+                applied = ColorReplacer._advance_applied(entry['applied'], edits)
+            if applied is not None:
+                entry['applied'] = [list(edit) for edit in applied]
+                entry['output'] = ColorReplacer._stamp(file_path)
+            else:
+                color_index['files'].pop(rel_path, None)
+        try:
+            ColorReplacer.save_color_index(extracted_dir, color_index)
+        except OSError as e:
+            print(f"⚠ Could not save color index: {e}")
+    
+    @staticmethod
+    def undo(extracted_dir):
+        """Reverse the last applied color step.
+        
+        Only the recorded offsets are edited: no scan, no re-extraction.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            dict: {'files', 'edits', 'canUndo', 'canRedo'}, or None when
+                there is nothing to undo
+            
+        Raises:
+            ValueError: If the files no longer match the log
+        """
+        history = ColorReplacer.load_history(extracted_dir)
+        if history['position'] == 0:
+            return None
+        step = history['steps'][history['position'] - 1]
+        files = {rel_path: ColorReplacer._inverse_edits(sorted(tuple(edit) for edit in edits))
+                 for rel_path, edits in step['files'].items()}
+        ColorReplacer._replay(extracted_dir, files)
+        history['position'] -= 1
+        ColorReplacer._save_history(extracted_dir, history)
+        return ColorReplacer._history_result(history, files)
+    
+    @staticmethod
+    def redo(extracted_dir):
+        """Replay the last undone color step.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            
+        Returns:
+            dict: {'files', 'edits', 'canUndo', 'canRedo'}, or None when
+                there is nothing to redo
+            
+        Raises:
+            ValueError: If the files no longer match the log
+        """
+        history = ColorReplacer.load_history(extracted_dir)
+        if history['position'] >= len(history['steps']):
+            return None
+        step = history['steps'][history['position']]
+        ColorReplacer._replay(extracted_dir, step['files'])
+        history['position'] += 1
+        ColorReplacer._save_history(extracted_dir, history)
+        return ColorReplacer._history_result(history, step['files'])
+    
+    @staticmethod
+    def _history_result(history, files):
+        """Summarize an undo/redo for the API."""
+        return {
+            'files': len(files),
+            'edits': sum(len(edits) for edits in files.values()),
+            'canUndo': history['position'] > 0,
+            'canRedo': history['position'] < len(history['steps']),
+        }
+    
+    @staticmethod
+    def _plan_key(extracted_dir, color_mappings, whole_bundle):
+        """Hash the bundle state and a mapping into a plan cache key.
+        
+        The bundle state is the size/mtime stamp of every file the plan
+        reads - the same check the color index trusts - so the key costs a
+        few stat calls instead of hashing megabytes. Mapping order matters
+        (the first mapping of a literal wins), so keys aren't sorted.
+        """
+        main_files = ColorReplacer._bundle_files(extracted_dir)
+        files = list(main_files)
+        if whole_bundle:
+            files.extend(ColorReplacer._asset_files(extracted_dir, {rel_path for _, rel_path in main_files}))
+        state = []
+        for file_path, rel_path in files:
+            pristine = ColorReplacer._pristine_path(extracted_dir, rel_path)
+            pristine_stamp = ColorReplacer._stamp(pristine) if os.path.isfile(pristine) else None
+            state.append((rel_path, ColorReplacer._stamp(file_path), pristine_stamp))
+        
+        digest = hashlib.sha256()
+        digest.update(os.path.abspath(extracted_dir).encode('utf-8'))
+        digest.update(json.dumps(state).encode('utf-8'))
+        bundle_hash = digest.hexdigest()
+        mapping_hash = hashlib.sha256(
+            json.dumps([list(color_mappings.items()), bool(whole_bundle)]).encode('utf-8')
+        ).hexdigest()
+        return bundle_hash, mapping_hash
+    
+    @staticmethod
+    def plan_colors(extracted_dir, color_mappings, whole_bundle=False):
+        """Compute what apply_colors would change, without writing anything.
+        
+        Plans come from the color index (bundles it doesn't cover yet are
+        scanned in memory; the sidecar isn't rewritten) and are cached by
+        (bundle state, mapping). Like an apply, a plan starts from the
+        pristine bundles, so offsets are into those; for a bundle changed
+        since it was themed, that is the snapshot an apply would rebase it
+        onto, built in memory.
+        
+        Args:
+            extracted_dir (str): Root directory of extracted launcher
+            color_mappings (dict): Variable name -> new color
+            whole_bundle (bool): Plan for every text asset, as apply_colors does
+            
+        Returns:
+            tuple: (plan, cached) where plan is
+                {
+                    'variables': {name: {'from', 'to', 'occurrences'}},
+                    'missing': [names not defined in any bundle],
+                    'files': {relative path: {
+                        'occurrences': int,
+                        'edits': {variable: {old literal: {'new': literal, 'offsets': [byte offsets]}}}
+                    }},
+                    'occurrences': int
+                }
+        """
+        key = ColorReplacer._plan_key(extracted_dir, color_mappings, whole_bundle)
+        with ColorReplacer._plan_lock:
+            plan = ColorReplacer._plan_cache.get(key)
+            if plan is not None:
+                ColorReplacer._plan_cache.move_to_end(key)
+                return plan, True
+        
+        color_index = ColorReplacer.load_color_index(extracted_dir)
+        main_files = ColorReplacer._bundle_files(extracted_dir)
+        plan = {'variables': {}, 'missing': [], 'files': {}, 'occurrences': 0}
+        all_replacements = {}
+        all_owners = {}
+        tracked = set()
+        
+        def add_file(rel_path, edits, owners):
+            if not edits:
+                return
+            file_plan = {'occurrences': len(edits), 'edits': {}}
+            for offset, old, new in edits:
+                var_name = owners[old]
+                literal = file_plan['edits'].setdefault(var_name, {}).setdefault(old, {'new': new, 'offsets': []})
+                literal['offsets'].append(offset)
+                plan['variables'][var_name]['occurrences'] += 1
+            plan['files'][rel_path] = file_plan
+            plan['occurrences'] += len(edits)
+        
+        found = set()
+        for main_file, rel_path in main_files:
+            source = ColorReplacer._source_file(extracted_dir, str(main_file), rel_path, color_index, read_only=True)
+            if isinstance(source, str):
+                entry = ColorReplacer._fresh_index_entry(color_index, source, rel_path)
+            else:
+                entry = ColorReplacer._index_bundle(source)
+            planned = ColorReplacer._indexed_edits(entry, color_mappings)
+            if planned is None:
+                # Variables outside the index: scan this bundle in memory
+                planned = ColorReplacer._scanned_edits(source, color_mappings)
+            edits, replacements, owners, defaults = planned
+            for value in entry['variables'].values():
+                tracked.update(ColorReplacer._literal_forms(value))
+            for old, new in replacements.items():
+                all_replacements.setdefault(old, new)
+                all_owners.setdefault(old, owners[old])
+            for var_name, old in defaults.items():
+                found.add(var_name)
+                plan['variables'].setdefault(var_name, {
+                    'from': old, 'to': color_mappings[var_name].strip(), 'occurrences': 0
+                })
+            add_file(rel_path, [edit for edit in edits if edit[1] != edit[2]], owners)
+        
+        if whole_bundle and all_replacements:
+            skip = {rel_path for _, rel_path in main_files}
+            all_replacements = ColorReplacer._asset_replacements(all_replacements)
+            for old, owner in list(all_owners.items()):
+                if old.startswith('rgb('):
+                    all_owners['rgba(' + old[4:-1] + ','] = owner
+            tracked = set(ColorReplacer._asset_replacements({literal: literal for literal in tracked}))
+            assets = ColorReplacer._asset_sources(extracted_dir, color_index, skip, read_only=True)
+            ColorReplacer._index_assets([(source, rel_path) for _, source, rel_path in assets
+                                         if isinstance(source, str)], color_index, tracked)
+            for _, source, rel_path in assets:
+                if isinstance(source, str):
+                    literals = color_index['files'][rel_path]['literals']
+                else:
+                    literals = {}
+                    for offset, literal in ColorReplacer._scan_literals(source, tracked):
+                        literals.setdefault(literal.decode('latin-1'), []).append(offset)
+                edits = sorted(
+                    (offset, old, all_replacements[old])
+                    for old, offsets in literals.items() if old in all_replacements and all_replacements[old] != old
+                    for offset in offsets
+                )
+                add_file(rel_path, edits, all_owners)
+        
+        plan['missing'] = [var_name for var_name in color_mappings if var_name not in found]
+        with ColorReplacer._plan_lock:
+            ColorReplacer._plan_cache[key] = plan
+            while len(ColorReplacer._plan_cache) > ColorReplacer.PLAN_CACHE_SIZE:
+                ColorReplacer._plan_cache.popitem(last=False)
+        return plan, False
+
+    @staticmethod
+    def apply_colors(extracted_dir, color_mappings, progress_callback=None, whole_bundle=False, file_counts=None,
+                     reverted=None):
         """Apply color replacements to launcher JavaScript files.
         
         This is the main entry point for color replacement. It:
         1. Finds main.*.js files in the extracted launcher
-        2. Extracts current default color values
-        3. Replaces them with user-selected colors
+        2. Looks up the pristine default color values in the color index
+        3. Replaces their literals with user-selected colors
         4. Supports multiple color formats (hex, RGB, rgb() function)
         
+        The mapping is the whole target theme: every bundle is rebuilt from
+        its pristine snapshot (taken the first time it is themed), so
+        variables left out of the mapping keep their original colors and
+        the result never depends on which presets were applied before.
+        Bundles missing from the color index (or changed since) are scanned
+        once and indexed; the snapshots never change, so neither does their
+        index.
+        
+        With whole_bundle the hex and rgb()/rgba() literals replaced in
+        main.*.js are also replaced in every other text asset (see
+        TEXT_ASSET_EXTENSIONS and _asset_replacements); without it, assets
+        themed by an earlier whole-bundle apply are restored from their
+        pristine snapshots and listed in reverted.
+        
         Args:
             extracted_dir (str): Root directory of extracted launcher
             color_mappings (dict): Dictionary mapping color variable names to new colors
@@ -180,12 +1864,20 @@ class ColorReplacer:
                 }
             progress_callback (function): Optional callback for progress updates
                 Called as: progress_callback(current, total, status_message)
+            whole_bundle (bool): Also theme lazy-loaded chunks, CSS and SVG
+            file_counts (dict): Optional; receives relative path ->
+                occurrences differing from the pristine file, for every
+                modified file
+            reverted (list): Optional; receives the relative paths of the
+                assets restored because whole_bundle is off
                 
         Returns:
             int: Number of files successfully modified
         """
         success_count = 0
         error_count = 0
+        if file_counts is None:
+            file_counts = {}
 
         try:
             # Validate extracted directory
@@ -197,8 +1889,7 @@ class ColorReplacer:
             print(f"Color mappings (variables -> new colors): {color_mappings}")
             print(f"Total color mappings: {len(color_mappings)}")
 
-            extracted_root = Path(extracted_dir)
-            main_files = list(extracted_root.glob('**/main.*.js'))
+            main_files = ColorReplacer._bundle_files(extracted_dir)
 
             if not main_files:
                 print("❌ No main.*.js files found")
@@ -208,88 +1899,29 @@ class ColorReplacer:
                 return 0
 
             print(f"✓ Found {len(main_files)} main.*.js file(s)")
-            total_files = len(main_files)
+            total_files = len(main_files) + (1 if whole_bundle else 0)
             if progress_callback:
                 progress_callback(0, total_files, f"Found {total_files} file(s) to process...")
 
+            color_index = ColorReplacer.load_color_index(extracted_dir)
+            all_replacements = {}
+            applied = {}
+
             # Process each main.*.js file
-            for index, main_file in enumerate(main_files):
+            for index, (main_file, rel_path) in enumerate(main_files):
                 try:
                     if progress_callback:
                         progress_callback(index, total_files, f"Processing {main_file.name}...")
                     
                     print(f"\n--- Processing {main_file.name} ---")
-                    content = ColorReplacer._read_text(main_file)
-                    print(f"File size: {len(content)} bytes")
-                    
-                    # Extract all variable names from the color mappings
-                    variable_names = list(color_mappings.keys())
-                    print(f"Looking for {len(variable_names)} variables...")
-                    
-                    # Get current default values for each variable
-                    defaults = ColorReplacer._extract_default_values(content, variable_names)
-                    print(f"Found {len(defaults)} default values")
-
-                    if not defaults:
-                        print(f"⚠ No default values found in {main_file}")
-                        continue
-
-                    file_modified = False
-
-                    # Replace each color variable
-                    for var_name, new_color in color_mappings.items():
-                        old_value = defaults.get(var_name)
-                        if not old_value:
-                            print(f"  ⚠ {var_name}: old value not found in defaults")
-                            continue
-
-                        new_value = new_color.strip()
-                        if not new_value:
-                            print(f"  ⚠ {var_name}: new value is empty")
-                            continue
-
-                        # Validate new color format (hex or RGB)
-                        if not (new_value.startswith('#') or re.match(r'^\d{1,3}\s+\d{1,3}\s+\d{1,3}$', new_value)):
-                            print(f"  ⚠ {var_name}: invalid new color format '{new_value}'")
-                            continue
-
-                        print(f"  → {var_name}: '{old_value}' → '{new_value}'")
-                        
-                        # Replace direct color values in the file
-                        if old_value in content:
-                            old_count = content.count(old_value)
-                            content = content.replace(old_value, new_value)
-                            print(f"    ✓ Replaced {old_count} occurrence(s) of '{old_value}'")
-                            file_modified = True
-                        else:
-                            print(f"    ⚠ Old value '{old_value}' not found in file")
-
-                        # Also try RGB conversion if applicable (hex color to RGB format)
-                        if old_value.startswith('#'):
-                            old_rgb = ColorReplacer._hex_to_rgb_string(old_value)
-                            if new_value.startswith('#'):
-                                new_rgb = ColorReplacer._hex_to_rgb_string(new_value)
-                            else:
-                                new_rgb = new_value
-                                
-                            if old_rgb and new_rgb:
-                                # Try different RGB patterns (spaces, commas, rgb() function)
-                                rgb_patterns = [
-                                    (old_rgb, new_rgb),  # Space-separated: 255 87 51
-                                    (old_rgb.replace(' ', ','), new_rgb.replace(' ', ',')),  # Comma-separated: 255,87,51
-                                    (f"rgb({old_rgb.replace(' ', ',')})", f"rgb({new_rgb.replace(' ', ',')})"),  # rgb() function
-                                ]
-                                for old_pattern, new_pattern in rgb_patterns:
-                                    if old_pattern in content:
-                                        old_count = content.count(old_pattern)
-                                        content = content.replace(old_pattern, new_pattern)
-                                        print(f"    ✓ Replaced {old_count} RGB occurrence(s)")
-                                        file_modified = True
-
-                    # Save modified file if changes were made
-                    if file_modified:
-                        ColorReplacer._write_text(main_file, content)
+                    records, replacements, count = ColorReplacer._apply_bundle(
+                        extracted_dir, main_file, rel_path, color_index, color_mappings
+                    )
+                    for old, new in replacements.items():
+                        all_replacements.setdefault(old, new)
+                    if records != []:
                         success_count += 1
+                        applied[rel_path] = (records, count)
                         print(f"✓ Modified: {main_file.name}")
                     else:
                         print(f"⚠ No modifications made to {main_file.name}")
@@ -299,10 +1931,49 @@ class ColorReplacer:
                     print(f"✗ Permission denied: {main_file} - {e}")
                 except Exception as e:
                     error_count += 1
+                    color_index['files'].pop(rel_path, None)
                     print(f"✗ Error processing {main_file}: {e}")
                     import traceback
                     traceback.print_exc()
 
+            if whole_bundle and all_replacements:
+                if progress_callback:
+                    progress_callback(len(main_files), total_files, "Processing other text assets...")
+                skip = {rel_path for _, rel_path in main_files}
+                # Asset literals are looked up by the pristine theme values
+                tracked = set()
+                for _, rel_path in main_files:
+                    entry = color_index['files'].get(rel_path)
+                    for value in (entry['variables'].values() if entry else ()):
+                        tracked.update(ColorReplacer._literal_forms(value))
+                success_count += ColorReplacer._apply_assets(
+                    extracted_dir, color_index, skip, tracked, all_replacements, applied
+                )
+            elif not whole_bundle:
+                restored = ColorReplacer._revert_assets(
+                    extracted_dir, color_index, {rel_path for _, rel_path in main_files}, applied
+                )
+                success_count += len(restored)
+                if reverted is not None:
+                    reverted.extend(restored)
+
+            try:
+                ColorReplacer.save_color_index(extracted_dir, color_index)
+            except OSError as e:
+                # The index is a cache; the next apply rescans instead
+                print(f"⚠ Could not save color index: {e}")
+
+            for rel_path, (_, count) in applied.items():
+                file_counts[rel_path] = count
+            if applied:
+                try:
+                    ColorReplacer._record_step(
+                        extracted_dir, color_mappings,
+                        {rel_path: records for rel_path, (records, _) in applied.items()}
+                    )
+                except OSError as e:
+                    print(f"⚠ Could not record undo history: {e}")
+
             if progress_callback:
                 progress_callback(total_files, total_files, f"Completed - {success_count} file(s) modified")
 
@@ -54,6 +54,9 @@ class MediaReplacer:
                 
                 # Only copy files, skip subdirectories
                 if os.path.isfile(source_file):
+                    # Unlink first: the existing file may be hardlinked to the extraction cache
+                    if os.path.lexists(dest_file):
+                        os.remove(dest_file)
                     shutil.copy2(source_file, dest_file)  # copy2 preserves metadata
                     success_count += 1
         except Exception as e:
@@ -27,7 +27,7 @@ Security:
 - Security headers added to all responses
 """
 
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, Response, jsonify, request, send_from_directory, send_file
 from flask_cors import CORS
 import os
 import sys
@@ -38,6 +38,7 @@ import re
 import tempfile
 import time
 import threading
+from fnmatch import fnmatch
 from urllib.parse import quote
 from datetime import datetime
 from pathlib import Path
@@ -45,6 +46,7 @@ from pathlib import Path
 from launcher_detector import LauncherDetector
 from color_replacer import ColorReplacer
 from media_replacer import MediaReplacer
+from asar_extractor import ASARArchive, ASARExtractor, ASARPacker, ASARPatcher
 
 # ============================================================================
 # CONFIGURATION & SECURITY SETTINGS
@@ -482,6 +484,7 @@ class ThemeManager:
         self.extracted_dir = None          # Temp directory with extracted files
         self.backup_dir = None             # Backup of original launcher
         self.color_apply_thread = None     # For async color replacement
+        self.launcher_archive = None       # Cached ASARArchive index of the launcher's app.asar
         self.status = {
             'operation': None,             # Current operation (extract, apply-colors, etc.)
             'state': 'idle',               # idle, running, complete, error
@@ -528,16 +531,88 @@ class ThemeManager:
         
         return self.launcher_info is not None
     
-    def extract_asar(self):
+    def get_launcher_archive(self):
+        """
+        Return a random-access view of the launcher's app.asar.
+        
+        The header index is built once and reused until the archive on disk
+        changes (e.g. after an RSI launcher update or an install). It is also
+        saved under DOCS_DIR/Cache, so after a server restart the same
+        archive is reopened without parsing its header again.
+        
+        Returns:
+            ASARArchive, or None if the launcher isn't detected or unreadable
+        """
+        if not self.launcher_info:
+            return None
+        
+        asar_path = self.launcher_info.get('asarPath')
+        if not asar_path or not os.path.isfile(asar_path):
+            return None
+        
+        archive = self.launcher_archive
+        if archive is None or archive.asar_path != os.path.abspath(asar_path) or not archive.is_current():
+            try:
+                cache_dir = os.path.join(os.path.normpath(os.path.expanduser(DOCS_DIR)), 'Cache')
+                archive = ASARArchive(asar_path, cache_dir=cache_dir)
+            except (OSError, ValueError) as e:
+                print(f"[ThemeManager] Could not index launcher archive: {e}")
+                return None
+            self.launcher_archive = archive
+        return archive
+    
+    def get_pack_order(self):
+        """
+        Return the access-order profile used when repacking app.asar.
+        
+        A profile recorded for the user's launcher version can be dropped in
+        DOCS_DIR/pack-order.txt (one glob per line); otherwise the packer's
+        built-in start-up order is used.
+        
+        Returns:
+            list of patterns, or None for the packer default
+        """
+        profile_path = os.path.join(os.path.normpath(os.path.expanduser(DOCS_DIR)), 'pack-order.txt')
+        if not os.path.isfile(profile_path):
+            return None
+        try:
+            return ASARPacker.load_order_profile(profile_path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"[ThemeManager] Ignoring unreadable pack order profile: {e}")
+            return None
+    
+    def extract_asar(self, include=None, exclude=None, verify=False):
         """
         Extract app.asar from launcher to a temp directory.
         
         Process:
         1. Validate launcher is initialized
-        2. Use 'asar unpack' command to extract the bundle
+        2. Extract the bundle with ASARExtractor (pure Python)
         3. Store extraction path in self.extracted_dir
         4. Create timestamped folder name to avoid conflicts
         
+        With include/exclude glob patterns only matching files are written
+        (selective extraction). Partial extractions bypass the extraction
+        cache and are read from the backup copy when one exists, so the
+        entries left in the archive can still be packed after app.asar
+        itself has been replaced by a repack.
+        
+        The extraction is assembled in an 'app-decompiled-*.partial' folder
+        and renamed once complete, then marked complete in its metadata. An
+        interrupted selective extraction (server killed mid-way) is resumed
+        from its checkpoint journal on the next attempt instead of starting
+        over; full extractions resume the same way inside the cache.
+        
+        Entries stored in app.asar.unpacked are linked or copied into the
+        extraction by ASARExtractor itself. With verify enabled, every entry
+        is first checked against the Electron integrity hashes in the header
+        so a corrupted or partially updated launcher is rejected up front.
+        
+        Args:
+            include: Optional list of glob patterns to extract
+            exclude: Optional list of glob patterns to leave in the archive
+            verify: Check integrity hashes before extracting
+        
         Returns:
             True if extraction successful, False on error
         """
@@ -557,6 +632,11 @@ class ThemeManager:
         os.makedirs(decompiled_dir, exist_ok=True)
         
         extracted_path = os.path.normpath(os.path.join(decompiled_dir, f'app-decompiled-{timestamp}'))
+        # The finished folder is renamed into place, so the name must be free
+        suffix = 1
+        while os.path.exists(extracted_path) or os.path.exists(extracted_path + '.partial'):
+            extracted_path = os.path.normpath(os.path.join(decompiled_dir, f'app-decompiled-{timestamp}-{suffix}'))
+            suffix += 1
         
         try:
             self.set_status('extract', 'running', 'Creating backup...', progress=5, last_error=None)
@@ -567,94 +647,93 @@ class ThemeManager:
             if not os.path.exists(asar_path):
                 raise FileNotFoundError(f"Source ASAR file not found: {asar_path}")
             
-            # Ensure target directory exists
-            os.makedirs(extracted_path, exist_ok=True)
-            print(f"[ThemeManager] Target directory created")
+            # Build the extraction under a temporary name; only a complete
+            # one is ever renamed to app-decompiled-<timestamp>
+            partial_path = extracted_path + '.partial'
+            if include or exclude:
+                # Pick up an interrupted selective extraction if there is one
+                interrupted = sorted(
+                    (p for p in Path(decompiled_dir).glob('app-decompiled-*.partial')
+                     if (p / ASARExtractor.JOURNAL_NAME).exists()),
+                    key=lambda p: p.name, reverse=True
+                )
+                if interrupted:
+                    partial_path = str(interrupted[0])
+                    print(f"[ThemeManager] Resuming interrupted extraction: {partial_path}")
+            else:
+                # A half-finished working copy is cheap to redo
+                shutil.rmtree(partial_path, ignore_errors=True)
             
             # Update status before extraction
             self.set_status('extract', 'running', 'Decompiling app.asar...', progress=10, last_error=None)
             
-            # Try extraction with npx first (if Node.js is available)
-            print(f"[ThemeManager] Attempting extraction with npx asar...")
+            # Extract with the native Python extractor. It is faster than an
+            # npx cold start and writes the source manifest ASARPacker uses
+            # to splice unchanged files back in on repack.
+            #
+            # A pristine extraction is cached per archive fingerprint, so while
+            # app.asar is unchanged (the normal case between launcher updates)
+            # a new working copy is just hardlinks/reflinks into the cache.
             try:
-                result = subprocess.run(  # noqa: B607, B603
-                    ['npx', 'asar', 'extract', asar_path, extracted_path],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                    cwd=docs_dir,
-                    shell=False,
-                    timeout=30
-                )
+                def progress_callback(current, total, message):
+                    progress = 10 + int((current / total) * 80) if total > 0 else 50
+                    self.set_status('extract', 'running', message, progress=progress, last_error=None)
                 
-                print(f"[ThemeManager] Extract return code: {result.returncode}")
-                if result.stdout:
-                    print(f"[ThemeManager] Stdout: {result.stdout}")
-                if result.stderr:
-                    print(f"[ThemeManager] Stderr: {result.stderr}")
+                # Selective extraction reads the backup copy when there is one
+                source_asar = asar_path
+                unpacked_dir = None
+                if include or exclude:
+                    if self.backup_dir and os.path.isfile(os.path.join(self.backup_dir, 'app.asar')):
+                        source_asar = os.path.join(self.backup_dir, 'app.asar')
+                    # Older backups hold only app.asar; their unpacked entries
+                    # are taken from the launcher's own folder
+                    unpacked_dir = source_asar + '.unpacked'
+                    if not os.path.isdir(unpacked_dir):
+                        unpacked_dir = asar_path + '.unpacked'
                 
-                npx_failed = result.returncode != 0
-            except FileNotFoundError as npx_error:
-                print(f"[ThemeManager] npx not found: {npx_error}")
-                npx_failed = True
-            except subprocess.TimeoutExpired:
-                print(f"[ThemeManager] npx extraction timed out")
-                npx_failed = True
-            
-            # If npx fails, try Python-based extractor
-            if npx_failed:
-                print(f"[ThemeManager] npx extraction failed, falling back to Python-based extractor...")
-                try:
-                    print(f"[ThemeManager] Attempting to import asar_extractor...")
-                    
-                    # Handle both frozen and non-frozen environments
-                    try:
-                        base_path = sys._MEIPASS
-                    except AttributeError:
-                        base_path = os.path.dirname(os.path.abspath(__file__))
-                    
-                    # Add the base path to sys.path to ensure asar_extractor can be found
-                    if base_path not in sys.path:
-                        sys.path.insert(0, base_path)
-                    
-                    from asar_extractor import ASARExtractor
-                    print(f"[ThemeManager] ASARExtractor imported successfully")
-                    print(f"[ThemeManager] Calling ASARExtractor.extract({asar_path}, {extracted_path})...")
-                    ASARExtractor.extract(asar_path, extracted_path)
+                if verify:
+                    # Check the archive that is actually about to be extracted
+                    self.set_status('extract', 'running', 'Verifying archive integrity...', progress=10, last_error=None)
+                    ASARExtractor.verify_integrity(source_asar, unpacked_dir=unpacked_dir)
+                
+                fingerprint = ASARExtractor.fingerprint(asar_path)
+                cache_dir = os.path.join(docs_dir, 'Cache', f'asar-{fingerprint}')
+                
+                if include or exclude:
+                    print(f"[ThemeManager] Selective extraction from {source_asar} "
+                          f"(include={include}, exclude={exclude})")
+                    ASARExtractor.extract(source_asar, partial_path, progress_callback=progress_callback,
+                                          include=include, exclude=exclude, unpacked_dir=unpacked_dir)
+                    print(f"[ThemeManager] Selective extraction successful")
+                elif os.path.isdir(cache_dir):
+                    print(f"[ThemeManager] Extraction cache hit: {cache_dir}")
+                else:
+                    print(f"[ThemeManager] Calling ASARExtractor.extract({asar_path}, {cache_dir})...")
+                    # Resumes from the journal if an earlier attempt was interrupted
+                    partial_dir = cache_dir + '.partial'
+                    ASARExtractor.extract(asar_path, partial_dir, progress_callback=progress_callback)
+                    # Only a complete extraction ever appears under the final name
+                    os.replace(partial_dir, cache_dir)
+                    self.cleanup_extraction_cache(keep_latest=2)
                     print(f"[ThemeManager] Python ASAR extraction successful")
-                except ImportError as ie:
-                    print(f"[ThemeManager] Failed to import asar_extractor: {ie}")
-                    import traceback
-                    traceback.print_exc()
-                    error_msg = f"Module import error: {str(ie)}"
-                    self.set_status('extract', 'error', 'Decompilation failed', progress=0, last_error=error_msg)
-                    return False
-                except Exception as py_extract_error:
-                    print(f"[ThemeManager] Python extraction also failed: {py_extract_error}")
-                    import traceback
-                    traceback.print_exc()
-                    
-                    # Check if it's an unpacked directory issue
-                    unpacked_dir = asar_path + '.unpacked'
-                    if os.path.exists(unpacked_dir):
-                        print(f"[ThemeManager] Found unpacked directory, attempting to copy it...")
-                        try:
-                            import shutil
-                            dest_unpacked = extracted_path + '.unpacked'
-                            shutil.copytree(unpacked_dir, dest_unpacked)
-                            print(f"[ThemeManager] Unpacked directory copied successfully")
-                        except Exception as copy_error:
-                            print(f"[ThemeManager] Failed to copy unpacked directory: {copy_error}")
-                            error_msg = str(py_extract_error)
-                            self.set_status('extract', 'error', 'Decompilation failed', progress=0, last_error=error_msg)
-                            return False
-                    else:
-                        print(f"[ThemeManager] No unpacked directory found at {unpacked_dir}")
-                        error_msg = str(py_extract_error)
-                        self.set_status('extract', 'error', 'Decompilation failed', progress=0, last_error=error_msg)
-                        return False
+                
+                if not (include or exclude):
+                    self.set_status('extract', 'running', 'Creating working copy...', progress=90, last_error=None)
+                    # Touch the cache so cleanup keeps recently used entries
+                    os.utime(cache_dir)
+                    file_count = ASARExtractor.clone_tree(cache_dir, partial_path)
+                    print(f"[ThemeManager] Materialized {file_count} files from cache")
+                
+                os.replace(partial_path, extracted_path)
+            except Exception as py_extract_error:
+                print(f"[ThemeManager] Python extraction failed: {py_extract_error}")
+                import traceback
+                traceback.print_exc()
+                error_msg = str(py_extract_error)
+                self.set_status('extract', 'error', 'Decompilation failed', progress=0, last_error=error_msg)
+                return False
             
-            # Save metadata about original state
+            # Save metadata about original state; this also marks the folder complete
             self._save_extraction_metadata(extracted_path)
             
             # Store the extracted path so we can return it to the UI
@@ -695,7 +774,9 @@ class ThemeManager:
             os.makedirs(self.backup_dir, exist_ok=True)
             print(f"[ThemeManager] Backing up from: {asar_path}")
             print(f"[ThemeManager] Backing up to: {os.path.join(self.backup_dir, 'app.asar')}")
-            shutil.copy2(asar_path, os.path.join(self.backup_dir, 'app.asar'))
+            # app.asar.unpacked is backed up with it, so the backup can be
+            # extracted and exported on its own
+            ASARPacker.copy_archive(asar_path, os.path.join(self.backup_dir, 'app.asar'))
             print(f"[ThemeManager] Backup created successfully")
             return True
         except Exception as e:
@@ -704,8 +785,15 @@ class ThemeManager:
             traceback.print_exc()
             return False
     
-    def apply_colors(self, color_mappings):
-        """Apply color replacements synchronously."""
+    def apply_colors(self, color_mappings, whole_bundle=False):
+        """
+        Apply color replacements synchronously.
+        
+        With whole_bundle every text asset is themed, not just main.*.js.
+        The per-file replacement counts end up in status['fileCounts'];
+        without whole_bundle, the assets an earlier whole-bundle apply had
+        themed are restored and listed in status['revertedFiles'].
+        """
         try:
             if not self.extracted_dir or not os.path.exists(self.extracted_dir):
                 error_msg = f"Error: extracted_dir not set or doesn't exist: {self.extracted_dir}"
@@ -727,7 +815,16 @@ class ThemeManager:
                 self.set_status('apply-colors', 'running', message, progress=progress, last_error=None)
                 print(f"[Progress {progress}%] {message}")
             
-            result = ColorReplacer.apply_colors(self.extracted_dir, color_mappings, progress_callback)
+            file_counts = {}
+            reverted = []
+            self.status['fileCounts'] = file_counts
+            self.status['revertedFiles'] = reverted
+            result = ColorReplacer.apply_colors(
+                self.extracted_dir, color_mappings, progress_callback,
+                whole_bundle=whole_bundle, file_counts=file_counts, reverted=reverted
+            )
+            if reverted:
+                print(f"Restored {len(reverted)} asset(s) themed by an earlier whole-bundle apply")
             print(f"Color replacement result: {result} files modified")
             
             if result > 0:
@@ -745,7 +842,59 @@ class ThemeManager:
             self.set_status('apply-colors', 'error', error_msg, progress=0, last_error=str(e))
             return 0
     
-    def apply_colors_async(self, color_mappings):
+    def plan_colors(self, color_mappings, whole_bundle=False):
+        """
+        Preview a color mapping without modifying the extraction.
+        
+        Args:
+            color_mappings: Dictionary of variable name -> new color
+            whole_bundle: Plan for every text asset, not just main.*.js
+        
+        Returns:
+            (plan, cached) from ColorReplacer.plan_colors, or None if there
+            is no extraction
+        """
+        if not self.extracted_dir or not os.path.exists(self.extracted_dir):
+            return None
+        return ColorReplacer.plan_colors(self.extracted_dir, color_mappings, whole_bundle)
+    
+    def undo_colors(self):
+        """
+        Reverse the last color apply using the extraction's patch log.
+        
+        Returns:
+            Summary dict from ColorReplacer.undo, or None if there is no
+            extraction or nothing to undo
+        
+        Raises:
+            ValueError: If the files changed since the step was applied
+        """
+        if not self.extracted_dir or not os.path.exists(self.extracted_dir):
+            return None
+        result = ColorReplacer.undo(self.extracted_dir)
+        if result:
+            print(f"[ThemeManager] Undid color step: {result['edits']} edit(s) in {result['files']} file(s)")
+        return result
+    
+    def redo_colors(self):
+        """
+        Replay the last undone color apply.
+        
+        Returns:
+            Summary dict from ColorReplacer.redo, or None if there is no
+            extraction or nothing to redo
+        
+        Raises:
+            ValueError: If the files changed since the step was undone
+        """
+        if not self.extracted_dir or not os.path.exists(self.extracted_dir):
+            return None
+        result = ColorReplacer.redo(self.extracted_dir)
+        if result:
+            print(f"[ThemeManager] Redid color step: {result['edits']} edit(s) in {result['files']} file(s)")
+        return result
+    
+    def apply_colors_async(self, color_mappings, whole_bundle=False):
         """
         Apply color replacements in a background thread.
         
@@ -756,12 +905,13 @@ class ThemeManager:
         
         Args:
             color_mappings: Dictionary of old_color -> new_color
+            whole_bundle: Also theme lazy-loaded chunks, CSS and SVG
         
         Returns:
             True if started successfully, False if another operation in progress
         """
         def _apply():
-            self.apply_colors(color_mappings)
+            self.apply_colors(color_mappings, whole_bundle)
         
         if self.color_apply_thread and self.color_apply_thread.is_alive():
             print("Color apply operation already in progress")
@@ -771,6 +921,84 @@ class ThemeManager:
         self.color_apply_thread.start()
         return True
     
+    def patch_colors_in_archive(self, color_mappings, output_path):
+        """
+        Apply colors straight to a copy of the launcher's app.asar.
+        
+        Fast path for the common preset case: when every color edit keeps
+        main.*.js the same length (hex -> hex swaps), the edits are written
+        into a clone of app.asar at their byte offsets. No extraction and
+        no repack are needed.
+        
+        The edits are looked up in a color index of the archive's bundles,
+        saved under DOCS_DIR/Cache next to the header index. An entry is
+        tied to the archive's path, size and mtime and to the bundle's
+        offset, so the bundle is only read and scanned again after the
+        archive changes. The patched copy gets its own .unpacked folder.
+        
+        Args:
+            color_mappings: Dictionary of variable name -> new color
+            output_path: Where to write the patched archive
+        
+        Returns:
+            Number of edits applied, or None if the archive can't be
+            patched in place (edits change file lengths, or the header
+            doesn't round-trip) and the full extract/apply/repack flow
+            is required
+        """
+        archive = self.get_launcher_archive()
+        if archive is None:
+            raise FileNotFoundError('Launcher app.asar not available')
+        
+        cache_dir = os.path.join(os.path.normpath(os.path.expanduser(DOCS_DIR)), 'Cache')
+        color_index = ColorReplacer.load_color_index(cache_dir)
+        rebuilt = False
+        resized = None
+        # Index entries are only valid for this exact archive
+        archive_key = {'archive': archive.asar_path, 'size': archive.archive_size, 'mtime_ns': archive.archive_mtime}
+        
+        patches = {}
+        for path, entry in archive.walk_files():
+            if not fnmatch(Path(path).name, 'main.*.js'):
+                continue
+            stamp = dict(archive_key, offset=entry.offset, entry_size=entry.size)
+            edits, scanned = ColorReplacer.plan_indexed_edits(
+                color_index, path, stamp, lambda path=path: archive.read(path), color_mappings
+            )
+            rebuilt = rebuilt or scanned
+            if any(len(old) != len(new) for _, old, new in edits):
+                resized = path
+                break
+            if edits:
+                patches[path] = edits
+        
+        # Bundles of an older launcher version are dropped from the index
+        stale = [path for path, indexed in color_index['files'].items()
+                 if any(indexed.get('stamp', {}).get(name) != value for name, value in archive_key.items())]
+        for path in stale:
+            del color_index['files'][path]
+        if rebuilt or stale:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                ColorReplacer.save_color_index(cache_dir, color_index)
+            except OSError as e:
+                # Only a cache; the next call scans again
+                print(f"[ThemeManager] Could not save archive color index: {e}")
+        
+        if resized:
+            print(f"[ThemeManager] Falling back to a full repack: color edits change the length of {resized}")
+            return None
+        if not patches:
+            return 0
+        
+        try:
+            return ASARPatcher.patch(archive.asar_path, output_path, patches)
+        except ValueError as e:
+            # Not an error: the archive just can't be edited at fixed
+            # offsets (e.g. its header JSON doesn't re-serialize byte-for-byte)
+            print(f"[ThemeManager] Falling back to a full repack: {e}")
+            return None
+    
     def apply_media(self, media_mappings):
         """
         Apply media file replacements (images, videos, audio).
@@ -799,9 +1027,9 @@ class ThemeManager:
         Process:
         1. Validate extracted directory exists
         2. Backup original app.asar if not already backed up
-        3. Remove old app.asar
-        4. Run 'asar pack' command to create new archive
-        5. Copy repacked app.asar to launcher location
+        3. Pack the directory with ASARPacker, splicing unchanged files
+           from the original app.asar
+        4. Atomically replace app.asar with the new archive
         
         Returns:
             True if successful, False on error
@@ -821,23 +1049,15 @@ class ThemeManager:
             if not self.backup_dir:
                 self.create_backup()
             
+            # Repack with the native packer (no Node.js required). The old
+            # archive is kept until the new one is complete: unchanged files
+            # are spliced from it, then the new archive replaces it atomically.
             try:
-                # Remove old asar
-                if os.path.exists(asar_path):
-                    os.remove(asar_path)
+                ASARPacker.pack(self.extracted_dir, asar_path, order=self.get_pack_order())
             except PermissionError:
                 raise PermissionError(f'Permission denied: Unable to write to {asar_path}. Try running as Administrator.')
-            
-            # Repack (without shell - safer)
-            result = subprocess.run(  # noqa: B607, B603
-                ['npx', 'asar', 'pack', self.extracted_dir, asar_path],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            
-            if result.returncode != 0:
-                print(f"Error repacking asar: {result.stderr}")
+            except (OSError, ValueError) as pack_error:
+                print(f"Error repacking asar: {pack_error}")
                 return False
 
             # Cleanup after successful repack
@@ -870,6 +1090,27 @@ class ThemeManager:
             except Exception as e:
                 print(f"Error removing backup {backup}: {e}")
 
+    def cleanup_extraction_cache(self, keep_latest=2):
+        """Keep only the most recently used pristine extractions and header indexes in the cache."""
+        base = Path(DOCS_DIR) / 'Cache'
+        if not base.exists():
+            return
+        
+        entries = sorted(
+            [p for p in base.iterdir() if p.is_dir() and p.name.startswith('asar-') and not p.name.endswith('.partial')],
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        
+        for entry in entries[keep_latest:]:
+            try:
+                shutil.rmtree(entry)
+            except Exception as e:
+                print(f"Error removing cached extraction {entry}: {e}")
+        
+        # Header indexes of every archive opened through ASARArchive
+        ASARArchive.prune_index_cache(str(base))
+
     def cleanup_extractions(self, keep_latest=5):
         """Keep only the most recent extracted folders to avoid clutter."""
         base = Path(DOCS_DIR) / 'Decompiled'
@@ -889,13 +1130,18 @@ class ThemeManager:
                 print(f"Error removing extracted folder {extract}: {e}")
 
     def _save_extraction_metadata(self, extracted_path):
-        """Save metadata about the original extraction state."""
+        """Save metadata about the original extraction state.
+        
+        Only called once every entry has been extracted and verified, so
+        'complete': True marks the folder as a finished extraction.
+        """
         if not extracted_path or not os.path.exists(extracted_path):
             return
         
         try:
             metadata = {
                 'extracted_at': datetime.now().isoformat(),
+                'complete': True,
                 'original_colors': {},
                 'media_files': {}
             }
@@ -906,16 +1152,20 @@ class ThemeManager:
             
             for main_file in main_files:
                 try:
-                    content = main_file.read_text(encoding='utf-8', errors='ignore')
-                    # Extract --sol-color-* variables
-                    pattern = re.compile(r'(--sol-color-[a-z0-9-]+)\s*:\s*([^;]+)', re.IGNORECASE)
-                    for match in pattern.finditer(content):
-                        key, value = match.groups()
-                        metadata['original_colors'][key] = value.strip()
+                    # Extract --sol-color-* variables (one scan, shared with
+                    # apply_colors and detect_extraction_changes)
+                    metadata['original_colors'].update(ColorReplacer.theme_variables(main_file.read_bytes()))
                 except Exception:
                     # Safely ignore pattern matching errors
                     pass
             
+            # Index the byte offsets of every theme color literal, so applying
+            # colors later edits those offsets instead of rescanning bundles
+            try:
+                ColorReplacer.build_color_index(extracted_path)
+            except OSError as e:
+                print(f"[ThemeManager] Could not build color index: {e}")
+            
             # Store original media file sizes as baseline
             for root, dirs, files in os.walk(extracted_path):
                 for file in files:
@@ -924,16 +1174,18 @@ class ThemeManager:
                         file_path = os.path.join(root, file)
                         try:
                             file_size = os.path.getsize(file_path)
-                            rel_path = os.path.relpath(file_path, self.extracted_dir)
+                            rel_path = os.path.relpath(file_path, extracted_path)
                             metadata['media_files'][rel_path] = {'size': file_size}
                         except Exception:
                             # Safely ignore file metadata errors
                             pass
             
-            # Save metadata
-            metadata_path = os.path.join(self.extracted_dir, '.extraction-metadata.json')
-            with open(metadata_path, 'w') as f:
+            # Save metadata (written to a temp file first so a crash can't
+            # leave a truncated file that claims completion)
+            metadata_path = os.path.join(extracted_path, '.extraction-metadata.json')
+            with open(metadata_path + '.tmp', 'w') as f:
                 json.dump(metadata, f, indent=2)
+            os.replace(metadata_path + '.tmp', metadata_path)
         except Exception as e:
             print(f"[ThemeManager] Error saving extraction metadata: {e}")
 
@@ -960,12 +1212,11 @@ class ThemeManager:
             main_files = list(extracted_root.glob('**/main.*.js'))
             
             for main_file in main_files:
+                # Pristine snapshots hold the original colors by design
+                if any(part.startswith('.') for part in main_file.relative_to(extracted_root).parts[:-1]):
+                    continue
                 try:
-                    content = main_file.read_text(encoding='utf-8', errors='ignore')
-                    pattern = re.compile(r'(--sol-color-[a-z0-9-]+)\s*:\s*([^;]+)', re.IGNORECASE)
-                    for match in pattern.finditer(content):
-                        key, current_value = match.groups()
-                        current_value = current_value.strip()
+                    for key, current_value in ColorReplacer.theme_variables(main_file.read_bytes()).items():
                         original_value = metadata['original_colors'].get(key)
                         
                         if original_value and current_value != original_value:
@@ -1005,22 +1256,57 @@ class ThemeManager:
             return None
 
     def list_media_assets(self):
-        """Scan main.*.js to find media assets referenced by the launcher UI."""
+        """
+        Scan main.*.js to find media assets referenced by the launcher UI.
+        
+        Uses the selected extraction when there is one; otherwise reads
+        straight from the launcher's app.asar without extracting it.
+        """
+        archive = None
         if not self.extracted_dir or not os.path.exists(self.extracted_dir):
-            return []
+            archive = self.get_launcher_archive()
+            if archive is None:
+                return []
 
-        extracted_root = Path(self.extracted_dir)
         candidate_dirs = [
-            extracted_root / 'app' / 'static' / 'js',
-            extracted_root / 'app' / 'assets' / 'static' / 'js',
-            extracted_root / 'static' / 'js',
-            extracted_root / 'assets' / 'static' / 'js'
+            'app/static/js',
+            'app/assets/static/js',
+            'static/js',
+            'assets/static/js'
         ]
 
+        if archive is not None:
+            def path_exists(rel_path):
+                return archive.isfile(rel_path)
+
+            def read_text(rel_path):
+                return archive.read(rel_path).decode('utf-8', errors='ignore')
+
+            asset_url = '/api/archive-asset?path='
+        else:
+            extracted_root = Path(self.extracted_dir)
+
+            def path_exists(rel_path):
+                return (extracted_root / rel_path).exists()
+
+            def read_text(rel_path):
+                return (extracted_root / rel_path).read_text(encoding='utf-8', errors='ignore')
+
+            asset_url = '/api/extracted-asset?path='
+
         main_files = []
         for candidate in candidate_dirs:
-            if candidate.exists():
-                main_files.extend(candidate.glob('main.*.js'))
+            if archive is not None:
+                if archive.isdir(candidate):
+                    main_files.extend(
+                        f"{candidate}/{name}" for name in archive.listdir(candidate)
+                        if fnmatch(name, 'main.*.js')
+                    )
+            elif (extracted_root / candidate).exists():
+                main_files.extend(
+                    str(p.relative_to(extracted_root)).replace('\\', '/')
+                    for p in (extracted_root / candidate).glob('main.*.js')
+                )
 
         if not main_files:
             return []
@@ -1041,7 +1327,7 @@ class ThemeManager:
         found_assets = {}  # Maps source path to details with line info
         for main_file in main_files:
             try:
-                content = main_file.read_text(encoding='utf-8', errors='ignore')
+                content = read_text(main_file)
             except Exception:
                 continue
 
@@ -1057,7 +1343,7 @@ class ThemeManager:
                     
                     if asset_path not in found_assets:
                         found_assets[asset_path] = {
-                            'file': main_file.name,
+                            'file': Path(main_file).name,
                             'lines': []
                         }
                     # Store line number and snippet
@@ -1072,14 +1358,14 @@ class ThemeManager:
             
             # Try to find the file in various locations
             candidate_paths = [
-                extracted_root / asset_path,
-                extracted_root / 'app' / asset_path,
-                extracted_root / 'app' / 'assets' / asset_path,
+                asset_path,
+                f"app/{asset_path}",
+                f"app/assets/{asset_path}",
             ]
 
             for candidate in candidate_paths:
-                if candidate.exists():
-                    rel_path = str(candidate.relative_to(extracted_root)).replace('\\', '/')
+                if path_exists(candidate):
+                    rel_path = candidate
                     break
 
             # If file doesn't exist on disk, skip it (may be loaded from CDN or removed)
@@ -1100,7 +1386,7 @@ class ThemeManager:
                 'path': rel_path,
                 'name': Path(rel_path).name,
                 'type': media_type,
-                'url': f"/api/extracted-asset?path={quote(rel_path)}",
+                'url': f"{asset_url}{quote(rel_path)}",
                 'source': {
                     'file': found_assets[asset_path]['file'],
                     'lines': found_assets[asset_path]['lines']
@@ -1146,11 +1432,26 @@ def _find_musics_dir():
     return candidates[0] if candidates else None
 
 
-def _parse_music_files_from_main(main_js_path):
-    if not main_js_path or not main_js_path.exists():
-        return []
+def _find_main_js_in_archive(archive):
+    """Locate main.*.js inside an ASARArchive without extracting it."""
+    for static_js_dir in ('static/js', 'app/static/js'):
+        if archive.isdir(static_js_dir):
+            for name in archive.listdir(static_js_dir):
+                if fnmatch(name, 'main.*.js'):
+                    return f"{static_js_dir}/{name}"
+    return None
+
 
-    content = main_js_path.read_text(encoding='utf-8')
+def _parse_music_files_from_main(main_js_path, archive=None):
+    if archive is not None:
+        # main_js_path is an entry path inside the archive
+        if not main_js_path or not archive.isfile(main_js_path):
+            return []
+        content = archive.read(main_js_path).decode('utf-8')
+    else:
+        if not main_js_path or not main_js_path.exists():
+            return []
+        content = main_js_path.read_text(encoding='utf-8')
     match = re.search(r'musics:\{([^}]*)\}', content, re.DOTALL)
     if not match:
         return []
@@ -1181,8 +1482,14 @@ def serve_index():
 @app.route('/api/default-music', methods=['GET'])
 def api_default_music():
     """Return default music list from main.*.js musics config."""
-    main_js_path = _find_main_js_path()
-    files = _parse_music_files_from_main(main_js_path)
+    # Without a selected extraction, read main.*.js straight from app.asar
+    archive = None if theme_manager.extracted_dir else theme_manager.get_launcher_archive()
+    main_js_path = _find_main_js_in_archive(archive) if archive else None
+    if main_js_path:
+        files = _parse_music_files_from_main(main_js_path, archive=archive)
+    else:
+        main_js_path = _find_main_js_path()
+        files = _parse_music_files_from_main(main_js_path)
     return jsonify({
         'success': True,
         'files': files,
@@ -1333,6 +1640,111 @@ def api_extracted_asset():
 
     return send_file(str(target))
 
+@app.route('/api/archive-asset')
+def api_archive_asset():
+    """Serve a file straight from the launcher's app.asar for preview."""
+    rel_path = request.args.get('path', '').strip()
+    if not rel_path:
+        return jsonify({'success': False, 'error': 'Missing path'}), 400
+
+    # Validate path components to prevent traversal attacks
+    if rel_path.startswith('/') or rel_path.startswith('\\') or '..' in rel_path or rel_path.startswith('.'):
+        return jsonify({'success': False, 'error': 'Invalid path'}), 403
+
+    archive = theme_manager.get_launcher_archive()
+    if archive is None:
+        return jsonify({'success': False, 'error': 'Launcher not detected'}), 400
+
+    # Only entries listed in the archive header can be served
+    if not archive.isfile(rel_path):
+        return jsonify({'success': False, 'error': 'File not found'}), 404
+
+    return send_file(archive.open(rel_path), download_name=Path(rel_path).name)
+
+@app.route('/api/export-zip')
+def api_export_zip():
+    """
+    Download an app.asar as a zip file, streamed straight from the archive.
+    
+    The zip is generated while it is sent: entries are read from their
+    byte ranges in the archive using its header index, so memory use is
+    constant and no extraction folder is created.
+    
+    Query parameters:
+        source: 'original' (launcher app.asar, default), 'compiled' or 'backup'
+        name:   For 'compiled', an app-compiled-*.asar file name; for
+                'backup', a backup-* folder name. Defaults to the newest.
+    
+    Errors:
+        - 400: Unknown source or invalid name
+        - 404: No matching archive
+    """
+    source = request.args.get('source', 'original').strip()
+    name = request.args.get('name', '').strip()
+    
+    if not theme_manager.launcher_info:
+        return jsonify({'success': False, 'error': 'Launcher not detected'}), 400
+    
+    # SECURITY: name must be a bare file/folder name, never a path
+    if name and (name != os.path.basename(name) or name.startswith('.') or '..' in name):
+        return jsonify({'success': False, 'error': 'Invalid name'}), 400
+    
+    asar_path = None
+    if source == 'original':
+        asar_path = theme_manager.launcher_info['asarPath']
+    elif source == 'compiled':
+        compile_dir = os.path.join(os.path.dirname(theme_manager.launcher_info['asarPath']), 'compiled')
+        if name:
+            if name.startswith('app-compiled-') and name.endswith('.asar'):
+                asar_path = os.path.join(compile_dir, name)
+        elif os.path.isdir(compile_dir):
+            candidates = sorted(p for p in os.listdir(compile_dir)
+                                if p.startswith('app-compiled-') and p.endswith('.asar'))
+            if candidates:
+                asar_path = os.path.join(compile_dir, candidates[-1])
+    elif source == 'backup':
+        backups_dir = os.path.join(os.path.normpath(os.path.expanduser(DOCS_DIR)), 'Backups')
+        if name:
+            if name.startswith('backup-'):
+                asar_path = os.path.join(backups_dir, name, 'app.asar')
+        elif os.path.isdir(backups_dir):
+            candidates = sorted(p for p in os.listdir(backups_dir)
+                                if p.startswith('backup-') and os.path.isfile(os.path.join(backups_dir, p, 'app.asar')))
+            if candidates:
+                asar_path = os.path.join(backups_dir, candidates[-1], 'app.asar')
+    else:
+        return jsonify({'success': False, 'error': 'source must be original, compiled or backup'}), 400
+    
+    if name and not asar_path:
+        return jsonify({'success': False, 'error': 'Invalid name'}), 400
+    if not asar_path or not os.path.isfile(asar_path):
+        return jsonify({'success': False, 'error': 'Archive not found'}), 404
+    
+    try:
+        if source == 'original':
+            archive = theme_manager.get_launcher_archive()
+        else:
+            cache_dir = os.path.join(os.path.normpath(os.path.expanduser(DOCS_DIR)), 'Cache')
+            archive = ASARArchive(asar_path, cache_dir=cache_dir)
+    except (OSError, ValueError) as e:
+        print(f'[API Error] Could not open archive for export: {e}')
+        archive = None
+    if archive is None:
+        return jsonify({'success': False, 'error': 'Could not read archive'}), 500
+    
+    if source == 'original':
+        download_name = 'app-original.zip'
+    elif source == 'compiled':
+        download_name = f"{os.path.splitext(os.path.basename(asar_path))[0]}.zip"
+    else:
+        download_name = f"{os.path.basename(os.path.dirname(asar_path))}.zip"
+    print(f'[API] Streaming {asar_path} as {download_name}')
+    return Response(
+        archive.iter_zip(),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+    )
+
 @app.route('/api/launcher-asset')
 def api_launcher_asset():
     """Serve a file from the launcher's app directory for preview."""
@@ -1771,6 +2183,16 @@ def api_extract():
     The extracted directory contains all launcher JavaScript, CSS, images, etc.
     These can then be modified before repackaging.
     
+    Request (optional):
+        {
+            'include': [str] (glob patterns to extract, e.g. 'static/js/main.*.js'),
+            'exclude': [str] (glob patterns to leave in the archive),
+            'verify': bool (check Electron integrity hashes first)
+        }
+    
+    Entries not extracted are packed straight from the original archive
+    on repack.
+    
     Response:
         {
             'success': bool,
@@ -1791,6 +2213,20 @@ def api_extract():
             print("[API] Launcher not initialized")
             return jsonify({'success': False, 'error': 'Launcher not initialized'}), 400
         
+        # Optional selective extraction patterns
+        data = request.get_json(silent=True) or {}
+        patterns = {}
+        for key in ('include', 'exclude'):
+            value = data.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, list) or not all(isinstance(item, str) and item.strip() for item in value):
+                return jsonify({'success': False, 'error': f'{key} must be a list of glob patterns'}), 400
+            patterns[key] = [item.strip().replace('\\', '/').lstrip('/') for item in value]
+        verify = data.get('verify', False)
+        if not isinstance(verify, bool):
+            return jsonify({'success': False, 'error': 'verify must be a boolean'}), 400
+        
         print("[API] Creating backup...")
         # Create backup
         if not theme_manager.create_backup():
@@ -1799,7 +2235,7 @@ def api_extract():
         
         print("[API] Starting extraction...")
         # Extract
-        if not theme_manager.extract_asar():
+        if not theme_manager.extract_asar(verify=verify, **patterns):
             error_detail = theme_manager.status.get('lastError', 'Unknown error')
             print(f"[API] Extraction failed with error: {error_detail}")
             return jsonify({
@@ -1890,8 +2326,10 @@ def api_extracted_list():
         print(f'[API] Found {len(all_items)} items in base directory')
         
         # Look for both app-extracted- and app-decompiled- folders
+        # (.partial folders are extractions still in progress or interrupted)
         extracts = sorted(
-            [p for p in all_items if p.is_dir() and (p.name.startswith('app-extracted-') or p.name.startswith('app-decompiled-'))],
+            [p for p in all_items if p.is_dir() and (p.name.startswith('app-extracted-') or p.name.startswith('app-decompiled-'))
+             and not p.name.endswith('.partial')],
             key=lambda p: p.name,
             reverse=True
         )
@@ -2089,7 +2527,7 @@ def api_restore_backup():
             # Backup current
             shutil.copy2(asar_path, str(asar_backup))
             # Restore from backup
-            shutil.copy2(str(backup_asar), asar_path)
+            ASARPacker.copy_archive(str(backup_asar), asar_path)
             # Remove temp backup
             asar_backup.unlink()
             
@@ -2121,7 +2559,7 @@ def api_extraction_changes():
 @app.route('/api/media-assets', methods=['GET'])
 def api_media_assets():
     """List media assets referenced in main.*.js for preview."""
-    if not theme_manager.extracted_dir:
+    if not theme_manager.extracted_dir and not theme_manager.launcher_info:
         return jsonify({'success': False, 'error': 'Nothing extracted yet'}), 400
 
     assets = theme_manager.list_media_assets()
@@ -2141,7 +2579,9 @@ def api_status():
         'state': theme_manager.status.get('state'),
         'message': theme_manager.status.get('message'),
         'progress': theme_manager.status.get('progress'),
-        'lastError': theme_manager.status.get('lastError')
+        'lastError': theme_manager.status.get('lastError'),
+        'fileCounts': theme_manager.status.get('fileCounts'),
+        'revertedFiles': theme_manager.status.get('revertedFiles')
     })
 
 @app.route('/api/check-updates', methods=['GET'])
@@ -2245,7 +2685,11 @@ def api_apply_colors():
                 '#FF0000': '#00FF00',  // Replace red with green
                 '#FFFFFF': '#000000',  // Replace white with black
                 ...
-            }
+            },
+            'wholeBundle': bool (optional; also theme the hex and rgb()/rgba()
+                colors of every JS chunk, CSS and SVG file, not just main.*.js;
+                without it those files are restored - per-file counts are
+                reported in /api/status as fileCounts)
         }
     
     Response:
@@ -2253,6 +2697,8 @@ def api_apply_colors():
             'success': bool,
             'message': str,
             'async': bool (operation runs in background),
+            'revertedFiles': list (assets an earlier whole-bundle apply
+                themed, which this apply restores; empty with wholeBundle),
             'error': str (on failure)
         }
     
@@ -2277,14 +2723,28 @@ def api_apply_colors():
             print(f"[API] Color validation failed: {error_msg}")
             return jsonify({'success': False, 'error': error_msg}), 400
         
+        whole_bundle = data.get('wholeBundle', False)
+        if not isinstance(whole_bundle, bool):
+            return jsonify({'success': False, 'error': 'wholeBundle must be a boolean'}), 400
+        
+        # A plain apply restores assets themed by an earlier whole-bundle
+        # apply; list them before the worker thread changes the index
+        reverted = []
+        if not whole_bundle and theme_manager.extracted_dir:
+            reverted = ColorReplacer.themed_assets(theme_manager.extracted_dir)
+        
         # Start async operation with validated colors
-        if not theme_manager.apply_colors_async(validated_colors):
+        if not theme_manager.apply_colors_async(validated_colors, whole_bundle):
             return jsonify({'success': False, 'error': 'Color apply operation already in progress'}), 409
         
+        message = 'Color application started'
+        if reverted:
+            message += f'; {len(reverted)} whole-bundle asset(s) will be restored'
         return jsonify({
             'success': True,
-            'message': 'Color application started',
-            'async': True
+            'message': message,
+            'async': True,
+            'revertedFiles': reverted
         })
     except Exception as e:
         print(f"Error in apply_colors: {e}")
@@ -2292,6 +2752,193 @@ def api_apply_colors():
         traceback.print_exc()
         return jsonify({'success': False, 'error': 'Failed to apply colors'}), 500
 
+@app.route('/api/plan-colors', methods=['POST'])
+def api_plan_colors():
+    """
+    Dry run of /api/apply-colors: report what a mapping would change.
+    
+    Nothing is written. Plans are cached per (bundle state, mapping), so
+    switching back to a preset that was already previewed is instant.
+    
+    Request Body:
+        {
+            'colors': {'--sol-color-primary': '#ff5733', ...},
+            'wholeBundle': bool (optional)
+        }
+    
+    Response:
+        {
+            'success': bool,
+            'cached': bool,
+            'plan': {
+                'variables': {name: {'from', 'to', 'occurrences'}},
+                'missing': [names not found],
+                'files': {path: {'occurrences', 'edits': {variable: {old: {'new', 'offsets'}}}}},
+                'occurrences': int
+            }
+        }
+    """
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'success': False, 'error': 'Invalid JSON'}), 400
+        
+        color_mappings = data.get('colors', {})
+        if not color_mappings:
+            return jsonify({'success': False, 'error': 'No color mappings provided'}), 400
+        
+        # SECURITY: Validate color mappings
+        is_valid, validated_colors, error_msg = validate_color_mapping(color_mappings)
+        if not is_valid:
+            print(f"[API] Color validation failed: {error_msg}")
+            return jsonify({'success': False, 'error': error_msg}), 400
+        
+        whole_bundle = data.get('wholeBundle', False)
+        if not isinstance(whole_bundle, bool):
+            return jsonify({'success': False, 'error': 'wholeBundle must be a boolean'}), 400
+        
+        # The files are mid-rewrite while colors are being applied
+        if theme_manager.color_apply_thread and theme_manager.color_apply_thread.is_alive():
+            return jsonify({'success': False, 'error': 'Color apply operation in progress'}), 409
+        
+        result = theme_manager.plan_colors(validated_colors, whole_bundle)
+        if result is None:
+            return jsonify({'success': False, 'error': 'No extraction available'}), 400
+        plan, cached = result
+        return jsonify({'success': True, 'cached': cached, 'plan': plan})
+    except Exception as e:
+        print(f"[API Error] Plan colors failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': 'Failed to plan colors'}), 500
+
+def _history_step(action):
+    """Shared body of /api/undo and /api/redo."""
+    # The patch log and files are mid-rewrite while colors are being applied
+    if theme_manager.color_apply_thread and theme_manager.color_apply_thread.is_alive():
+        return jsonify({'success': False, 'error': 'Color apply operation in progress'}), 409
+    if not theme_manager.extracted_dir or not os.path.exists(theme_manager.extracted_dir):
+        return jsonify({'success': False, 'error': 'No extraction available'}), 400
+    
+    try:
+        with _history_lock:
+            result = theme_manager.undo_colors() if action == 'undo' else theme_manager.redo_colors()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        print(f"[API Error] Color {action} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to {action} colors'}), 500
+    
+    if result is None:
+        return jsonify({'success': False, 'error': f'Nothing to {action}'}), 400
+    return jsonify({'success': True, **result})
+
+# Serializes undo/redo requests against each other
+_history_lock = threading.Lock()
+
+@app.route('/api/undo', methods=['POST'])
+def api_undo():
+    """
+    Reverse the last /api/apply-colors on the current extraction.
+    
+    Only the offsets recorded in the extraction's patch log are rewritten,
+    so the cost is proportional to the number of edits, not the bundle size.
+    
+    Response:
+        {
+            'success': bool,
+            'files': int,      # files rewritten
+            'edits': int,      # literals restored
+            'canUndo': bool,
+            'canRedo': bool
+        }
+    """
+    return _history_step('undo')
+
+@app.route('/api/redo', methods=['POST'])
+def api_redo():
+    """
+    Replay the last color apply reversed by /api/undo.
+    
+    Response: same as /api/undo
+    """
+    return _history_step('redo')
+
+@app.route('/api/patch-colors', methods=['POST'])
+def api_patch_colors():
+    """
+    Compile a recolored app.asar without extracting or repacking.
+    
+    Same-length color swaps (e.g. '#071a25' -> '#ff5733') are written straight
+    into a copy of the launcher's app.asar. When a mapping changes the length
+    of main.*.js the response has 'fallback': true and the client should use
+    the normal extract -> apply-colors -> compile flow instead.
+    
+    Request Body:
+        {
+            'colors': {'--sol-color-primary': '#ff5733', ...}
+        }
+    
+    Response:
+        {
+            'success': bool,
+            'path': str (compiled archive),
+            'edits': int,
+            'fallback': bool
+        }
+    """
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'success': False, 'error': 'Invalid JSON'}), 400
+        
+        color_mappings = data.get('colors', {})
+        if not color_mappings:
+            return jsonify({'success': False, 'error': 'No color mappings provided'}), 400
+        
+        # SECURITY: Validate color mappings
+        is_valid, validated_colors, error_msg = validate_color_mapping(color_mappings)
+        if not is_valid:
+            print(f"[API] Color validation failed: {error_msg}")
+            return jsonify({'success': False, 'error': error_msg}), 400
+        
+        if not theme_manager.launcher_info:
+            return jsonify({'success': False, 'error': 'Launcher not detected'}), 400
+        
+        compile_dir = os.path.join(os.path.dirname(theme_manager.launcher_info['asarPath']), 'compiled')
+        os.makedirs(compile_dir, exist_ok=True)
+        compiled_asar_path = os.path.join(compile_dir, f"app-compiled-{int(time.time())}.asar")
+        
+        edits = theme_manager.patch_colors_in_archive(validated_colors, compiled_asar_path)
+        if edits is None:
+            return jsonify({
+                'success': False,
+                'fallback': True,
+                'error': "These colors can't be patched in place; extract and compile instead"
+            }), 409
+        if edits == 0:
+            return jsonify({'success': False, 'fallback': False, 'error': 'No colors to replace were found'}), 400
+        
+        return jsonify({
+            'success': True,
+            'message': f'Patched {edits} color occurrence(s) in place',
+            'path': compiled_asar_path,
+            'edits': edits,
+            'fallback': False
+        })
+    except PermissionError:
+        return jsonify({
+            'success': False,
+            'error': 'Permission denied: Unable to write to launcher directory. Try running this application as Administrator.'
+        }), 403
+    except Exception as e:
+        print(f"[API Error] Patch colors failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': 'Failed to patch colors'}), 500
+
 @app.route('/api/apply-media', methods=['POST'])
 def api_apply_media():
     """
@@ -2401,6 +3048,9 @@ def api_upload_media():
             return jsonify({'success': False, 'error': 'Symlinks are not allowed'}), 403
 
         target.parent.mkdir(parents=True, exist_ok=True)
+        # Unlink first: the existing file may be hardlinked to the extraction cache
+        if target.exists():
+            target.unlink()
         upload.save(str(target))
         return jsonify({'success': True, 'message': 'File replaced', 'targetPath': target_path})
     except Exception as e:
@@ -2480,8 +3130,10 @@ def api_update_music_code():
         
         modified_content = re.sub(pattern, new_musics_obj, content)
         
-        # Write back to file
-        main_js_path.write_text(modified_content, encoding='utf-8')
+        # Write back to file (via replace, the original may be hardlinked to the extraction cache)
+        temp_path = main_js_path.with_name(main_js_path.name + '.tmp')
+        temp_path.write_text(modified_content, encoding='utf-8')
+        os.replace(temp_path, main_js_path)
         
         return jsonify({
             'success': True, 
@@ -2520,17 +3172,14 @@ def api_test_launcher():
                 temp_asar = tmp.name
             
             # Pack the extracted dir to temp location
-            result = subprocess.run(  # noqa: B607, B603
-                ['npx', 'asar', 'pack', extracted_path, temp_asar],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            
-            if result.returncode != 0:
+            try:
+                ASARPacker.pack(extracted_path, temp_asar, order=theme_manager.get_pack_order())
+            except (OSError, ValueError) as pack_error:
+                print(f'[API Error] Failed to pack asar: {pack_error}')
+                ASARPacker.remove_archive(temp_asar)
                 return jsonify({
                     'success': False,
-                    'error': f'Failed to pack asar: {result.stderr}'
+                    'error': 'Failed to pack asar'
                 }), 500
 
             def is_safe_launcher_exe(launcher_exe, asar_path):
@@ -2568,14 +3217,14 @@ def api_test_launcher():
             # Get launcher executable path
             launcher_exe = theme_manager.launcher_info.get('exePath') or theme_manager.launcher_info.get('launcherPath')
             if not launcher_exe:
-                os.remove(temp_asar)
+                ASARPacker.remove_archive(temp_asar)
                 return jsonify({
                     'success': False,
                     'error': 'Launcher executable path not found in launcher info'
                 }), 400
             
             if not os.path.exists(launcher_exe):
-                os.remove(temp_asar)
+                ASARPacker.remove_archive(temp_asar)
                 return jsonify({
                     'success': False,
                     'error': f'Launcher executable not found at: {launcher_exe}'
@@ -2592,14 +3241,14 @@ def api_test_launcher():
             try:
                 # Backup original to temp location
                 if os.path.exists(asar_path):
-                    shutil.copy2(asar_path, backup_asar)
+                    ASARPacker.copy_archive(asar_path, backup_asar)
                 
                 # Replace with temp version
-                shutil.copy2(temp_asar, asar_path)
+                ASARPacker.copy_archive(temp_asar, asar_path)
                 
             except PermissionError:
                 try:
-                    os.remove(temp_asar)
+                    ASARPacker.remove_archive(temp_asar)
                 except OSError:
                     # Safely ignore temp file cleanup errors
                     pass
@@ -2610,7 +3259,7 @@ def api_test_launcher():
             except Exception as e:
                 print(f'[API Error] Failed to replace app.asar: {str(e)}')
                 try:
-                    os.remove(temp_asar)
+                    ASARPacker.remove_archive(temp_asar)
                 except OSError:
                     # Safely ignore temp file cleanup errors
                     pass
@@ -2624,14 +3273,14 @@ def api_test_launcher():
                 if not is_safe_launcher_exe(launcher_exe, asar_path):
                     try:
                         if os.path.exists(backup_asar):
-                            shutil.copy2(backup_asar, asar_path)
-                            os.remove(backup_asar)
+                            ASARPacker.copy_archive(backup_asar, asar_path)
+                            ASARPacker.remove_archive(backup_asar)
                     except Exception:
                         # If restoration fails, log at server side; client still gets an error
                         print('[ThemeManager] Failed to restore backup after unsafe launcher path detected')
                     finally:
                         try:
-                            os.remove(temp_asar)
+                            ASARPacker.remove_archive(temp_asar)
                         except OSError:
                             pass
                     return jsonify({
@@ -2689,13 +3338,13 @@ def api_test_launcher():
                                 common_root = None
                             if common_root != launcher_root_abs:
                                 raise ValueError("Refusing to restore backup outside trusted launcher directory")
-                            shutil.copy2(backup_asar, asar_path_abs)
-                            os.remove(backup_asar)
+                            ASARPacker.copy_archive(backup_asar, asar_path_abs)
+                            ASARPacker.remove_archive(backup_asar)
                     except Exception:
                         print('[ThemeManager] Failed to restore backup after invalid launcher path detected')
                     finally:
                         try:
-                            os.remove(temp_asar)
+                            ASARPacker.remove_archive(temp_asar)
                         except OSError:
                             pass
                     return jsonify({
@@ -2713,13 +3362,13 @@ def api_test_launcher():
                 if common_root != launcher_root_abs:
                     try:
                         if os.path.exists(backup_asar):
-                            shutil.copy2(backup_asar, asar_path)
-                            os.remove(backup_asar)
+                            ASARPacker.copy_archive(backup_asar, asar_path)
+                            ASARPacker.remove_archive(backup_asar)
                     except Exception as e:
                         print(f'[ThemeManager] Failed to restore backup after invalid launcher executable detected: {e}')
                     finally:
                         try:
-                            os.remove(temp_asar)
+                            ASARPacker.remove_archive(temp_asar)
                         except OSError:
                             pass
                     return jsonify({
@@ -2739,13 +3388,13 @@ def api_test_launcher():
                     # Restore original
                     try:
                         if os.path.exists(backup_asar):
-                            shutil.copy2(backup_asar, asar_path)
-                            os.remove(backup_asar)
+                            ASARPacker.copy_archive(backup_asar, asar_path)
+                            ASARPacker.remove_archive(backup_asar)
                     except Exception as e:
                         print(f'[ThemeManager] Error restoring backup: {e}')
                     finally:
                         try:
-                            os.remove(temp_asar)
+                            ASARPacker.remove_archive(temp_asar)
                         except OSError:
                             # Safely ignore temp file cleanup errors
                             pass
@@ -2761,12 +3410,12 @@ def api_test_launcher():
                 # Restore on error
                 try:
                     if os.path.exists(backup_asar):
-                        shutil.copy2(backup_asar, asar_path)
+                        ASARPacker.copy_archive(backup_asar, asar_path)
                 except OSError:
                     # Safely ignore backup restoration errors
                     pass
                 try:
-                    os.remove(backup_asar)
+                    ASARPacker.remove_archive(backup_asar)
                 except:
                     pass
                 raise e
@@ -2803,22 +3452,18 @@ def api_compile_asar():
                 output_asar = tmp.name
             
             # Pack the extracted dir
-            result = subprocess.run(  # noqa: B607, B603
-                ['npx', 'asar', 'pack', extracted_path, output_asar],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            
-            if result.returncode != 0:
+            try:
+                ASARPacker.pack(extracted_path, output_asar, order=theme_manager.get_pack_order())
+            except (OSError, ValueError) as pack_error:
+                print(f'[API Error] Failed to compile asar: {pack_error}')
                 try:
-                    os.remove(output_asar)
+                    ASARPacker.remove_archive(output_asar)
                 except OSError:
                     # Safely ignore output file cleanup errors
                     pass
                 return jsonify({
                     'success': False,
-                    'error': f'Failed to compile asar: {result.stderr}'
+                    'error': 'Failed to compile asar'
                 }), 500
             
             # Move compiled asar to a persistent location for later installation
@@ -2826,7 +3471,7 @@ def api_compile_asar():
             os.makedirs(compile_dir, exist_ok=True)
             
             compiled_asar_path = os.path.join(compile_dir, f"app-compiled-{int(time.time())}.asar")
-            shutil.move(output_asar, compiled_asar_path)
+            ASARPacker.move_archive(output_asar, compiled_asar_path)
             
             return jsonify({
                 'success': True,
@@ -2871,7 +3516,7 @@ def api_install_asar():
             # Backup original
             try:
                 if os.path.exists(asar_path):
-                    shutil.copy2(asar_path, backup_asar)
+                    ASARPacker.copy_archive(asar_path, backup_asar)
                     print(f'[API] Created backup at: {backup_asar}')
             except PermissionError:
                 return jsonify({
@@ -2890,31 +3535,27 @@ def api_install_asar():
                 with tempfile.NamedTemporaryFile(suffix='.asar', delete=False) as tmp:
                     temp_asar = tmp.name
                 
-                result = subprocess.run(  # noqa: B607, B603
-                    ['npx', 'asar', 'pack', extracted_path, temp_asar],
-                    capture_output=True,
-                    text=True,
-                    check=False
-                )
-                
-                if result.returncode != 0:
+                try:
+                    ASARPacker.pack(extracted_path, temp_asar, order=theme_manager.get_pack_order())
+                except (OSError, ValueError) as pack_error:
+                    print(f'[API Error] Failed to compile asar: {pack_error}')
                     try:
-                        os.remove(temp_asar)
+                        ASARPacker.remove_archive(temp_asar)
                     except OSError:
                         # Safely ignore temp file cleanup errors
                         pass
                     return jsonify({
                         'success': False,
-                        'error': f'Failed to compile asar: {result.stderr}'
+                        'error': 'Failed to compile asar'
                     }), 500
                 
                 # Replace original with compiled version
                 try:
-                    shutil.copy2(temp_asar, asar_path)
+                    ASARPacker.copy_archive(temp_asar, asar_path)
                     print(f'[API] Installed modified app.asar to: {asar_path}')
                 except PermissionError:
                     try:
-                        os.remove(temp_asar)
+                        ASARPacker.remove_archive(temp_asar)
                     except OSError:
                         # Safely ignore temp file cleanup errors
                         pass
@@ -2924,7 +3565,7 @@ def api_install_asar():
                     }), 403
                 finally:
                     try:
-                        os.remove(temp_asar)
+                        ASARPacker.remove_archive(temp_asar)
                     except OSError:
                         # Safely ignore temp file cleanup errors
                         pass
@@ -3171,7 +3812,7 @@ def api_restore():
         
         # Copy backup to target
         import shutil
-        shutil.copy2(backup_asar, target_path)
+        ASARPacker.copy_archive(backup_asar, target_path)
         
         return jsonify({
             'success': True,
@@ -3307,7 +3948,7 @@ Here's how the process works from start to finish:
       - Launcher will use new media on next run
 
 4. REPACKING (/api/repack)
-   - Runs 'asar pack' command to repackage modified directory
+   - Packs the modified directory with ASARPacker (pure Python)
    - Creates new app.asar with all modifications
    - Stores at ~/Documents/RUIE/app.asar
 
@@ -3469,6 +4110,10 @@ def api_open_extractions_folder():
 
 
 if __name__ == '__main__':
+    # Color scanning worker processes re-run this entry point in frozen builds
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     # Production deployment with Waitress WSGI server
     import logging
     from waitress import serve
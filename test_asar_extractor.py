@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Tests for the native ASAR extractor and packer.
+
+Archives are built with ASARPacker from small trees in a temporary
+directory, so no launcher install is needed. Run with: python -m pytest
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import struct
+import zipfile
+
+import pytest
+
+import asar_extractor
+from asar_extractor import ASARArchive, ASARExtractor, ASARIndex, ASARPacker, ASARPatcher
+
+# Contents of the sample launcher tree: relative path -> bytes
+SAMPLE_FILES = {
+    'package.json': b'{"name": "rsi-launcher", "main": "index.js"}',
+    'index.js': b'require("./static/js/main.1234.js");\n',
+    'static/js/main.1234.js': b'const a = "#071a25"; const b = "rgba(7, 26, 37, 0.5)";\n',
+    'static/js/vendor.5678.js': b'var vendor = 1;\n',
+    'static/css/main.css': b'body { color: #ffffff; }\n',
+    'node_modules/native/binding.node': b'\x00\x01native-module' * 64,
+}
+
+# Entries stored in app.asar.unpacked instead of the archive body
+SAMPLE_UNPACKED = ['node_modules/native/binding.node']
+
+
+def write_tree(root, files):
+    """Write a {relative path: bytes} mapping below root."""
+    for rel_path, data in files.items():
+        path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def read_tree(root):
+    """Read every file below root except bookkeeping files."""
+    files = {}
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = [d for d in dir_names if d not in ASARPacker.IGNORED_NAMES]
+        for file_name in file_names:
+            if file_name in ASARPacker.IGNORED_NAMES:
+                continue
+            path = os.path.join(dir_path, file_name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = f.read()
+    return files
+
+
+def build_launcher(tmp_path, files=SAMPLE_FILES, unpacked=SAMPLE_UNPACKED):
+    """Pack a sample launcher and return the path of its app.asar."""
+    source = tmp_path / 'source'
+    write_tree(str(source), files)
+    if unpacked:
+        # A manifest listing unpacked entries makes the packer keep them out
+        # of the archive body, as the launcher's own app.asar does
+        with open(source / ASARExtractor.MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'source': {}, 'entries': {}, 'unpacked': unpacked}, f)
+    asar_path = str(tmp_path / 'launcher' / 'app.asar')
+    ASARPacker.pack(str(source), asar_path)
+    return asar_path
+
+
+def rewrite_header(asar_path, header, json_bytes=None):
+    """Give an archive a new header, keeping its file data."""
+    with open(asar_path, 'rb') as f:
+        _, header_size = ASARExtractor._read_header(f)
+        f.seek(8 + header_size)
+        data = f.read()
+    if json_bytes is None:
+        prefix = ASARPacker._encode_header(header)
+    else:
+        padding = (4 - len(json_bytes) % 4) % 4
+        prefix = struct.pack('<IIII', 4, 8 + len(json_bytes) + padding, 4 + len(json_bytes) + padding,
+                             len(json_bytes)) + json_bytes + b'\0' * padding
+    with open(asar_path, 'wb') as f:
+        f.write(prefix + data)
+
+
+def read_header(asar_path):
+    with open(asar_path, 'rb') as f:
+        return ASARExtractor._read_header(f)[0]
+
+
+def backup_without_unpacked(tmp_path, asar_path):
+    """Copy only app.asar, as backups made by older versions did."""
+    backup_path = str(tmp_path / 'backup' / 'app.asar')
+    os.makedirs(os.path.dirname(backup_path))
+    shutil.copy2(asar_path, backup_path)
+    return backup_path
+
+
+def test_selective_extraction_from_backup_without_unpacked(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    backup_path = backup_without_unpacked(tmp_path, asar_path)
+    output_dir = str(tmp_path / 'partial')
+
+    assert ASARExtractor.extract(backup_path, output_dir, include=['static/js/*'])
+
+    assert read_tree(output_dir) == {
+        'static/js/main.1234.js': SAMPLE_FILES['static/js/main.1234.js'],
+        'static/js/vendor.5678.js': SAMPLE_FILES['static/js/vendor.5678.js'],
+    }
+    manifest = ASARExtractor.load_manifest(output_dir)
+    assert 'node_modules/native/binding.node' in manifest['external']
+    assert 'package.json' in manifest['external']
+
+
+def test_selective_extraction_filters_unpacked_entries(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    output_dir = str(tmp_path / 'partial')
+
+    ASARExtractor.extract(asar_path, output_dir, exclude=['node_modules/**'])
+    assert 'node_modules/native/binding.node' not in read_tree(output_dir)
+
+    shutil.rmtree(output_dir)
+    ASARExtractor.extract(asar_path, output_dir, include=['node_modules/**'])
+    assert read_tree(output_dir) == {
+        'node_modules/native/binding.node': SAMPLE_FILES['node_modules/native/binding.node']
+    }
+
+
+def test_backup_extraction_uses_launcher_unpacked_dir(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    backup_path = backup_without_unpacked(tmp_path, asar_path)
+    output_dir = str(tmp_path / 'partial')
+
+    ASARExtractor.extract(backup_path, output_dir, include=['static/js/*'],
+                          unpacked_dir=asar_path + '.unpacked')
+    with open(os.path.join(output_dir, 'static', 'js', 'main.1234.js'), 'ab') as f:
+        f.write(b'// themed\n')
+
+    # Repacking restores the unextracted unpacked entry from the launcher
+    output_path = str(tmp_path / 'out' / 'app.asar')
+    ASARPacker.pack(output_dir, output_path)
+    archive = ASARArchive(output_path)
+    assert archive.read('node_modules/native/binding.node') == SAMPLE_FILES['node_modules/native/binding.node']
+    assert archive.read('static/js/main.1234.js').endswith(b'// themed\n')
+    assert archive.read('package.json') == SAMPLE_FILES['package.json']
+    assert ASARExtractor.verify_integrity(output_path)
+
+
+def test_iter_zip_skips_missing_unpacked_entries(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    backup_path = backup_without_unpacked(tmp_path, asar_path)
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(ASARArchive(backup_path).iter_zip()))) as zip_f:
+        names = set(zip_f.namelist())
+    assert 'package.json' in names
+    assert 'node_modules/native/binding.node' not in names
+
+    archive = ASARArchive(backup_path, unpacked_dir=asar_path + '.unpacked')
+    with zipfile.ZipFile(io.BytesIO(b''.join(archive.iter_zip()))) as zip_f:
+        assert zip_f.read('node_modules/native/binding.node') == SAMPLE_FILES['node_modules/native/binding.node']
+
+
+def test_archive_helpers_keep_unpacked_folder(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    copy_path = str(tmp_path / 'copies' / 'app.asar')
+    os.makedirs(os.path.dirname(copy_path))
+
+    ASARPacker.copy_archive(asar_path, copy_path)
+    assert os.path.isfile(os.path.join(copy_path + '.unpacked', 'node_modules', 'native', 'binding.node'))
+
+    moved_path = str(tmp_path / 'copies' / 'moved.asar')
+    ASARPacker.move_archive(copy_path, moved_path)
+    assert not os.path.exists(copy_path + '.unpacked')
+    assert ASARArchive(moved_path).read('node_modules/native/binding.node') == \
+        SAMPLE_FILES['node_modules/native/binding.node']
+
+    ASARPacker.remove_archive(moved_path)
+    assert os.listdir(os.path.dirname(moved_path)) == []
+
+
+def test_pack_extract_round_trip(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    output_dir = str(tmp_path / 'extracted')
+
+    assert ASARExtractor.extract(asar_path, output_dir, verify=True)
+    assert read_tree(output_dir) == SAMPLE_FILES
+    assert not os.path.exists(os.path.join(output_dir, ASARExtractor.JOURNAL_NAME))
+
+    archive = ASARArchive(asar_path)
+    assert archive.listdir('static/js') == ['main.1234.js', 'vendor.5678.js']
+    for rel_path, data in SAMPLE_FILES.items():
+        assert archive.read(rel_path) == data
+
+
+def test_integrity_blocks_include_trailing_block(tmp_path):
+    block_size = ASARExtractor.INTEGRITY_BLOCK_SIZE
+    files = {'exact.bin': b'x' * block_size, 'empty.txt': b'', 'small.txt': b'abc'}
+    asar_path = build_launcher(tmp_path, files=files, unpacked=None)
+
+    nodes = read_header(asar_path)['files']
+    # @electron/asar: size // blockSize + 1 blocks, the last one possibly empty
+    assert len(nodes['exact.bin']['integrity']['blocks']) == 2
+    assert nodes['exact.bin']['integrity']['blocks'][1] == hashlib.sha256(b'').hexdigest()
+    assert nodes['empty.txt']['integrity']['blocks'] == [hashlib.sha256(b'').hexdigest()]
+    assert nodes['small.txt']['integrity']['hash'] == hashlib.sha256(b'abc').hexdigest()
+    assert ASARExtractor.verify_integrity(asar_path) == 3
+
+    # Archives from tools that omit the trailing block verify too
+    header = read_header(asar_path)
+    header['files']['exact.bin']['integrity']['blocks'].pop()
+    rewrite_header(asar_path, header)
+    assert ASARExtractor.verify_integrity(asar_path) == 3
+
+    # A wrong block count or a changed byte is caught
+    header['files']['small.txt']['integrity']['blocks'].append('0' * 64)
+    rewrite_header(asar_path, header)
+    with pytest.raises(ValueError, match='small.txt'):
+        ASARExtractor.verify_integrity(asar_path)
+
+
+def test_incremental_pack_splices_unchanged_entries(tmp_path, capsys):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    output_dir = str(tmp_path / 'extracted')
+    ASARExtractor.extract(asar_path, output_dir)
+    with open(os.path.join(output_dir, 'static', 'css', 'main.css'), 'wb') as f:
+        f.write(b'body { color: #000000; }\n')
+    capsys.readouterr()
+
+    spliced_path = str(tmp_path / 'spliced.asar')
+    ASARPacker.pack(output_dir, spliced_path, incremental=True)
+    spliced = int(re.search(r'(\d+) spliced', capsys.readouterr().out).group(1))
+    assert spliced == len(SAMPLE_FILES) - 1
+
+    full_path = str(tmp_path / 'full.asar')
+    ASARPacker.pack(output_dir, full_path, incremental=False)
+    assert int(re.search(r'(\d+) spliced', capsys.readouterr().out).group(1)) == 0
+
+    with open(spliced_path, 'rb') as spliced_f, open(full_path, 'rb') as full_f:
+        assert spliced_f.read() == full_f.read()
+    assert ASARExtractor.verify_integrity(spliced_path)
+    assert ASARArchive(spliced_path).read('static/css/main.css') == b'body { color: #000000; }\n'
+
+
+def test_interrupted_extraction_resumes_from_journal(tmp_path, capsys, monkeypatch):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    output_dir = str(tmp_path / 'extracted')
+
+    # The disk "fills up" after two files
+    copy_range = ASARExtractor._copy_range
+    calls = []
+    def failing_copy(*args):
+        calls.append(args)
+        if len(calls) > 2:
+            raise OSError('No space left on device')
+        return copy_range(*args)
+    monkeypatch.setattr(ASARExtractor, '_copy_range', staticmethod(failing_copy))
+    with pytest.raises(ValueError, match='run again to resume'):
+        ASARExtractor.extract(asar_path, output_dir, workers=1)
+    assert os.path.exists(os.path.join(output_dir, ASARExtractor.JOURNAL_NAME))
+    assert ASARExtractor.load_manifest(output_dir) is None
+
+    monkeypatch.setattr(ASARExtractor, '_copy_range', staticmethod(copy_range))
+    capsys.readouterr()
+    assert ASARExtractor.extract(asar_path, output_dir, workers=1)
+    assert 'Resuming: 2 files already extracted' in capsys.readouterr().out
+    assert read_tree(output_dir) == SAMPLE_FILES
+    assert not os.path.exists(os.path.join(output_dir, ASARExtractor.JOURNAL_NAME))
+
+
+def test_resumed_file_torn_at_the_right_size_is_extracted_again(tmp_path, monkeypatch):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    output_dir = str(tmp_path / 'extracted')
+
+    copy_range = ASARExtractor._copy_range
+    calls = []
+    def failing_copy(*args):
+        calls.append(args)
+        if len(calls) > 2:
+            raise OSError('No space left on device')
+        return copy_range(*args)
+    monkeypatch.setattr(ASARExtractor, '_copy_range', staticmethod(failing_copy))
+    with pytest.raises(ValueError, match='run again to resume'):
+        ASARExtractor.extract(asar_path, output_dir, workers=1)
+    monkeypatch.setattr(ASARExtractor, '_copy_range', staticmethod(copy_range))
+
+    # Tear a journaled file without changing its size or mtime
+    with open(os.path.join(output_dir, ASARExtractor.JOURNAL_NAME), encoding='utf-8') as f:
+        rel_path = json.loads(f.read().splitlines()[1])[0]
+    path = os.path.join(output_dir, *rel_path.split('/'))
+    stat = os.stat(path)
+    with open(path, 'r+b') as f:
+        f.write(b'\0' * stat.st_size)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    with pytest.raises(ValueError, match='Integrity check failed for 1 entries'):
+        ASARExtractor.extract(asar_path, output_dir, workers=1)
+    assert not os.path.exists(path)
+    assert ASARExtractor.load_manifest(output_dir) is None
+
+    assert ASARExtractor.extract(asar_path, output_dir, workers=1)
+    assert read_tree(output_dir) == SAMPLE_FILES
+    assert not os.path.exists(os.path.join(output_dir, ASARExtractor.JOURNAL_NAME))
+
+
+def test_patcher_edits_in_place_and_rehashes(tmp_path):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    output_path = str(tmp_path / 'patched.asar')
+    data = SAMPLE_FILES['static/js/main.1234.js']
+    offset = data.index(b'#071a25')
+
+    assert ASARPatcher.patch(asar_path, output_path, {'static/js/main.1234.js': [(offset, b'#071a25', b'#ffffff')]}) == 1
+    assert ASARArchive(output_path).read('static/js/main.1234.js') == data.replace(b'#071a25', b'#ffffff')
+    assert ASARExtractor.verify_integrity(output_path)
+    assert os.path.getsize(output_path) == os.path.getsize(asar_path)
+
+    with pytest.raises(ValueError, match='changes length'):
+        ASARPatcher.patch(asar_path, output_path, {'static/js/main.1234.js': [(offset, b'#071a25', b'#fff')]})
+
+
+def test_patcher_copies_the_unpacked_folder(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    output_path = str(tmp_path / 'patched.asar')
+    data = SAMPLE_FILES['static/js/main.1234.js']
+    offset = data.index(b'#071a25')
+
+    ASARPatcher.patch(asar_path, output_path, {'static/js/main.1234.js': [(offset, b'#071a25', b'#ffffff')]})
+    assert ASARExtractor.verify_integrity(output_path) == len(SAMPLE_FILES)
+    assert ASARArchive(output_path).read('node_modules/native/binding.node') == \
+        SAMPLE_FILES['node_modules/native/binding.node']
+
+
+def test_patcher_rejects_header_that_does_not_round_trip(tmp_path):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    # Indented JSON can't be rewritten byte-for-byte in compact form
+    rewrite_header(asar_path, None, json.dumps(read_header(asar_path), indent=2).encode('utf-8'))
+    assert ASARArchive(asar_path).read('package.json') == SAMPLE_FILES['package.json']
+
+    output_path = str(tmp_path / 'patched.asar')
+    data = SAMPLE_FILES['static/js/main.1234.js']
+    offset = data.index(b'#071a25')
+    with pytest.raises(ValueError, match='round-trip'):
+        ASARPatcher.patch(asar_path, output_path, {'static/js/main.1234.js': [(offset, b'#071a25', b'#ffffff')]})
+    assert not os.path.exists(output_path)
+    assert not os.path.exists(output_path + '.tmp')
+
+
+def test_index_cache_is_reused_and_pruned(tmp_path):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    cache_dir = str(tmp_path / 'cache')
+    copies = []
+    for number in range(4):
+        copy_path = str(tmp_path / f'copy-{number}.asar')
+        shutil.copy2(asar_path, copy_path)
+        copies.append(copy_path)
+        ASARArchive(copy_path, cache_dir=cache_dir)
+        # Distinct mtimes regardless of filesystem timestamp resolution
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            os.utime(path, ns=(os.stat(path).st_mtime_ns - 10 ** 9,) * 2)
+    assert len(os.listdir(cache_dir)) == 4
+
+    # Opening copy 0 again is a cache hit and makes it the most recent
+    assert ASARArchive(copies[0], cache_dir=cache_dir).read('package.json') == SAMPLE_FILES['package.json']
+    assert ASARArchive.prune_index_cache(cache_dir, keep_latest=2) == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+    kept = set(os.listdir(cache_dir))
+    ASARArchive(copies[0], cache_dir=cache_dir)
+    ASARArchive(copies[3], cache_dir=cache_dir)
+    assert set(os.listdir(cache_dir)) == kept
+
+
+def data_order(asar_path):
+    """Return the archive's file entries in the order of their data."""
+    archive = ASARArchive(asar_path)
+    entries = [(entry.offset, path) for path, entry in archive.walk_files()
+               if not entry.flags & ASARArchive.FLAG_UNPACKED]
+    return [path for _, path in sorted(entries)]
+
+
+def test_pack_lays_out_data_in_access_order(tmp_path):
+    asar_path = build_launcher(tmp_path)
+    assert data_order(asar_path) == [
+        'package.json', 'static/js/main.1234.js', 'static/js/vendor.5678.js', 'static/css/main.css', 'index.js',
+    ]
+
+    source_dir = str(tmp_path / 'source')
+    plain_path = str(tmp_path / 'plain.asar')
+    ASARPacker.pack(source_dir, plain_path, order=[])
+    directory_order = [path for _, path in ASARArchive(plain_path).index.iter_files()
+                       if path != 'node_modules/native/binding.node']
+    assert data_order(plain_path) == directory_order
+    # The layout moves data only: the header keeps directory order
+    assert [path for _, path in ASARArchive(asar_path).index.iter_files()
+            if path != 'node_modules/native/binding.node'] == directory_order
+
+    custom_path = str(tmp_path / 'custom.asar')
+    ASARPacker.pack(source_dir, custom_path, order=['static/css', 'index.js'])
+    assert data_order(custom_path)[:2] == ['static/css/main.css', 'index.js']
+    for rel_path, data in SAMPLE_FILES.items():
+        assert ASARArchive(custom_path).read(rel_path) == data
+    assert ASARExtractor.verify_integrity(custom_path)
+
+
+def test_fingerprint_and_cloned_working_copies(tmp_path, capsys):
+    asar_path = build_launcher(tmp_path, unpacked=None)
+    fingerprint = ASARExtractor.fingerprint(asar_path)
+    copy_path = str(tmp_path / 'copy.asar')
+    shutil.copy2(asar_path, copy_path)
+    assert ASARExtractor.fingerprint(copy_path) == fingerprint
+    info = os.stat(copy_path)
+    with open(copy_path, 'r+b') as f:
+        f.seek(info.st_size - 1)
+        f.write(b'!')
+    os.utime(copy_path, ns=(info.st_atime_ns, info.st_mtime_ns))
+    assert ASARExtractor.fingerprint(copy_path) != fingerprint
+
+    # A cache hit: working copies are hardlinks into the pristine extraction
+    cache_dir = str(tmp_path / 'Cache' / f'asar-{fingerprint}')
+    ASARExtractor.extract(asar_path, cache_dir)
+    working_dirs = [str(tmp_path / name) for name in ('work1', 'work2')]
+    for working_dir in working_dirs:
+        assert ASARExtractor.clone_tree(cache_dir, working_dir) == len(SAMPLE_FILES) + 1
+    css = os.path.join('static', 'css', 'main.css')
+    assert os.path.samefile(os.path.join(cache_dir, css), os.path.join(working_dirs[1], css))
+    # Sidecars are copied, so one working copy's bookkeeping stays its own
+    manifest = ASARExtractor.MANIFEST_NAME
+    assert not os.path.samefile(os.path.join(cache_dir, manifest), os.path.join(working_dirs[1], manifest))
+
+    # Replacing a file in one copy leaves the cache and the other copy alone
+    path = os.path.join(working_dirs[0], css)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(b'body { color: #000000; }\n')
+    os.replace(path + '.tmp', path)
+    assert read_tree(cache_dir) == read_tree(working_dirs[1]) == SAMPLE_FILES
+
+    # The cloned manifest still matches, so a repack splices the rest
+    capsys.readouterr()
+    ASARPacker.pack(working_dirs[0], str(tmp_path / 'out.asar'))
+    assert int(re.search(r'(\d+) spliced', capsys.readouterr().out).group(1)) == len(SAMPLE_FILES) - 1
+
+
+def test_iter_zip_matches_archive_contents(tmp_path):
+    files = dict(SAMPLE_FILES, **{'static/media/bg.png': b'\x89PNG' + bytes(range(256)) * 8})
+    os.makedirs(tmp_path / 'source' / 'static' / 'empty')
+    asar_path = build_launcher(tmp_path, files=files)
+    archive = ASARArchive(asar_path)
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(archive.iter_zip(chunk_size=64)))) as zip_f:
+        assert zip_f.testzip() is None
+        contents = {info.filename: zip_f.read(info) for info in zip_f.infolist() if not info.is_dir()}
+        compression = {info.filename: info.compress_type for info in zip_f.infolist()}
+    assert contents == {path: archive.read(path) for path, _ in archive.walk_files()} == files
+    assert 'static/empty/' in compression
+    assert compression['static/media/bg.png'] == zipfile.ZIP_STORED
+    assert compression['static/js/main.1234.js'] == zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.parametrize('use_orjson', [False, True])
+def test_header_parses_the_same_with_and_without_orjson(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(asar_extractor, 'orjson', None)
+    files = dict(SAMPLE_FILES, **{'locales/déjà vu.json': b'{}'})
+    asar_path = build_launcher(tmp_path, files=files)
+    with open(asar_path, 'rb') as f:
+        # [4][header size][payload size][JSON length][JSON]
+        json_length = struct.unpack('<4I', f.read(16))[3]
+        header = json.loads(f.read(json_length))
+
+    assert read_header(asar_path) == header
+    assert ASARArchive(asar_path).read('locales/déjà vu.json') == b'{}'
+    # Non-standard framing falls back to scanning for the JSON object
+    rewrite_header(asar_path, None, b' ' + json.dumps(header).encode('utf-8'))
+    assert read_header(asar_path) == header
+
+    with pytest.raises(ValueError):
+        ASARExtractor._loads_header(b'{"files": {"\xff": {}}}')
+
+
+def test_packer_header_index_serializes_like_json_dumps(tmp_path):
+    files = {
+        'empty': {'files': {}},
+        'lib': {'files': {
+            'déjà vu "quoted".js': {'size': 3, 'offset': '0', 'executable': True,
+                                     'integrity': {'algorithm': 'SHA256', 'hash': 'ab', 'blockSize': 4,
+                                                   'blocks': ['cd']}},
+            'native.node': {'size': 7, 'unpacked': True},
+            'current': {'link': 'lib/déjà vu "quoted".js'},
+        }},
+        '日本.txt': {'size': 0, 'offset': '3'},
+    }
+    index = ASARIndex(files, keep_integrity=True)
+    assert index.to_json() == json.dumps({'files': files}, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    assert ASARPacker._encode_header(index) == ASARPacker._encode_header({'files': files})
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Tests for the color replacement engine.
+
+Each test themes a small fake extraction in a temporary directory; the
+bundle defines theme variables the way the launcher's main.*.js does.
+Run with: python -m pytest
+"""
+
+import hashlib
+import os
+import random
+import re
+
+import pytest
+
+from color_replacer import ColorReplacer
+
+# Theme bundle: variable definitions plus uses of their literals
+BUNDLE = (
+    b':root{--sol-color-primary: #071a25;--sol-color-accent-rgb: 10 20 30;}'
+    b'const a="#071a25",b="7,26,37",c="rgb(7,26,37)";'
+)
+
+
+def make_extraction(tmp_path, assets=None):
+    """Write a fake extraction and return its directory."""
+    extracted_dir = str(tmp_path / 'extracted')
+    files = {'static/js/main.1234.js': BUNDLE}
+    files.update(assets or {})
+    for rel_path, data in files.items():
+        path = os.path.join(extracted_dir, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    return extracted_dir
+
+
+def read(extracted_dir, rel_path):
+    with open(os.path.join(extracted_dir, *rel_path.split('/')), 'rb') as f:
+        return f.read()
+
+
+def test_whole_bundle_only_replaces_color_syntax(tmp_path):
+    extracted_dir = make_extraction(tmp_path, {
+        'static/js/2.chunk.js': b'x="#071a25";pos=[7,26,37];y="rgba(7,26,37,0.5)";',
+        'static/css/main.css': b'.a{color:#071a25;border-color:rgb(7,26,37)}',
+        'img/logo.svg': b'<svg viewBox="7 26 37"><path fill="#071a25"/></svg>',
+        'locales/en.json': b'{"color": "#071a25", "sizes": [7,26,37]}',
+    })
+
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '255 0 0'}, whole_bundle=True)
+
+    # The theme bundle still gets every form
+    assert read(extracted_dir, 'static/js/main.1234.js').endswith(b'const a="255 0 0",b="255,0,0",c="rgb(255,0,0)";')
+    # Elsewhere only hex and rgb()/rgba() colors change; hex stays hex
+    assert read(extracted_dir, 'static/js/2.chunk.js') == b'x="#ff0000";pos=[7,26,37];y="rgba(255,0,0,0.5)";'
+    assert read(extracted_dir, 'static/css/main.css') == b'.a{color:#ff0000;border-color:rgb(255,0,0)}'
+    assert read(extracted_dir, 'img/logo.svg') == b'<svg viewBox="7 26 37"><path fill="#ff0000"/></svg>'
+    # JSON is data, not styling
+    assert read(extracted_dir, 'locales/en.json') == b'{"color": "#071a25", "sizes": [7,26,37]}'
+
+
+def test_apply_without_whole_bundle_restores_assets(tmp_path):
+    chunk = b'x="#071a25";y="rgb(7,26,37)";'
+    extracted_dir = make_extraction(tmp_path, {'static/js/2.chunk.js': chunk})
+
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#ff0000'}, whole_bundle=True)
+    assert read(extracted_dir, 'static/js/2.chunk.js') != chunk
+    assert ColorReplacer.themed_assets(extracted_dir) == ['static/js/2.chunk.js']
+
+    file_counts = {}
+    reverted = []
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#00ff00'}, file_counts=file_counts,
+                               reverted=reverted)
+    assert read(extracted_dir, 'static/js/2.chunk.js') == chunk
+    assert b'#00ff00' in read(extracted_dir, 'static/js/main.1234.js')
+    assert file_counts['static/js/2.chunk.js'] == 0
+    assert reverted == ['static/js/2.chunk.js']
+    assert ColorReplacer.themed_assets(extracted_dir) == []
+
+    # Undoing the plain apply brings the themed asset back
+    ColorReplacer.undo(extracted_dir)
+    assert read(extracted_dir, 'static/js/2.chunk.js') == b'x="#ff0000";y="rgb(255,0,0)";'
+
+
+def edit_music(extracted_dir, tracks):
+    """Rewrite the musics object the way /api/update-music-code does."""
+    path = os.path.join(extracted_dir, 'static', 'js', 'main.1234.js')
+    with open(path, 'rb') as f:
+        content = f.read()
+    start = content.index(b'musics:{')
+    end = content.index(b'}', start) + 1
+    entries = ','.join(f'bg{i + 1}:"{track}"' for i, track in enumerate(tracks)).encode('latin-1')
+    with open(path + '.tmp', 'wb') as f:
+        f.write(content[:start] + b'musics:{' + entries + b'}' + content[end:])
+    os.replace(path + '.tmp', path)
+
+
+def test_outside_change_is_kept_and_apply_stays_deterministic(tmp_path):
+    bundle = BUNDLE + b'const m={musics:{bg1:"a.ogg"}};const d="#071a25";'
+    themed_dir = make_extraction(tmp_path / 'themed', {'static/js/main.1234.js': bundle})
+    fresh_dir = make_extraction(tmp_path / 'fresh', {'static/js/main.1234.js': bundle})
+    first = {'--sol-color-primary': '#123456', '--sol-color-accent-rgb': '1 2 3'}
+    second = {'--sol-color-primary': '255 255 255'}
+
+    ColorReplacer.apply_colors(themed_dir, first)
+    edit_music(themed_dir, ['one.ogg', 'two.ogg'])
+    ColorReplacer.apply_colors(themed_dir, second)
+
+    edit_music(fresh_dir, ['one.ogg', 'two.ogg'])
+    ColorReplacer.apply_colors(fresh_dir, second)
+
+    assert read(themed_dir, 'static/js/main.1234.js') == read(fresh_dir, 'static/js/main.1234.js')
+    # The snapshot got the music change, not the first theme's colors
+    pristine = read(themed_dir, '.pristine/static/js/main.1234.js')
+    assert b'bg2:"two.ogg"' in pristine and b'#123456' not in pristine
+
+    # Back to the original colors: only the music change remains
+    ColorReplacer.apply_colors(themed_dir, {})
+    expected = bundle.replace(b'bg1:"a.ogg"', b'bg1:"one.ogg",bg2:"two.ogg"')
+    assert read(themed_dir, 'static/js/main.1234.js') == expected
+
+
+def test_outside_change_over_a_themed_literal(tmp_path):
+    extracted_dir = make_extraction(tmp_path)
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#abcdef'})
+
+    # Something rewrites a themed literal; its text is kept as written
+    path = os.path.join(extracted_dir, 'static', 'js', 'main.1234.js')
+    with open(path, 'rb') as f:
+        content = f.read()
+    with open(path + '.tmp', 'wb') as f:
+        f.write(content.replace(b'b="171,205,239"', b'b="custom"'))
+    os.replace(path + '.tmp', path)
+
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#000000'})
+    assert read(extracted_dir, 'static/js/main.1234.js').endswith(b'const a="#000000",b="custom",c="rgb(0,0,0)";')
+    ColorReplacer.apply_colors(extracted_dir, {})
+    assert read(extracted_dir, 'static/js/main.1234.js') == BUNDLE.replace(b'b="7,26,37"', b'b="custom"')
+
+
+
+def test_outside_change_to_a_themed_asset(tmp_path):
+    extracted_dir = make_extraction(tmp_path, {'static/css/main.css': b'.a{color:#071a25}'})
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#111111'}, whole_bundle=True)
+    with open(os.path.join(extracted_dir, 'static', 'css', 'main.css'), 'ab') as f:
+        f.write(b'.b{fill:rgba(7,26,37,0.5)}')
+
+    # The rebased asset is still indexed for the theme's literals
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#222222'}, whole_bundle=True)
+    assert read(extracted_dir, 'static/css/main.css') == b'.a{color:#222222}.b{fill:rgba(34,34,34,0.5)}'
+    ColorReplacer.apply_colors(extracted_dir, {})
+    assert read(extracted_dir, 'static/css/main.css') == b'.a{color:#071a25}.b{fill:rgba(7,26,37,0.5)}'
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Scan anything over a few KB on the process pool, in tiny chunks."""
+    monkeypatch.setattr(ColorReplacer, 'PARALLEL_THRESHOLD', 4096)
+    monkeypatch.setattr(ColorReplacer, 'PARALLEL_CHUNK_SIZE', 1024)
+    monkeypatch.setattr(ColorReplacer, 'PARALLEL_WORKERS', 4)
+    yield
+    if ColorReplacer._process_pool is not None:
+        ColorReplacer._process_pool.shutdown()
+        ColorReplacer._process_pool = None
+
+
+def test_parallel_scan_matches_sequential_scan(tmp_path, small_chunks):
+    # Overlapping literals land on every chunk boundary sooner or later
+    literals = ['#071a25', '7,26,37', 'rgb(7,26,37)', '26,37', '#071a2', 'a25']
+    rng = random.Random(1234)
+    pieces = [rng.choice(literals + ['x', ';', 'rgb(', '7,2']) for _ in range(8000)]
+    data = ''.join(pieces).encode('latin-1')
+    path = tmp_path / 'bundle.js'
+    path.write_bytes(data)
+
+    pattern = ColorReplacer._literal_matcher(ColorReplacer._ordered_literals(literals))
+    sequential = [(match.start(), match.group(0)) for match in pattern.finditer(data)]
+    assert len(data) > ColorReplacer.PARALLEL_THRESHOLD
+    assert ColorReplacer._scan_literals(data, literals) == sequential
+    assert ColorReplacer._process_pool is not None
+    with ColorReplacer._map_file(str(path)) as mapped:
+        assert ColorReplacer._scan_literals(mapped, literals, str(path)) == sequential
+    assert ColorReplacer._scan_files([str(path)], literals)[str(path)] == sequential
+
+
+def disk_state(extracted_dir):
+    """Return {relative path: (mtime_ns, sha256)} of every file, sidecars included."""
+    state = {}
+    for root, _, files in os.walk(extracted_dir):
+        for file in files:
+            path = os.path.join(root, file)
+            with open(path, 'rb') as f:
+                state[os.path.relpath(path, extracted_dir)] = (os.stat(path).st_mtime_ns,
+                                                               hashlib.sha256(f.read()).hexdigest())
+    return state
+
+
+def test_plan_writes_nothing_even_for_a_changed_bundle(tmp_path):
+    extracted_dir = make_extraction(tmp_path, {'static/css/main.css': b'.a{color:#071a25}'})
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#111111'}, whole_bundle=True)
+    for rel_path in ('static/js/main.1234.js', 'static/css/main.css'):
+        with open(os.path.join(extracted_dir, *rel_path.split('/')), 'ab') as f:
+            f.write(b'/* #071a25 */')
+    mapping = {'--sol-color-primary': '#222222'}
+
+    before = disk_state(extracted_dir)
+    plans = [ColorReplacer.plan_colors(extracted_dir, mapping, whole_bundle=whole_bundle)[0]
+             for whole_bundle in (False, True)]
+    assert disk_state(extracted_dir) == before
+
+    # The plan is the one the apply (which rebases the snapshots) follows
+    file_counts = {}
+    ColorReplacer.apply_colors(extracted_dir, mapping, whole_bundle=True, file_counts=file_counts)
+    assert {rel_path: plan['occurrences'] for rel_path, plan in plans[1]['files'].items()} == file_counts
+    assert plans[0]['files']['static/js/main.1234.js'] == plans[1]['files']['static/js/main.1234.js']
+    assert read(extracted_dir, 'static/css/main.css') == b'.a{color:#222222}/* #222222 */'
+
+
+def test_undo_and_redo_restore_each_step(tmp_path):
+    extracted_dir = make_extraction(tmp_path, {'static/js/2.chunk.js': b'x="#071a25";'})
+    path = 'static/js/main.1234.js'
+    states = [read(extracted_dir, path)]
+    for mapping, whole_bundle in [({'--sol-color-primary': '#111111'}, False),
+                                  ({'--sol-color-primary': '1 2 3', '--sol-color-accent-rgb': '4 5 6'}, True),
+                                  ({'--sol-color-accent-rgb': '#abcdef'}, False)]:
+        ColorReplacer.apply_colors(extracted_dir, mapping, whole_bundle=whole_bundle)
+        states.append((read(extracted_dir, path), read(extracted_dir, 'static/js/2.chunk.js')))
+    states[0] = (states[0], b'x="#071a25";')
+
+    for position in (2, 1, 0):
+        result = ColorReplacer.undo(extracted_dir)
+        assert (read(extracted_dir, path), read(extracted_dir, 'static/js/2.chunk.js')) == states[position]
+    assert result['canUndo'] is False and result['canRedo'] is True
+    assert ColorReplacer.undo(extracted_dir) is None
+
+    for position in (1, 2, 3):
+        result = ColorReplacer.redo(extracted_dir)
+        assert (read(extracted_dir, path), read(extracted_dir, 'static/js/2.chunk.js')) == states[position]
+    assert ColorReplacer.redo(extracted_dir) is None
+
+    # Applying after an undo drops the redo steps; the result is the same
+    # as applying that theme once to the original bundle
+    ColorReplacer.undo(extracted_dir)
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#222222'})
+    history = ColorReplacer.load_history(extracted_dir)
+    assert history['position'] == len(history['steps']) == 3
+    fresh_dir = make_extraction(tmp_path / 'fresh')
+    ColorReplacer.apply_colors(fresh_dir, {'--sol-color-primary': '#222222'})
+    assert read(extracted_dir, path) == read(fresh_dir, path)
+
+
+def test_undo_refuses_a_file_changed_since_the_step(tmp_path):
+    extracted_dir = make_extraction(tmp_path)
+    ColorReplacer.apply_colors(extracted_dir, {'--sol-color-primary': '#111111'})
+    path = os.path.join(extracted_dir, 'static', 'js', 'main.1234.js')
+    with open(path, 'r+b') as f:
+        content = f.read()
+        f.seek(content.rindex(b'#111111'))
+        f.write(b'#999999')
+
+    with pytest.raises(ValueError, match='changed since this color edit'):
+        ColorReplacer.undo(extracted_dir)
+
+
+def test_plan_is_cached_and_matches_the_apply(tmp_path):
+    extracted_dir = make_extraction(tmp_path)
+    mapping = {'--sol-color-primary': '#ff0000'}
+
+    plan, cached = ColorReplacer.plan_colors(extracted_dir, mapping)
+    assert cached is False
+    assert ColorReplacer.plan_colors(extracted_dir, mapping) == (plan, True)
+    assert ColorReplacer.plan_colors(extracted_dir, {'--sol-color-primary': '#00ff00'})[1] is False
+    assert plan['variables']['--sol-color-primary'] == {'from': '#071a25', 'to': '#ff0000', 'occurrences': 4}
+
+    # Offsets point at the old literals of the pristine bundle
+    edits = plan['files']['static/js/main.1234.js']['edits']['--sol-color-primary']
+    for old, literal in edits.items():
+        for offset in literal['offsets']:
+            assert BUNDLE[offset:offset + len(old)] == old.encode('latin-1')
+
+    file_counts = {}
+    ColorReplacer.apply_colors(extracted_dir, mapping, file_counts=file_counts)
+    assert file_counts == {'static/js/main.1234.js': plan['occurrences']}
+    # The bundle changed, so the cached plan isn't reused
+    assert ColorReplacer.plan_colors(extracted_dir, mapping) == (plan, False)
+
+
+def test_literal_matcher_prefers_the_longest_literal():
+    rng = random.Random(20)
+    literals = ['#fff', '#ffffff', '255,87,51', 'rgb(255,87,51)', '7 26 37', '7,26,37', 'rgb(7,26,37)']
+    literals += ['#%06x' % rng.randrange(1 << 24) for _ in range(200)]
+    literals = sorted(set(literals), key=len, reverse=True)
+    alphabet = '#0123456789abcdefrgb(), f'
+    data = ''.join(rng.choice(literals) if rng.random() < 0.2 else rng.choice(alphabet)
+                   for _ in range(5000)).encode('latin-1')
+
+    # Same matches as a plain longest-first alternation
+    plain = re.compile(b'|'.join(re.escape(literal.encode('latin-1')) for literal in literals))
+    trie = ColorReplacer._literal_matcher(literals)
+    assert [(m.start(), m.group()) for m in trie.finditer(data)] == \
+           [(m.start(), m.group()) for m in plain.finditer(data)]
+
+
+def test_plan_indexed_edits_reads_the_bundle_only_when_the_stamp_changes():
+    mapping = {'--sol-color-primary': '#ff0000'}
+    color_index = {'version': ColorReplacer.COLOR_INDEX_VERSION, 'files': {}}
+    reads = []
+    def read():
+        reads.append(1)
+        return BUNDLE
+
+    expected = [edit for edit in ColorReplacer.plan_edits(BUNDLE, mapping) if edit[1] != edit[2]]
+    assert ColorReplacer.plan_indexed_edits(color_index, 'main.js', {'offset': 0}, read, mapping) == (expected, True)
+    assert ColorReplacer.plan_indexed_edits(color_index, 'main.js', {'offset': 0}, read, mapping) == (expected, False)
+    assert len(reads) == 1
+    assert ColorReplacer.plan_indexed_edits(color_index, 'main.js', {'offset': 8}, read, mapping) == (expected, True)
+    assert len(reads) == 2